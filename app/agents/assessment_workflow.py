@@ -15,8 +15,10 @@ from typing import Optional, TypedDict
 
 from langgraph.graph import END, StateGraph
 
+from app.config import settings
 from app.core import patient_db, rag_pipeline
 from app.core.gemini_client import gemini_client
+from app.core.retrieval_hit import RetrievalHit
 from app.prompts.assessment import (
     ASSESSMENT_SYSTEM_PROMPT,
     format_assessment_prompt,
@@ -117,16 +119,46 @@ async def fetch_patient(state: AssessmentState) -> dict:
 # Node 2: retrieve_guidelines
 # ---------------------------------------------------------------------------
 
-async def retrieve_guidelines(state: AssessmentState) -> dict:
-    """Retrieve relevant NG12 guideline chunks for the patient."""
-    patient = state["patient"]
+async def _vector_chunks(patient: dict, top_k: int) -> list[RetrievalHit]:
+    """Vector retrieval for the patient (one or several batched queries)."""
     query = (
         f"{' '.join(patient['symptoms'])} "
         f"age {patient['age']} "
         f"{patient['gender']} "
         f"{patient['smoking_history']}"
     )
-    chunks = rag_pipeline.retrieve(query, top_k=8, patient_data=patient)
+    if settings.ASSESSMENT_SYMPTOM_QUERIES and len(patient["symptoms"]) > 1:
+        queries = [query] + [
+            f"{symptom} age {patient['age']} {patient['gender']}"
+            for symptom in patient["symptoms"]
+        ]
+        batch = await rag_pipeline.aretrieve_many(queries, top_k=top_k, patient_data=patient)
+        return rag_pipeline.merge_results(batch, top_k=top_k)
+    return await rag_pipeline.aretrieve(query, top_k=top_k, patient_data=patient)
+
+
+async def retrieve_guidelines(state: AssessmentState) -> dict:
+    """Retrieve relevant NG12 guideline chunks for the patient.
+
+    With RULE_INDEX_FASTPATH, rules matched directly by the symptom-to-rule
+    index come first and vector retrieval only fills the remaining slots.
+
+    With ASSESSMENT_SYMPTOM_QUERIES, one extra query per symptom is issued
+    alongside the combined query (a single batched retrieval) and the
+    results are merged, so a rarely-mentioned symptom is not drowned out
+    by the others.
+    """
+    patient = state["patient"]
+    top_k = 8
+    chunks: list[RetrievalHit] = []
+    if settings.RULE_INDEX_FASTPATH:
+        chunks = await rag_pipeline.arule_matches(patient, top_k=top_k)
+        logger.info("retrieve_guidelines: %d rules matched by index", len(chunks))
+
+    if len(chunks) < top_k:
+        chunks = rag_pipeline.fill_gaps(
+            chunks, await _vector_chunks(patient, top_k), top_k=top_k,
+        )
 
     if not chunks:
         return {"error": "No relevant NG12 guideline passages found"}
@@ -169,17 +201,13 @@ async def assess_risk(state: AssessmentState) -> dict:
 
     # Build citations from chunk metadata regardless of Gemini availability
     citations = []
-    for i, chunk in enumerate(chunks):
-        meta = chunk["metadata"]
-        canonical_meta = chunk.get("canonical_metadata", {})
-        section = meta.get("section") or canonical_meta.get("section", "Part B")
-        page = meta.get("page") or canonical_meta.get("page", 0)
+    for chunk in chunks:
         citations.append({
             "source": "NG12 PDF",
-            "section": section,
-            "page": page,
-            "chunk_id": chunk.get("chunk_id", f"chunk_{i}"),
-            "excerpt": chunk["text"][:200],
+            "section": chunk.section or "Part B",
+            "page": chunk.page or 0,
+            "chunk_id": chunk.chunk_id,
+            "excerpt": chunk.text[:200],
         })
 
     # --- Try Gemini ---
@@ -28,9 +28,10 @@ from typing import Optional, TypedDict
 
 from langgraph.graph import END, StateGraph
 
-from app.core import rag_pipeline
+from app.core import prefetch, rag_pipeline
 from app.core.gemini_client import gemini_client
 from app.core.query_builder import QueryBuilder
+from app.core.retrieval_hit import RetrievalHit
 from app.memory.session_store import session_store
 from app.prompts.chat import (
     CHAT_CLARIFY_RESPONSE,
@@ -366,9 +367,28 @@ async def build_query_node(state: ChatState) -> dict:
 # Node 3: retrieve
 # ---------------------------------------------------------------------------
 
+# Chunks retrieved per chat turn
+_RETRIEVE_TOP_K = 6
+
+
 async def retrieve_node(state: ChatState) -> dict:
-    """Retrieve relevant NG12 guideline chunks for the query."""
-    chunks = rag_pipeline.retrieve(state["search_query"], top_k=6)
+    """Retrieve relevant NG12 guideline chunks for the query.
+
+    A follow-up that only refers back to the topic uses the results
+    prefetched for it after the previous turn (SPECULATIVE_PREFETCH); the
+    search query then becomes the prefetched one, so later nodes see the
+    query the chunks were actually retrieved for.
+    """
+    session_id = state["session_id"]
+    topic = session_store.get_topic(session_id)
+    if state.get("query_strategy") == "topic_enriched":
+        prefetched = await prefetch.take(session_id, state["message"], topic, _RETRIEVE_TOP_K)
+        if prefetched is not None:
+            search_query, chunks = prefetched
+            return {"chunks": chunks, "search_query": search_query}
+    chunks = await rag_pipeline.aretrieve(
+        state["search_query"], top_k=_RETRIEVE_TOP_K, topic=topic,
+    )
     return {"chunks": chunks}
 
 
@@ -376,12 +396,15 @@ async def retrieve_node(state: ChatState) -> dict:
 # Node 4: guardrail_check
 # ---------------------------------------------------------------------------
 
-def _assess_chunk_quality(chunks: list[dict]) -> str:
+_QUALITY_RANK = {"none": 0, "weak": 1, "sufficient": 2}
+
+
+def _assess_chunk_quality(chunks: list[RetrievalHit]) -> str:
     """Rate retrieved chunks as 'sufficient', 'weak', or 'none'."""
     if not chunks:
         return "none"
 
-    scores = [c.get("score", 0) for c in chunks]
+    scores = [c.score for c in chunks]
     best = max(scores)
 
     # All scores below the floor -> nothing useful
@@ -403,7 +426,7 @@ def _assess_chunk_quality(chunks: list[dict]) -> str:
     return "sufficient"
 
 
-def _has_lexical_overlap(message: str, chunks: list[dict]) -> bool:
+def _has_lexical_overlap(message: str, chunks: list[RetrievalHit]) -> bool:
     """Check whether any meaningful word in *message* appears in the chunks.
 
     Returns False when the query is completely unrelated to every chunk
@@ -414,7 +437,7 @@ def _has_lexical_overlap(message: str, chunks: list[dict]) -> bool:
         return True  # nothing meaningful to check -> assume OK
 
     for chunk in chunks:
-        chunk_lower = chunk.get("text", "").lower()
+        chunk_lower = chunk.text.lower()
         if any(w in chunk_lower for w in msg_words):
             return True
     return False
@@ -439,9 +462,9 @@ async def guardrail_check_node(state: ChatState) -> dict:
     has_in_scope = any(kw in msg_lower for kw in _IN_SCOPE_KEYWORDS)
 
     # === Score metrics (computed once, reused below) ===
-    def _build_score_breakdown(ch: list[dict]) -> dict:
+    def _build_score_breakdown(ch: list[RetrievalHit]) -> dict:
         if ch:
-            scores = [c.get("score", 0) for c in ch]
+            scores = [c.score for c in ch]
             return {
                 "top1_score": round(scores[0], 3),
                 "mean_score": round(sum(scores) / len(scores), 3),
@@ -470,7 +493,7 @@ async def guardrail_check_node(state: ChatState) -> dict:
 
     print(
         f"[Guardrail] Result: {result}, "
-        f"scores: {[round(c.get('score', 0), 3) for c in chunks]}"
+        f"scores: {[round(c.score, 3) for c in chunks]}"
     )
 
     # Lexical overlap guard: if no meaningful word appears in any chunk text,
@@ -503,10 +526,25 @@ async def guardrail_check_node(state: ChatState) -> dict:
                 if new_query and new_query.strip():
                     new_query = new_query.strip()
                     print(f"[Chat] Retry with LLM rewrite: {new_query}")
-                    chunks = rag_pipeline.retrieve(new_query, top_k=6)
+                    # The raw message rides along in the same batch; it
+                    # only replaces the rewrite if it grades strictly better.
+                    retry_queries = [new_query]
+                    if message.strip() != search_query.strip():
+                        retry_queries.append(message)
+                    retries = await rag_pipeline.aretrieve_many(
+                        retry_queries, top_k=_RETRIEVE_TOP_K,
+                        topic=session_store.get_topic(state["session_id"]),
+                    )
+                    chunks = retries[0]
                     result = _assess_chunk_quality(chunks)
                     search_query = new_query
                     query_strategy = "llm_rewrite"
+                    if len(retries) > 1:
+                        raw_result = _assess_chunk_quality(retries[1])
+                        if _QUALITY_RANK[raw_result] > _QUALITY_RANK[result]:
+                            chunks, result = retries[1], raw_result
+                            # Report the query that actually won
+                            search_query, query_strategy = message, "direct"
             except Exception as exc:
                 logger.warning("LLM rewrite retry failed: %s", exc)
 
@@ -633,7 +671,7 @@ def route_guardrail(state: ChatState) -> str:
 
 async def _generate_answer(
     message: str,
-    chunks: list[dict],
+    chunks: list[RetrievalHit],
     history: list[dict],
 ) -> str:
     """Call Gemini to generate a grounded answer, or return a demo answer."""
@@ -649,11 +687,11 @@ async def _generate_answer(
     # Demo fallback when Gemini is unavailable
     demo_answer = "Demo mode - Gemini not configured.\n\nRelevant guidelines found:\n"
     for i, chunk in enumerate(chunks, 1):
-        meta = chunk["metadata"]
+        meta = chunk.metadata
         demo_answer += (
             f"\n[Source {i}] Section {meta.get('section', 'N/A')}"
             f" ({meta.get('action_type', 'N/A')}): "
-            f"{chunk['text'][:150]}...\n"
+            f"{chunk.text[:150]}...\n"
         )
     return demo_answer
 
@@ -776,7 +814,7 @@ async def save_history_node(state: ChatState) -> dict:
     print(f"[SaveHistory][DEBUG] message={message!r}")
     print(f"[SaveHistory][DEBUG] answer length={len(answer)}")
     print(f"[SaveHistory][DEBUG] session_store id={id(session_store)}")
-    print(f"[SaveHistory][DEBUG] sessions keys BEFORE append: {list(session_store._sessions.keys())}")
+    print(f"[SaveHistory][DEBUG] sessions keys BEFORE append: {session_store.session_ids()}")
     history_before = session_store.get_history(session_id)
     print(f"[SaveHistory][DEBUG] history count BEFORE append: {len(history_before)}")
 
@@ -785,7 +823,7 @@ async def save_history_node(state: ChatState) -> dict:
 
     history_after = session_store.get_history(session_id)
     print(f"[SaveHistory][DEBUG] history count AFTER append: {len(history_after)}")
-    print(f"[SaveHistory][DEBUG] sessions keys AFTER append: {list(session_store._sessions.keys())}")
+    print(f"[SaveHistory][DEBUG] sessions keys AFTER append: {session_store.session_ids()}")
     # --- END DEBUG ---
 
     if chunks and citations and guardrail_result in ("sufficient", "weak"):
@@ -795,10 +833,12 @@ async def save_history_node(state: ChatState) -> dict:
         cited_ids = {c.get("chunk_id") for c in citations}
         cited_chunks = [
             c for c in chunks
-            if c.get("metadata", {}).get("chunk_id") in cited_ids
+            if c.metadata.get("chunk_id") in cited_ids
         ]
         if cited_chunks:
             session_store.update_topic(session_id, cited_chunks)
+            # Retrieve the likely follow-ups while the user reads the answer
+            prefetch.schedule(session_id, session_store.get_topic(session_id), _RETRIEVE_TOP_K)
 
     print(
         f"[SaveHistory] Topic after update: "
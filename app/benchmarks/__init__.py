@@ -0,0 +1 @@
+"""Offline benchmarks for embedding backends and vector indexes."""
@@ -0,0 +1,157 @@
+"""
+Embedding Backend Benchmark
+
+Measures, for each embedding provider:
+  - per-query embedding latency (p50 / p95) on the golden NG12 queries
+  - embedding throughput (texts/sec) at several batch sizes
+  - recall@k on the golden query set: a query is a hit when any of its
+    top-k documents (exact cosine search over the indexable chunks) maps
+    to one of the expected rule IDs
+
+Can be run standalone:
+  python -m app.benchmarks.embedding_bench [backend ...]
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.config import settings
+from app.core.embeddings import EmbeddingProvider, create_provider
+from app.ingestion.chunker import chunk_ng12, parse_pdf_to_lines
+from app.ingestion.ingest import INDEXABLE_TYPES
+
+GOLDEN_QUERIES_PATH = Path("data/golden_queries.json")
+DEFAULT_BACKENDS = ("hashing", "onnx", "vertex")
+BATCH_SIZES = (1, 8, 32, 128)
+RECALL_K = (1, 5, 10)
+
+
+def load_golden_queries(path: Path = GOLDEN_QUERIES_PATH) -> list[dict]:
+    """Load the golden query set: [{"query": ..., "expected_rules": [...]}]."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def chunk_rules(chunk: dict) -> set[str]:
+    """Return the NG12 rule IDs a search chunk stands for.
+
+    rule_search chunks map to their own rule_id; symptom_index chunks map
+    to every rule they cross-reference.
+    """
+    meta = chunk["metadata"]
+    if meta.get("rule_id"):
+        return {meta["rule_id"]}
+    refs = json.loads(meta.get("references_json", "[]"))
+    return {ref.strip("[]") for ref in refs}
+
+
+def golden_recall(
+    doc_vectors: np.ndarray,
+    doc_rules: list[set[str]],
+    query_vectors: np.ndarray,
+    expected: list[set[str]],
+    k: int,
+) -> float:
+    """Fraction of queries whose top-k documents hit an expected rule."""
+    docs = doc_vectors / np.linalg.norm(doc_vectors, axis=1, keepdims=True)
+    queries = query_vectors / np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    k = min(k, len(docs))
+    top = np.argpartition(-(queries @ docs.T), k - 1, axis=1)[:, :k]
+    hits = sum(
+        1 for row, want in zip(top, expected)
+        if any(doc_rules[i] & want for i in row)
+    )
+    return hits / len(expected) if expected else 0.0
+
+
+def benchmark_provider(
+    provider: EmbeddingProvider,
+    docs: list[str],
+    doc_rules: list[set[str]],
+    golden: list[dict],
+) -> dict:
+    """Run latency, throughput and recall measurements for one provider."""
+    queries = [g["query"] for g in golden]
+    expected = [set(g["expected_rules"]) for g in golden]
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        provider.embed([query])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    throughput = {}
+    for batch_size in BATCH_SIZES:
+        start = time.perf_counter()
+        for i in range(0, len(docs), batch_size):
+            provider.embed(docs[i:i + batch_size])
+        throughput[batch_size] = len(docs) / (time.perf_counter() - start)
+
+    doc_vectors = np.asarray(provider.embed(docs), dtype=np.float32)
+    query_vectors = np.asarray(provider.embed(queries), dtype=np.float32)
+
+    return {
+        "backend": provider.name,
+        "dim": doc_vectors.shape[1],
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        **{f"texts/s@{bs}": rate for bs, rate in throughput.items()},
+        **{
+            f"recall@{k}": golden_recall(
+                doc_vectors, doc_rules, query_vectors, expected, k
+            )
+            for k in RECALL_K
+        },
+    }
+
+
+def run_benchmark(backends: list[str], pdf_path: str) -> list[dict]:
+    """Benchmark each backend on the NG12 corpus and print a summary table.
+
+    Backends that fail to initialise (e.g. Vertex without credentials, or
+    ONNX without the model cached) are reported and skipped.
+    """
+    chunks = [
+        c for c in chunk_ng12(
+            parse_pdf_to_lines(pdf_path),
+            multi_vector=settings.MULTI_VECTOR_INDEX,
+        )
+        if c["metadata"].get("doc_type") in INDEXABLE_TYPES
+    ]
+    docs = [c["text"] for c in chunks]
+    doc_rules = [chunk_rules(c) for c in chunks]
+    golden = load_golden_queries()
+
+    rows = []
+    for backend in backends:
+        try:
+            provider = create_provider(backend)
+            provider.embed(["warm-up"])
+        except Exception as exc:
+            print(f"[Bench] Skipping {backend}: {exc}")
+            continue
+        print(f"[Bench] {backend}: {len(docs)} docs, {len(golden)} golden queries")
+        rows.append(benchmark_provider(provider, docs, doc_rules, golden))
+
+    columns = (
+        ["backend", "dim", "p50_ms", "p95_ms"]
+        + [f"texts/s@{bs}" for bs in BATCH_SIZES]
+        + [f"recall@{k}" for k in RECALL_K]
+    )
+    print("\n" + "".join(f"{c:>13}" for c in columns))
+    for row in rows:
+        print("".join(
+            f"{row[c]:>13.3f}" if isinstance(row[c], float) else f"{row[c]:>13}"
+            for c in columns
+        ))
+    return rows
+
+
+if __name__ == "__main__":
+    run_benchmark(sys.argv[1:] or list(DEFAULT_BACKENDS), settings.PDF_PATH)
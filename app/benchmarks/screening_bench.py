@@ -0,0 +1,127 @@
+"""
+Bulk Screening Benchmark
+
+Measures the throughput of the compiled rule matcher
+(app.core.screening) on synthetic patient populations, against the
+per-patient symptom-to-rule lookup (RuleIndex.lookup) it vectorises.
+
+The rule table is built straight from the NG12 PDF (no embeddings or
+vector store needed).  Synthetic patients draw 1-4 symptoms from the
+rule vocabulary - with "persistent" / "unexplained" qualifiers - mixed
+with symptoms no rule mentions, plus random age, gender and smoking
+history.
+
+Reports, per population size:
+  - per-patient lookup loop: patients/sec
+  - compiled matcher (candidate_counts): patients/sec
+  - compiled matcher incl. building the recommendation lists (screen)
+  - agreement with the lookup loop (1.0 = identical)
+
+Can be run standalone:
+  python -m app.benchmarks.screening_bench [population_size ...]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+from app.config import settings
+from app.core.rule_index import RuleIndex
+from app.core.screening import ScreeningEngine
+from app.ingestion.chunker import SYNONYM_MAP, chunk_ng12, parse_pdf_to_lines
+
+DEFAULT_SIZES = (1_000, 10_000, 50_000)
+QUALIFIERS = ("", "", "persistent ", "unexplained ")
+OFF_VOCABULARY = (
+    "sore throat", "headache", "back pain", "dizziness", "rash",
+    "joint pain", "insomnia", "palpitations",
+)
+GENDERS = ("Male", "Female")
+SMOKING = ("Never Smoked", "Ex-Smoker", "Current Smoker")
+
+
+def build_rule_index(pdf_path: str) -> RuleIndex:
+    """Rule table from the canonical chunks of the NG12 PDF."""
+    chunks = chunk_ng12(parse_pdf_to_lines(pdf_path))
+    canonicals = [c for c in chunks if c["metadata"].get("doc_type") == "rule_canonical"]
+    return RuleIndex.from_canonicals(canonicals, SYNONYM_MAP)
+
+
+def synthetic_patients(index: RuleIndex, n: int, seed: int = 0) -> list[dict]:
+    """Generate *n* reproducible synthetic patient records."""
+    rng = random.Random(seed)
+    vocabulary = list(index.terms) + list(OFF_VOCABULARY)
+    return [
+        {
+            "patient_id": f"SYN-{i:06d}",
+            "age": rng.randint(16, 90),
+            "gender": rng.choice(GENDERS),
+            "smoking_history": rng.choice(SMOKING),
+            "symptoms": [
+                rng.choice(QUALIFIERS) + symptom
+                for symptom in rng.sample(vocabulary, rng.randint(1, 4))
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+def _rate(n: int, seconds: float) -> float:
+    return n / seconds if seconds else float("inf")
+
+
+def run_benchmark(pdf_path: str, sizes: tuple[int, ...] = DEFAULT_SIZES) -> list[dict]:
+    """Time the lookup loop and the compiled matcher; print a table."""
+    index = build_rule_index(pdf_path)
+    engine = ScreeningEngine(index)
+    print(
+        f"[Bench] {len(index)} rules, {len(index.terms)} symptom terms, "
+        f"{engine.rule_terms.shape[1]} bitset word(s)"
+    )
+
+    rows = []
+    for n in sizes:
+        patients = synthetic_patients(index, n)
+
+        start = time.perf_counter()
+        looked_up = [index.lookup(p) for p in patients]
+        loop_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine.candidate_counts(patients)
+        match_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        screened = engine.screen(patients)
+        screen_s = time.perf_counter() - start
+
+        agree = sum(
+            [(m["rule_id"], m["matched_symptoms"]) for m in s] == l
+            for s, l in zip(screened, looked_up)
+        )
+        rows.append({
+            "patients": n,
+            "loop_per_s": _rate(n, loop_s),
+            "match_per_s": _rate(n, match_s),
+            "screen_per_s": _rate(n, screen_s),
+            "agreement": agree / n,
+        })
+
+    columns = ["patients", "loop_per_s", "match_per_s", "screen_per_s", "agreement"]
+    print("\n" + "".join(f"{c:>14}" for c in columns))
+    for row in rows:
+        print("".join(
+            f"{row[c]:>14.3f}" if c == "agreement" else
+            f"{row[c]:>14,.0f}" if isinstance(row[c], float) else f"{row[c]:>14}"
+            for c in columns
+        ))
+    return rows
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        settings.PDF_PATH,
+        tuple(int(a) for a in sys.argv[1:]) or DEFAULT_SIZES,
+    )
@@ -0,0 +1,143 @@
+"""
+Vector Index Benchmark
+
+Compares the vector backends (app.core.vector_backends) on the NG12
+corpus.  Every backend is built from the same precomputed embeddings in
+a scratch directory, so only the search step is timed; query embedding
+cost is excluded.
+
+Reports, per backend:
+  - build time (add + snapshot) in milliseconds
+  - p50 / p95 / mean query latency in microseconds (golden queries)
+  - overlap@k with the exact (numpy) result set (1.0 = identical)
+
+Can be run standalone:
+  python -m app.benchmarks.vector_index_bench [embedding_backend [vector_backend ...]]
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.benchmarks.embedding_bench import load_golden_queries
+from app.config import settings
+from app.core.embeddings import create_provider
+from app.core.vector_backends import VECTOR_BACKENDS, create_backend
+from app.ingestion.chunker import chunk_ng12, parse_pdf_to_lines
+from app.ingestion.ingest import INDEXABLE_TYPES
+
+TOP_K = 15  # rag_pipeline over-fetches top_k * 3
+REPEATS = 20
+
+
+def _latency_stats(samples_us: list[float]) -> dict[str, float]:
+    return {
+        "p50_us": float(np.percentile(samples_us, 50)),
+        "p95_us": float(np.percentile(samples_us, 95)),
+        "mean_us": float(np.mean(samples_us)),
+    }
+
+
+def _time_queries(search, query_vectors: list[list[float]]) -> tuple[list[float], list[list[str]]]:
+    """Run every query REPEATS times; return latencies and the last result ids."""
+    samples = []
+    ids = []
+    for vector in query_vectors:
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            hits = search(vector)
+            samples.append((time.perf_counter() - start) * 1e6)
+        ids.append(hits)
+    return samples, ids
+
+
+def _overlap(results: list[list[str]], exact: list[list[str]]) -> float:
+    total = sum(len(set(r) & set(e)) / max(len(e), 1) for r, e in zip(results, exact))
+    return total / max(len(exact), 1)
+
+
+def run_benchmark(
+    backend: str,
+    pdf_path: str,
+    vector_backends: list[str] | None = None,
+) -> list[dict]:
+    """Build each vector backend over the NG12 search chunks and print a table.
+
+    Args:
+        backend: Embedding backend used for documents and queries.
+        pdf_path: Path to the NG12 guideline PDF file.
+        vector_backends: Backends to compare (default: all).  Backends whose
+            optional dependency is missing are reported and skipped.
+    """
+    chunks = [
+        c for c in chunk_ng12(
+            parse_pdf_to_lines(pdf_path),
+            multi_vector=settings.MULTI_VECTOR_INDEX,
+        )
+        if c["metadata"].get("doc_type") in INDEXABLE_TYPES
+    ]
+    provider = create_provider(backend)
+    ids = [c["chunk_id"] for c in chunks]
+    docs = [c["text"] for c in chunks]
+    metas = [{k: v for k, v in c["metadata"].items() if v is not None} for c in chunks]
+    doc_vectors = provider.embed(docs)
+    query_vectors = provider.embed([g["query"] for g in load_golden_queries()])
+    print(
+        f"[Bench] {provider.name}: {len(docs)} docs, dim {len(doc_vectors[0])}, "
+        f"{len(query_vectors)} queries x {REPEATS}, top_k={TOP_K}"
+    )
+
+    names = list(vector_backends or VECTOR_BACKENDS)
+    # numpy is exact, so it doubles as the reference for overlap
+    if "numpy" in names:
+        names.remove("numpy")
+    names.insert(0, "numpy")
+
+    rows = []
+    exact: list[list[str]] = []
+    for name in names:
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                index = create_backend(name, tmp)
+            except ImportError as exc:
+                print(f"[Bench] Skipping {name}: {exc}")
+                continue
+            start = time.perf_counter()
+            index.add(ids, docs, doc_vectors, metas)
+            index.snapshot()
+            build_ms = (time.perf_counter() - start) * 1000
+
+            def search(vector):
+                return [r.chunk_id for r in index.query(vector, TOP_K)]
+
+            samples, results = _time_queries(search, query_vectors)
+        if name == "numpy":
+            exact = results
+        rows.append({
+            "index": name,
+            "build_ms": build_ms,
+            **_latency_stats(samples),
+            "overlap": _overlap(results, exact),
+        })
+
+    columns = ["index", "build_ms", "p50_us", "p95_us", "mean_us", "overlap"]
+    print("\n" + "".join(f"{c:>12}" for c in columns))
+    for row in rows:
+        print("".join(
+            f"{row[c]:>12.1f}" if c.endswith(("_us", "_ms")) else
+            f"{row[c]:>12.3f}" if isinstance(row[c], float) else f"{row[c]:>12}"
+            for c in columns
+        ))
+    return rows
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        sys.argv[1] if len(sys.argv) > 1 else settings.EMBEDDING_BACKEND,
+        settings.PDF_PATH,
+        sys.argv[2:] or None,
+    )
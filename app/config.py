@@ -22,6 +22,81 @@ class Settings(BaseSettings):
     PDF_PATH: str = "data/ng12.pdf"
     PATIENTS_PATH: str = "data/patients.json"
 
+    # Embedding provider: "onnx", "vertex", "hashing" or "stub".  Vertex is
+    # opt-in: it changes the vector dimension and score scale, so the index
+    # must be re-ingested and the chat guardrail thresholds re-checked.
+    EMBEDDING_BACKEND: str = "onnx"
+    # Thread pool size for async query embedding on the request path
+    EMBEDDING_THREADS: int = 4
+    # Thread pool size for async vector store reads on the request path
+    VECTOR_STORE_THREADS: int = 4
+
+    # Dimensionality reduction of the search index: "none", "pca" or "random"
+    EMBEDDING_PROJECTION: str = "none"
+    EMBEDDING_PROJECTION_DIM: int = 128
+
+    # Search index backend: "chroma", "numpy" (exact, in memory), "hnsw" or
+    # "mmap" (exact, one read-only file mapped by every worker)
+    VECTOR_BACKEND: str = "chroma"
+    # ChromaDB server for client-server mode ("" = embedded PersistentClient)
+    CHROMA_SERVER_HOST: str = ""
+    CHROMA_SERVER_PORT: int = 8000
+    # Pooled HTTP connections per process to the ChromaDB server
+    CHROMA_HTTP_MAX_CONNECTIONS: int = 8
+    CHROMA_HTTP_KEEPALIVE_SECS: float = 40.0
+
+    # Fuse BM25 lexical matches into dense retrieval
+    HYBRID_RETRIEVAL: bool = False
+    # Boost given to the best lexical match (scaled by relative BM25 score)
+    HYBRID_LEXICAL_WEIGHT: float = 0.3
+
+    # Apply patient gender/age as metadata filters before the vector search
+    # (requires an index ingested with the filter fields; only constraints
+    # that hold for a whole rule are filtered, the rest stay soft boosts)
+    PATIENT_PREFILTER: bool = False
+
+    # Assessments also retrieve per symptom (one batched call) and merge
+    ASSESSMENT_SYMPTOM_QUERIES: bool = False
+
+    # Assessments take rules matched by the symptom-to-rule index first;
+    # vector search only fills the remaining slots
+    RULE_INDEX_FASTPATH: bool = False
+
+    # Grow the candidate pool only until re-ranking can no longer change top_k
+    ADAPTIVE_FETCH: bool = False
+
+    # Search only the cancer-type partitions a chat query (or its session
+    # topic) names; requires an index ingested with the partition router
+    PARTITION_ROUTING: bool = False
+
+    # Chat re-ranking cascade: optional cross-encoder stage over the top
+    # results ("none", "minilm", "overlap"), and the re-ranking latency
+    # budget per request that decides how many results it may score
+    RERANK_CROSS_ENCODER: str = "none"
+    RERANK_CROSS_ENCODER_TOP_N: int = 5
+    RERANK_CROSS_ENCODER_WEIGHT: float = 0.1
+    RERANK_BUDGET_MS: float = 25.0
+
+    # Retrieve likely chat follow-ups in the background after each turn:
+    # predicted queries per turn and per-session result slots kept
+    SPECULATIVE_PREFETCH: bool = False
+    SPECULATIVE_PREFETCH_QUERIES: int = 3
+    SPECULATIVE_PREFETCH_SESSIONS: int = 64
+
+    # LRU + TTL cache of retrieve() results (0 entries disables it)
+    RETRIEVAL_CACHE_SIZE: int = 512
+    RETRIEVAL_CACHE_TTL: float = 600.0
+
+    # SQLite file holding chat sessions, shared by every worker process
+    # ("" = keep sessions in each process's memory; single worker only)
+    SESSION_DB_PATH: str = ""
+
+    # Index several vectors per rule (criteria + synonyms + template)
+    MULTI_VECTOR_INDEX: bool = False
+
+    # Preload client, collections and embedding model at startup
+    WARMUP_ON_STARTUP: bool = True
+
     model_config = SettingsConfigDict(env_file=str(_ENV_FILE), extra="ignore")
 
 
@@ -1,73 +1,231 @@
 """
-Vertex AI Embeddings
+Embedding Providers
 
-Provides an embedding function for ChromaDB backed by Vertex AI.
-Falls back to ChromaDB's default embedding when Google Cloud credentials
-are not configured.
+Pluggable embedding backends for the search index, selected with
+``settings.EMBEDDING_BACKEND``:
+  - vertex  : Vertex AI text-embedding-004
+  - onnx    : ChromaDB's local ONNX MiniLM model (Chroma's default)
+  - hashing : feature-hashed bag of words/bigrams, no model to load
+  - stub    : deterministic pseudo-random vectors, for tests
+
+The default is onnx, the model the index and the chat guardrail
+thresholds were built with.  Switching backends changes the vector
+dimension and score scale, so the index must be re-ingested afterwards.
+
+Every provider is also a ChromaDB-compatible embedding function
+(``provider(input) -> vectors``).
 """
 
+import asyncio
+import hashlib
 import logging
-from typing import Any
+import math
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_BACKENDS = ("vertex", "onnx", "hashing", "stub")
 
-def get_embedding_function() -> Any:
-    """Return a Vertex AI embedding function compatible with ChromaDB.
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
 
-    If Google Cloud credentials are not configured, returns None so that
-    ChromaDB can use its built-in default embedding model instead.
 
-    Returns:
-        A ChromaDB-compatible embedding function, or None.
+class EmbeddingProvider:
+    """Base class for embedding backends.
+
+    Subclasses implement ``embed``; ``__call__`` adapts it to ChromaDB's
+    embedding-function interface.
     """
-    if not settings.GOOGLE_CLOUD_PROJECT:
-        logger.info(
-            "GOOGLE_CLOUD_PROJECT not set - using ChromaDB default embeddings"
-        )
-        return None
 
-    try:
+    name = "base"
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed a batch of texts, returning one vector per text."""
+        raise NotImplementedError
+
+    def __call__(self, input: list[str]) -> list[list[float]]:
+        return self.embed(list(input))
+
+
+class VertexEmbeddingProvider(EmbeddingProvider):
+    """Vertex AI ``text-embedding-004`` (768 dims)."""
+
+    name = "vertex"
+    model_name = "text-embedding-004"
+
+    def __init__(self) -> None:
         from chromadb.utils.embedding_functions import (
             GoogleVertexEmbeddingFunction,
         )
 
-        ef = GoogleVertexEmbeddingFunction(
+        self._ef = GoogleVertexEmbeddingFunction(
             project_id=settings.GOOGLE_CLOUD_PROJECT,
             region=settings.GOOGLE_CLOUD_LOCATION,
-            model_name="text-embedding-004",
+            model_name=self.model_name,
         )
-        logger.info("Using Vertex AI embeddings (text-embedding-004)")
-        return ef
-    except Exception as exc:
-        logger.warning("Failed to initialize Vertex AI embeddings: %s", exc)
-        logger.info("Falling back to ChromaDB default embeddings")
-        return None
 
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [list(map(float, v)) for v in self._ef(texts)]
 
-def embed_text(text: str) -> list[float]:
-    """Generate an embedding vector for a single text string.
 
-    Uses the Vertex AI embedding model when available, otherwise returns
-    an empty list (callers should use ChromaDB's built-in embedding).
+class OnnxEmbeddingProvider(EmbeddingProvider):
+    """ChromaDB's bundled ONNX all-MiniLM-L6-v2 model (384 dims, CPU)."""
+
+    name = "onnx"
+
+    def __init__(self) -> None:
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+        self._ef = DefaultEmbeddingFunction()
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [list(map(float, v)) for v in self._ef(texts)]
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Lexical baseline: signed feature hashing of unigrams and bigrams.
+
+    Term counts are sub-linearly scaled (1 + log tf) and rows are
+    L2-normalised, so cosine similarity behaves like a TF-weighted
+    bag-of-words match.  Needs no model download and no fitting.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 1024) -> None:
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if value >> 63 else -1.0
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN_RE.findall(text.lower())
+            features = Counter(tokens)
+            features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+            for feature, tf in features.items():
+                idx, sign = self._bucket(feature)
+                out[row, idx] += sign * (1.0 + math.log(tf))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (out / norms).tolist()
+
+
+class StubEmbeddingProvider(EmbeddingProvider):
+    """Deterministic pseudo-random unit vectors seeded by the text hash.
+
+    Identical texts always map to identical vectors; unrelated texts are
+    near-orthogonal.  Intended for tests that need an index without a
+    model.
+    """
+
+    name = "stub"
+
+    def __init__(self, dim: int = 64) -> None:
+        self.dim = dim
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(
+                hashlib.sha256(text.encode("utf-8")).digest()[:8], "little"
+            )
+            v = np.random.default_rng(seed).standard_normal(self.dim)
+            vectors.append((v / np.linalg.norm(v)).tolist())
+        return vectors
+
+
+_PROVIDERS: dict[str, type[EmbeddingProvider]] = {
+    "vertex": VertexEmbeddingProvider,
+    "onnx": OnnxEmbeddingProvider,
+    "hashing": HashingEmbeddingProvider,
+    "stub": StubEmbeddingProvider,
+}
+
+_provider: EmbeddingProvider | None = None
+_executor: ThreadPoolExecutor | None = None
+
+
+def create_provider(backend: str) -> EmbeddingProvider:
+    """Instantiate an embedding provider by backend name.
+
+    Raises:
+        ValueError: If *backend* is not a known backend name.
+    """
+    if backend not in _PROVIDERS:
+        raise ValueError(
+            f"Unknown EMBEDDING_BACKEND {backend!r}; expected one of "
+            f"{list(EMBEDDING_BACKENDS)}"
+        )
+    return _PROVIDERS[backend]()
+
+
+def get_embedding_function() -> EmbeddingProvider:
+    """Return the process-wide embedding provider, creating it on first use.
+
+    The provider is ChromaDB-compatible and selected by
+    ``settings.EMBEDDING_BACKEND``.
+    """
+    global _provider
+    if _provider is None:
+        _provider = create_provider(settings.EMBEDDING_BACKEND)
+        logger.info("Using %s embeddings", _provider.name)
+    return _provider
+
+
+def embed_texts(texts: list[str]) -> list[list[float]]:
+    """Embed a batch of texts with the configured embedding provider.
 
     Args:
-        text: The input text to embed.
+        texts: The input texts.
 
     Returns:
-        A list of floats representing the embedding vector, or empty list.
+        One embedding vector (list of floats) per input text.
     """
-    if not settings.GOOGLE_CLOUD_PROJECT:
+    if not texts:
         return []
+    return get_embedding_function().embed(list(texts))
 
-    try:
-        from vertexai.language_models import TextEmbeddingModel
 
-        model = TextEmbeddingModel.from_pretrained("text-embedding-004")
-        embeddings = model.get_embeddings([text])
-        return embeddings[0].values
-    except Exception as exc:
-        logger.warning("embed_text failed: %s", exc)
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the dedicated embedding thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.EMBEDDING_THREADS,
+            thread_name_prefix="embed",
+        )
+    return _executor
+
+
+async def aembed_texts(texts: list[str]) -> list[list[float]]:
+    """Embed a batch of texts without blocking the event loop.
+
+    The (synchronous) provider call runs on a dedicated thread pool so
+    that network-bound Vertex calls and CPU-bound ONNX inference do not
+    stall other coroutines.
+    """
+    if not texts:
         return []
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), embed_texts, list(texts))
+
+
+def embed_text(text: str) -> list[float]:
+    """Generate an embedding vector for a single text string.
+
+    Args:
+        text: The input text to embed.
+
+    Returns:
+        A list of floats representing the embedding vector.
+    """
+    return embed_texts([text])[0]
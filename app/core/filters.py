@@ -0,0 +1,15 @@
+"""
+Patient Pre-filter Fields
+
+Sentinel values for the patient pre-filter fields (``gender_filter``,
+``age_floor``, ``age_ceiling``) that the chunker writes on every indexable
+chunk and the retrieval pipeline filters on.  A metadata ``where`` filter
+cannot match a missing key, so rules without a whole-rule constraint
+carry these.
+
+Kept free of imports so both the ingestion layer and app.core can use it.
+"""
+
+FILTER_ANY_GENDER = "Any"
+FILTER_AGE_FLOOR = 0
+FILTER_AGE_CEILING = 999
@@ -0,0 +1,62 @@
+"""
+Index File Helpers
+
+Structures derived at ingest (fitted projection, mapped index, rule index,
+partition router) are persisted next to the vector index and read by
+every worker process.  Writers replace a file atomically (write to a
+temporary name, then rename), so a reader never sees a partial file and a
+replaced file always gets a new inode.  Readers compare the file's
+``file_stamp`` against the one they loaded to notice that another process
+re-indexed, and reload.  Re-indexing itself is serialised across
+processes by ``ingest_lock``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+FileStamp = tuple[int, int]
+
+
+def file_stamp(path: Path | str) -> FileStamp | None:
+    """(inode, mtime_ns) of *path*, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+def write_json_atomic(path: Path | str, data: Any) -> None:
+    """Write *data* as JSON to *path* via a temporary file and rename."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def ingest_lock(persist_dir: Path | str) -> Iterator[None]:
+    """Hold an exclusive lock on *persist_dir* across worker processes.
+
+    Taken around the startup empty-store check and every re-ingest, so two
+    workers never rebuild the index files at the same time.
+    """
+    try:
+        import fcntl
+    except ImportError:  # Windows: no multi-worker deployment
+        yield
+        return
+    Path(persist_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(persist_dir) / ".ingest.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,155 @@
+"""
+Lexical (BM25) Index
+
+In-process inverted index over the search chunks, used alongside dense
+retrieval so that exact clinical terms ("haemoptysis") and rule numbers
+("1.3.4") are matched literally rather than left to the embedding model.
+
+Postings are stored CSR-style in flat NumPy arrays:
+  offsets[t] : offsets[t + 1]  -> slice of postings for term t
+  doc_ids    (int32)           -> chunk position
+  weights    (float32)         -> precomputed BM25 contribution
+so a query is one vectorised add per query term.
+
+Built over every search chunk through ``vector_store.derived_from_index``,
+so it is rebuilt after each ingest.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from typing import Any
+
+import numpy as np
+
+from app.core import vector_store
+
+logger = logging.getLogger(__name__)
+
+# Keeps dotted rule numbers ("1.3.4") and hyphenated terms as single tokens
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+_STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has",
+    "have", "in", "is", "it", "of", "on", "or", "that", "the", "this", "to",
+    "was", "what", "when", "which", "who", "with",
+})
+
+# Metadata fields folded into the indexed text of each chunk
+_INDEXED_FIELDS = (
+    "rule_id", "section", "cancer_type", "system_title", "sub_title",
+    "symptom", "possible_cancer",
+)
+# A chunk's own rule number counts this many times, so "1.3.4" ranks the
+# rule itself above symptom rows that merely cross-reference it
+_RULE_ID_WEIGHT = 3
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case word tokens, with stop words removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOP_WORDS]
+
+
+def _indexed_text(text: str, meta: dict[str, Any]) -> str:
+    fields = [str(meta[f]) for f in _INDEXED_FIELDS if meta.get(f)]
+    if meta.get("rule_id"):
+        fields.extend([meta["rule_id"]] * (_RULE_ID_WEIGHT - 1))
+    extra = " ".join(fields)
+    return f"{text} {extra}" if extra else text
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of documents."""
+
+    def __init__(
+        self,
+        ids: list[str],
+        texts: list[str],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        self.ids = list(ids)
+        self.vocab: dict[str, int] = {}
+
+        term_col: list[int] = []
+        doc_col: list[int] = []
+        tf_col: list[int] = []
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths[doc] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_col.append(self.vocab.setdefault(term, len(self.vocab)))
+                doc_col.append(doc)
+                tf_col.append(tf)
+
+        terms = np.asarray(term_col, dtype=np.int32)
+        docs = np.asarray(doc_col, dtype=np.int32)
+        tfs = np.asarray(tf_col, dtype=np.float32)
+        order = np.lexsort((docs, terms))
+        terms, docs, tfs = terms[order], docs[order], tfs[order]
+
+        counts = np.bincount(terms, minlength=len(self.vocab))
+        self.offsets = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+
+        df = counts.astype(np.float32)
+        avgdl = float(lengths.mean()) if len(texts) else 0.0
+        idf = np.log1p((len(texts) - df + 0.5) / (df + 0.5))
+        norm = k1 * (1.0 - b + b * lengths[docs] / (avgdl or 1.0))
+        self.doc_ids = docs
+        self.weights = (idf[terms] * tfs * (k1 + 1.0) / (tfs + norm)).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.offsets.nbytes + self.doc_ids.nbytes + self.weights.nbytes
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for *query* (0 = no term match)."""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for term in set(tokenize(query)):
+            t = self.vocab.get(term)
+            if t is None:
+                continue
+            start, end = self.offsets[t], self.offsets[t + 1]
+            # doc_ids are unique within a posting list, so fancy-index add is safe
+            scores[self.doc_ids[start:end]] += self.weights[start:end]
+        return scores
+
+    def search(self, query: str, top_k: int = 10) -> list[tuple[str, float]]:
+        """Return up to *top_k* (chunk_id, bm25_score) pairs, best first.
+
+        Documents with no matching term are never returned.
+        """
+        scores = self.scores(query)
+        hits = np.flatnonzero(scores)
+        if not len(hits) or top_k <= 0:
+            return []
+        if len(hits) > top_k:
+            hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+        hits = hits[np.lexsort((hits, -scores[hits]))]
+        return [(self.ids[i], float(scores[i])) for i in hits]
+
+
+def _build(data: dict[str, Any]) -> BM25Index:
+    """Build a BM25 index over every chunk in the search collection."""
+    texts = [
+        _indexed_text(doc, meta)
+        for doc, meta in zip(data["documents"], data["metadatas"])
+    ]
+    index = BM25Index(data["ids"], texts)
+    logger.info(
+        "Built BM25 index: %d docs, %d terms, %d KB",
+        len(index), len(index.vocab), index.nbytes // 1024,
+    )
+    return index
+
+
+def get_lexical_index() -> BM25Index:
+    """Return the process-wide BM25 index, rebuilding it when stale."""
+    return vector_store.derived_from_index("lexical_index", _build)
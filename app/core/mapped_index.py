@@ -0,0 +1,166 @@
+"""
+Memory-Mapped Read-Only Vector Index
+
+A :class:`NumpyIndex` exported to one flat file that every worker
+process maps read-only instead of loading.  Opening it parses a 64-byte
+header; the embeddings, ids, documents and metadata stay in the file and
+are read through the OS page cache, which shares the pages between all
+processes mapping the same file.  N workers therefore hold one copy of
+the index, and a new worker is ready without deserialising anything.
+
+File layout (little-endian):
+
+  header    magic, row count, dimension, matrix offset, table offset
+  matrix    rows x dim float32, L2-normalised, 64-byte aligned
+  table     3 * rows + 1 int64 byte offsets into the string blob
+  blob      UTF-8 ids, then documents, then metadata JSON, one per row
+
+String *k* of the blob spans ``table[k]:table[k + 1]``; row *i*'s id,
+document and metadata are strings ``i``, ``rows + i`` and
+``2 * rows + i``.  Metadata is decoded on first access and kept per row.
+
+Files are written to a temporary name and renamed into place, so a
+worker that already mapped the previous file keeps reading it intact.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.core.numpy_index import NumpyIndex
+from app.core.retrieval_hit import RetrievalHit
+
+MAGIC = b"NG12MIX1"
+_HEADER = struct.Struct("<8sQQQQ")
+_HEADER_SIZE = 64
+_ALIGN = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def save_mapped(index: NumpyIndex, path: Path | str) -> None:
+    """Export *index* to a memory-mappable file at *path* (atomic replace)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = index.get()
+    n, dim = len(rows), index.dim if rows else 0
+    strings = (
+        [r["chunk_id"] for r in rows]
+        + [r["text"] for r in rows]
+        + [json.dumps(r["metadata"]) for r in rows]
+    )
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+    matrix_offset = _HEADER_SIZE
+    matrix = np.ascontiguousarray(
+        np.asarray(index._matrix, dtype="<f4").reshape(n, dim)
+    )
+    table_offset = _aligned(matrix_offset + matrix.nbytes)
+
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, n, dim, matrix_offset, table_offset).ljust(_HEADER_SIZE, b"\0"))
+        f.write(matrix.tobytes())
+        f.write(b"\0" * (table_offset - matrix_offset - matrix.nbytes))
+        f.write(offsets.tobytes())
+        f.write(b"".join(encoded))
+    os.replace(tmp, path)
+
+
+class MappedIndex(NumpyIndex):
+    """Read-only :class:`NumpyIndex` backed by a memory-mapped file.
+
+    Search, ``get`` and ``embedding`` behave exactly as on the index that
+    was exported; ``add`` and ``reset`` are not supported.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, dim, matrix_offset, table_offset = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a mapped vector index")
+        self._n = n
+        self._matrix = np.frombuffer(
+            self._mm, dtype="<f4", count=n * dim, offset=matrix_offset,
+        ).reshape(n, dim)
+        self._offsets = np.frombuffer(
+            self._mm, dtype="<i8", count=3 * n + 1, offset=table_offset,
+        )
+        self._blob_offset = table_offset + self._offsets.nbytes
+        self._decoded: list[dict[str, Any] | None] = [None] * n
+        self._id_positions: dict[str, int] | None = None
+        self._all_metadatas: list[dict[str, Any]] | None = None
+
+    @classmethod
+    def open(cls, path: Path | str) -> "MappedIndex":
+        """Map the index file at *path*."""
+        return cls(path)
+
+    def _string(self, k: int) -> str:
+        start = self._blob_offset + int(self._offsets[k])
+        end = self._blob_offset + int(self._offsets[k + 1])
+        return self._mm[start:end].decode("utf-8")
+
+    def _metadata(self, pos: int) -> dict[str, Any]:
+        meta = self._decoded[pos]
+        if meta is None:
+            meta = self._decoded[pos] = json.loads(self._string(2 * self._n + pos))
+        return meta
+
+    @property
+    def _positions(self) -> dict[str, int]:
+        if self._id_positions is None:
+            self._id_positions = {self._string(i): i for i in range(self._n)}
+        return self._id_positions
+
+    def count(self) -> int:
+        return self._n
+
+    @property
+    def metadatas(self) -> list[dict[str, Any]]:
+        """Every row's metadata, decoded on first use (for where filters)."""
+        if self._all_metadatas is None:
+            self._all_metadatas = [self._metadata(pos) for pos in range(self._n)]
+        return self._all_metadatas
+
+    def add(self, ids, documents, embeddings, metadatas) -> None:
+        raise TypeError("MappedIndex is read-only; export a NumpyIndex instead")
+
+    def reset(self) -> None:
+        raise TypeError("MappedIndex is read-only")
+
+    def _hit(self, pos: int, score: float) -> RetrievalHit:
+        return RetrievalHit(
+            self._string(pos), self._string(self._n + pos), self._metadata(pos), score,
+        )
+
+    def _result(self, pos: int) -> dict[str, Any]:
+        return {
+            "chunk_id": self._string(pos),
+            "text": self._string(self._n + pos),
+            "metadata": dict(self._metadata(pos)),
+        }
+
+    def to_numpy(self) -> NumpyIndex:
+        """Writable in-memory copy (for upserts before the next export)."""
+        index = NumpyIndex()
+        rows = self.get()
+        index.add(
+            [r["chunk_id"] for r in rows],
+            [r["text"] for r in rows],
+            np.array(self._matrix),
+            [r["metadata"] for r in rows],
+        )
+        return index
@@ -0,0 +1,198 @@
+"""
+Exact In-Memory Vector Index
+
+Brute-force cosine search over a single contiguous float32 matrix of
+L2-normalised document embeddings, with parallel id / document /
+metadata arrays.  A query is one matrix-vector product plus an
+``argpartition`` - for the few hundred NG12 search chunks this is both
+faster than an HNSW lookup and exact (no approximate-neighbour misses,
+fully deterministic ordering).
+
+Persisted as a single ``.npz`` file next to the Chroma data.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.core.retrieval_hit import RetrievalHit
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class NumpyIndex:
+    """Exact cosine-similarity index held in memory.
+
+    Results use the same schema as the Chroma-backed store:
+    ``{"chunk_id", "text", "metadata", "score"}`` with score = cosine
+    similarity.  Ties are broken by insertion order so results are
+    reproducible across runs.
+    """
+
+    def __init__(self) -> None:
+        self._ids: list[str] = []
+        self._documents: list[str] = []
+        self._metadatas: list[dict[str, Any]] = []
+        self._positions: dict[str, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    @property
+    def dim(self) -> int:
+        return self._matrix.shape[1]
+
+    def count(self) -> int:
+        """Return the number of indexed documents."""
+        return len(self._ids)
+
+    def reset(self) -> None:
+        """Drop every document."""
+        self.__init__()
+
+    def add(
+        self,
+        ids: list[str],
+        documents: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        """Upsert documents: existing ids are overwritten in place.
+
+        Raises:
+            ValueError: If the embedding dimension differs from the index.
+        """
+        if not ids:
+            return
+        vectors = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        if self.count() and vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match "
+                f"index dimension {self.dim}"
+            )
+
+        new_rows = []
+        for i, doc_id in enumerate(ids):
+            pos = self._positions.get(doc_id)
+            if pos is None:
+                self._positions[doc_id] = len(self._ids)
+                self._ids.append(doc_id)
+                self._documents.append(documents[i])
+                self._metadatas.append(dict(metadatas[i]))
+                new_rows.append(i)
+            else:
+                self._documents[pos] = documents[i]
+                self._metadatas[pos] = dict(metadatas[i])
+                self._matrix[pos] = vectors[i]
+
+        if new_rows:
+            added = vectors[new_rows]
+            self._matrix = (
+                np.ascontiguousarray(np.vstack([self._matrix, added]))
+                if self._matrix.size else np.ascontiguousarray(added)
+            )
+
+    @property
+    def metadatas(self) -> list[dict[str, Any]]:
+        """Stored metadata, one dict per row (do not mutate)."""
+        return self._metadatas
+
+    def query(
+        self,
+        query_embedding: list[float],
+        top_k: int = 5,
+        mask: np.ndarray | None = None,
+    ) -> list[RetrievalHit]:
+        """Return the *top_k* most similar documents, best first.
+
+        Args:
+            query_embedding: Query vector (normalised here).
+            top_k: Number of results to return.
+            mask: Optional boolean row mask; only rows where it is True
+                are eligible.
+        """
+        return self.query_many([query_embedding], top_k=top_k, mask=mask)[0]
+
+    def query_many(
+        self,
+        query_embeddings: list[list[float]],
+        top_k: int = 5,
+        mask: np.ndarray | None = None,
+    ) -> list[list[RetrievalHit]]:
+        """Batched :meth:`query`: one matrix-matrix product for all queries.
+
+        Returns one result list per query, in input order.  Hits reference
+        the stored metadata dict rather than copying it; do not mutate it.
+        """
+        pool = np.arange(self.count()) if mask is None else np.flatnonzero(mask)
+        n = len(pool)
+        if n == 0 or top_k <= 0 or not len(query_embeddings):
+            return [[] for _ in query_embeddings]
+        q = _normalize_rows(np.asarray(query_embeddings, dtype=np.float32))
+        # A masked query only scores its own rows (cost scales with the pool)
+        matrix = self._matrix if mask is None else self._matrix[pool]
+        all_scores = q @ matrix.T
+
+        k = min(top_k, n)
+        batch = []
+        for scores in all_scores:
+            candidates = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+            # Primary key score (desc), secondary key position (asc); pool
+            # is ascending, so pool offsets order like row positions
+            order = candidates[np.lexsort((candidates, -scores[candidates]))]
+            batch.append([self._hit(int(pool[i]), float(scores[i])) for i in order])
+        return batch
+
+    def get(self, ids: list[str] | None = None) -> list[dict[str, Any]]:
+        """Return stored documents (all, or those in *ids* that exist)."""
+        if ids is None:
+            positions = range(self.count())
+        else:
+            positions = [self._positions[i] for i in ids if i in self._positions]
+        return [self._result(pos) for pos in positions]
+
+    def embedding(self, doc_id: str) -> list[float] | None:
+        """Return the stored (normalised) embedding for *doc_id*."""
+        pos = self._positions.get(doc_id)
+        return None if pos is None else self._matrix[pos].tolist()
+
+    def _hit(self, pos: int, score: float) -> RetrievalHit:
+        return RetrievalHit(self._ids[pos], self._documents[pos], self._metadatas[pos], score)
+
+    def _result(self, pos: int) -> dict[str, Any]:
+        return {
+            "chunk_id": self._ids[pos],
+            "text": self._documents[pos],
+            "metadata": dict(self._metadatas[pos]),
+        }
+
+    # ---- persistence -------------------------------------------------------
+    def save(self, path: Path | str) -> None:
+        """Write the index to a single .npz file (no pickling)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            matrix=self._matrix,
+            ids=np.asarray(self._ids, dtype=str),
+            documents=np.asarray(self._documents, dtype=str),
+            metadatas=np.asarray([json.dumps(m) for m in self._metadatas], dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "NumpyIndex":
+        """Read an index previously written by :meth:`save`."""
+        index = cls()
+        with np.load(path, allow_pickle=False) as data:
+            index._ids = data["ids"].tolist()
+            index._documents = data["documents"].tolist()
+            index._metadatas = [json.loads(m) for m in data["metadatas"].tolist()]
+            index._matrix = np.ascontiguousarray(data["matrix"], dtype=np.float32)
+        index._positions = {doc_id: i for i, doc_id in enumerate(index._ids)}
+        return index
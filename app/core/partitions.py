@@ -0,0 +1,242 @@
+"""
+Cancer-Type Partitions and Query Router
+
+The search collection is partitioned on metadata that every chunk
+already carries:
+
+  rule_search     -> cancer_type      (e.g. "Lung and pleural cancers")
+  symptom_index   -> possible_cancer  (Part B's cancer column, e.g. "Lung")
+
+A keyword router maps a chat query to the partitions it can be about.
+At ingest each ``KNOWN_CANCER_TYPES`` keyword is attached to the
+cancer_type of every rule whose canonical text names it, and to the
+symptom rows whose possible_cancer it is.  A query naming "lung" then
+searches only those partitions, as a metadata ``where`` filter on the
+similarity search, so every backend narrows its scan the same way.
+
+Resolution order for one query:
+
+  1. keywords in the query itself
+  2. keywords in the session topic (follow-ups such as "what about
+     under 40s?")
+  3. unresolved - search every partition
+
+Partitions no keyword points at (support, safety netting, diagnostic
+process) are always searched, so routing never hides a chunk it could
+not have targeted.
+
+Persisted as JSON next to the vector index, like the rule index, because
+the keyword list lives in the ingestion package.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+from app.core.index_files import FileStamp, file_stamp, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+ROUTER_FILENAME = "partition_router.json"
+
+# Metadata field holding the partition key, per search doc_type.
+# system_title is too coarse for symptom rows ("Non-specific features of
+# cancer" alone spans 20+ cancers), so they are keyed on possible_cancer.
+PARTITION_FIELDS: dict[str, str] = {
+    "rule_search": "cancer_type",
+    "symptom_index": "possible_cancer",
+}
+
+# (file stamp, router) - a rebuild by another worker changes the stamp
+_router: "tuple[FileStamp, PartitionRouter] | None" = None
+
+# How queries were resolved (see route_stats)
+_route_counts: Counter[str] = Counter()
+
+
+def _keyword_re(keywords: list[str]) -> re.Pattern | None:
+    if not keywords:
+        return None
+    alternation = "|".join(
+        re.escape(k) for k in sorted(keywords, key=len, reverse=True)
+    )
+    # Whole words, allowing a plural ("lungs") but not "anal" in "analysis"
+    return re.compile(rf"\b({alternation})(?:e?s)?\b", re.IGNORECASE)
+
+
+def partition_of(meta: dict[str, Any]) -> tuple[str, str] | None:
+    """``(field, value)`` partition of a search chunk, or None."""
+    field = PARTITION_FIELDS.get(meta.get("doc_type", ""))
+    if field is None or field not in meta:
+        return None
+    return field, meta[field]
+
+
+class PartitionRouter:
+    """Keyword -> partition map with a query-time classifier."""
+
+    def __init__(
+        self,
+        partitions: dict[str, dict[str, int]],
+        keywords: dict[str, list[list[str]]],
+    ) -> None:
+        self.partitions = partitions
+        self.keywords = {
+            k: [tuple(p) for p in parts] for k, parts in keywords.items()
+        }
+        routed = {p for parts in self.keywords.values() for p in parts}
+        self.always = [
+            (field, value)
+            for field, values in partitions.items()
+            for value in values
+            if (field, value) not in routed
+        ]
+        self._re = _keyword_re(list(self.keywords))
+
+    @classmethod
+    def from_chunks(
+        cls,
+        chunks: list[dict[str, Any]],
+        keywords: list[str],
+    ) -> "PartitionRouter":
+        """Build the router from the chunker's output.
+
+        Args:
+            chunks: Chunks (chunk_id, text, metadata) of every doc_type:
+                search chunks define the partitions, canonical rule text
+                supplies the keywords of each cancer_type.
+            keywords: Cancer-type keywords (the chunker's KNOWN_CANCER_TYPES).
+        """
+        keyword_re = _keyword_re(keywords)
+        partitions: dict[str, dict[str, int]] = {}
+        routes: dict[str, set[tuple[str, str]]] = {}
+
+        def _attach(text: str, partition: tuple[str, str]) -> None:
+            for match in keyword_re.finditer(text) if keyword_re else ():
+                routes.setdefault(match.group(1).lower(), set()).add(partition)
+
+        for chunk in chunks:
+            meta = chunk["metadata"]
+            if meta.get("doc_type") == "rule_canonical" and meta.get("cancer_type"):
+                _attach(chunk.get("text", ""), ("cancer_type", meta["cancer_type"]))
+                continue
+            partition = partition_of(meta)
+            if partition is None:
+                continue
+            field, value = partition
+            counts = partitions.setdefault(field, {})
+            counts[value] = counts.get(value, 0) + 1
+            if field == "possible_cancer":
+                _attach(value, partition)
+
+        return cls(
+            partitions,
+            {k: [list(p) for p in sorted(parts)] for k, parts in sorted(routes.items())},
+        )
+
+    def __len__(self) -> int:
+        return sum(len(values) for values in self.partitions.values())
+
+    def resolve(self, text: str) -> list[tuple[str, str]]:
+        """Partitions named by keywords in *text* ([] if none)."""
+        if self._re is None or not text:
+            return []
+        found: dict[tuple[str, str], None] = {}
+        for match in self._re.finditer(text):
+            for partition in self.keywords.get(match.group(1).lower(), []):
+                found[partition] = None
+        return list(found)
+
+    def route(self, query: str, topic: str = "") -> dict[str, Any] | None:
+        """``where`` filter restricting *query* to its partitions.
+
+        Falls back to the session *topic* when the query names no cancer
+        type, and returns None (search everything) when neither does.
+        """
+        selected = self.resolve(query)
+        source = "query"
+        if not selected:
+            selected = self.resolve(topic)
+            source = "topic"
+        if not selected:
+            _route_counts["unrouted"] += 1
+            return None
+        _route_counts[source] += 1
+
+        by_field: dict[str, set[str]] = {}
+        for field, value in [*selected, *self.always]:
+            by_field.setdefault(field, set()).add(value)
+        clauses = [
+            {field: {"$in": sorted(values)}} for field, values in sorted(by_field.items())
+        ]
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    # ---- persistence -------------------------------------------------------
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "partitions": self.partitions,
+            "keywords": {k: [list(p) for p in parts] for k, parts in self.keywords.items()},
+        }
+
+    def save(self, path: Path | str) -> None:
+        write_json_atomic(path, self.to_dict())
+
+    @classmethod
+    def load(cls, path: Path | str) -> "PartitionRouter":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["partitions"], data["keywords"])
+
+
+def _router_path() -> Path:
+    return Path(settings.CHROMA_PERSIST_DIR) / ROUTER_FILENAME
+
+
+def rebuild(chunks: list[dict[str, Any]], keywords: list[str]) -> PartitionRouter:
+    """Build the router from ingested chunks, persist it and make it current."""
+    global _router
+    router = PartitionRouter.from_chunks(chunks, keywords)
+    router.save(_router_path())
+    _router = (file_stamp(_router_path()), router)
+    return router
+
+
+def get_router() -> PartitionRouter | None:
+    """Return the partition router, loading it from disk on first use.
+
+    Reloaded whenever the file changes, so every worker follows a
+    re-ingest run in any process.  Returns None when no ingest has
+    written one yet.
+    """
+    global _router
+    stamp = file_stamp(_router_path())
+    if stamp is None:
+        _router = None
+        return None
+    cached = _router
+    if cached is None or cached[0] != stamp:
+        router = PartitionRouter.load(_router_path())
+        cached = _router = (stamp, router)
+        logger.info(
+            "Loaded partition router: %d partitions, %d keywords",
+            len(router), len(router.keywords),
+        )
+    return cached[1]
+
+
+def route(query: str, topic: str = "") -> dict[str, Any] | None:
+    """Route *query* with the current router (None = search everything)."""
+    router = get_router()
+    return None if router is None else router.route(query, topic)
+
+
+def route_stats() -> dict[str, int]:
+    """How many queries were routed by their own text, by the session
+    topic, or not at all."""
+    return {key: _route_counts[key] for key in ("query", "topic", "unrouted")}
@@ -0,0 +1,207 @@
+"""
+Patient-Mode Feature Table
+
+Columnar copy of the chunk metadata used by patient-mode re-ranking, so
+that the age / symptom / smoking / gender boosts for all candidates are
+computed in a handful of NumPy operations instead of a per-candidate
+Python loop:
+
+  age_min, age_max  float32   (NaN = no threshold)
+  gender            int8      (0 = any, 1 = Female, 2 = Male)
+  smoking           bool      risk_factor_smoking
+  symptoms          uint64    bitset over the corpus symptom vocabulary,
+                              shape (n_chunks, n_words)
+
+Search chunks carry only a rule_id and the pre-filter fields; the rule
+conditions these columns hold (age_min, gender_specific,
+symptom_keywords_json, risk_factor_smoking) are extracted onto the
+canonical chunks.  Rows with a rule_id therefore take their features from
+the canonical metadata joined on rule_id; other rows (symptom_index) use
+their own metadata.
+
+One table per index generation, kept by ``vector_store.derived_from_index``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any
+
+import numpy as np
+
+from app.core import vector_store
+
+logger = logging.getLogger(__name__)
+
+GENDER_CODES = {"Female": 1, "Male": 2}
+
+# Boost weights (see rag_pipeline.retrieve)
+AGE_BOOST = 0.15
+SYMPTOM_BOOST = 0.1
+SMOKING_BOOST = 0.1
+GENDER_MATCH_BOOST = 0.05
+GENDER_CLASH_PENALTY = -0.3
+
+
+def _symptom_keywords(meta: dict[str, Any]) -> list[str]:
+    symptoms = meta.get("symptom_keywords")
+    if symptoms is None:
+        symptoms = meta.get("symptom_keywords_json", [])
+    if isinstance(symptoms, str):
+        try:
+            symptoms = json.loads(symptoms)
+        except (json.JSONDecodeError, TypeError):
+            symptoms = []
+    return list(symptoms or [])
+
+
+def rule_metadata(metadatas: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Metadata to read each chunk's rule features from (see module docstring).
+
+    Chunks whose rule is missing from the canonical collection keep their
+    own metadata.
+    """
+    rule_ids = {m["rule_id"] for m in metadatas if m.get("rule_id")}
+    if not rule_ids:
+        return metadatas
+    canonicals = vector_store.get_canonicals(sorted(rule_ids))
+    return [
+        canonicals[m["rule_id"]]["metadata"] if m.get("rule_id") in canonicals else m
+        for m in metadatas
+    ]
+
+
+class FeatureTable:
+    """Patient-mode features for a fixed list of chunks."""
+
+    def __init__(self, ids: list[str], metadatas: list[dict[str, Any]]) -> None:
+        n = len(ids)
+        self.positions = {chunk_id: i for i, chunk_id in enumerate(ids)}
+        self.age_min = np.full(n, np.nan, dtype=np.float32)
+        self.age_max = np.full(n, np.nan, dtype=np.float32)
+        self.gender = np.zeros(n, dtype=np.int8)
+        self.smoking = np.zeros(n, dtype=bool)
+
+        chunk_symptoms = [_symptom_keywords(meta) for meta in metadatas]
+        self.vocab = sorted({s for symptoms in chunk_symptoms for s in symptoms})
+        bit_of = {s: i for i, s in enumerate(self.vocab)}
+        self.symptoms = np.zeros((n, max(1, -(-len(self.vocab) // 64))), dtype=np.uint64)
+        self._symptom_masks: dict[str, np.ndarray] = {}
+
+        for i, meta in enumerate(metadatas):
+            if meta.get("age_min") is not None:
+                self.age_min[i] = meta["age_min"]
+            if meta.get("age_max") is not None:
+                self.age_max[i] = meta["age_max"]
+            self.gender[i] = GENDER_CODES.get(meta.get("gender_specific"), 0)
+            self.smoking[i] = bool(meta.get("risk_factor_smoking"))
+            for symptom in chunk_symptoms[i]:
+                bit = bit_of[symptom]
+                self.symptoms[i, bit // 64] |= np.uint64(1 << (bit % 64))
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def rows(self, chunk_ids: list[str]) -> np.ndarray | None:
+        """Row index for each chunk id, or None if any id is unknown."""
+        try:
+            return np.fromiter(
+                (self.positions[c] for c in chunk_ids), dtype=np.int64,
+                count=len(chunk_ids),
+            )
+        except KeyError:
+            return None
+
+    def symptom_mask(self, patient_symptom: str) -> np.ndarray:
+        """Bitset of vocabulary keywords matching one patient symptom.
+
+        A keyword matches when either string contains the other, as in
+        the original per-candidate loop.
+        """
+        mask = self._symptom_masks.get(patient_symptom)
+        if mask is None:
+            mask = np.zeros(self.symptoms.shape[1], dtype=np.uint64)
+            for bit, keyword in enumerate(self.vocab):
+                if keyword in patient_symptom or patient_symptom in keyword:
+                    mask[bit // 64] |= np.uint64(1 << (bit % 64))
+            self._symptom_masks[patient_symptom] = mask
+        return mask
+
+    def boosts(self, rows: np.ndarray, patient_data: dict) -> np.ndarray:
+        """Patient-mode score adjustment for each row in *rows*."""
+        patient_age = patient_data.get("age", 0)
+        patient_smoking = patient_data.get("smoking_history", "Never Smoked")
+        patient_gender = GENDER_CODES.get(patient_data.get("gender", ""), 0)
+
+        boost = np.zeros(len(rows), dtype=np.float64)
+
+        # Age thresholds (NaN compares False, i.e. no threshold -> no boost)
+        with np.errstate(invalid="ignore"):
+            boost += AGE_BOOST * (patient_age >= self.age_min[rows])
+            boost += AGE_BOOST * (patient_age < self.age_max[rows])
+
+        # Symptom overlap: number of patient symptoms hitting any keyword
+        patient_symptoms = [s.lower() for s in patient_data.get("symptoms", [])]
+        if patient_symptoms and self.vocab:
+            masks = np.stack([self.symptom_mask(s) for s in patient_symptoms])
+            hits = (self.symptoms[rows][:, None, :] & masks[None, :, :]) != 0
+            boost += SYMPTOM_BOOST * hits.any(axis=2).sum(axis=1)
+
+        # Smoking risk factor
+        if patient_smoking != "Never Smoked":
+            boost += SMOKING_BOOST * self.smoking[rows]
+
+        # Gender match / clash
+        if patient_gender:
+            gender = self.gender[rows]
+            boost += np.where(
+                gender == patient_gender, GENDER_MATCH_BOOST,
+                np.where(gender != 0, GENDER_CLASH_PENALTY, 0.0),
+            )
+        return boost
+
+
+def max_boost(patient_data: dict) -> float:
+    """Largest boost any indexed chunk receives for this patient.
+
+    One vectorised pass over the whole table; a tight upper bound for
+    chunks that have not been fetched yet (see rag_pipeline._rank_adaptive).
+    """
+    table = get_feature_table()
+    if not len(table):
+        return 0.0
+    return float(table.boosts(np.arange(len(table)), patient_data).max())
+
+
+def _build(data: dict[str, Any]) -> FeatureTable:
+    """Build the feature table over every chunk in the search collection."""
+    table = FeatureTable(data["ids"], rule_metadata(data["metadatas"]))
+    logger.info(
+        "Built patient feature table: %d chunks, %d symptom keywords",
+        len(table), len(table.vocab),
+    )
+    return table
+
+
+def get_feature_table() -> FeatureTable:
+    """Return the process-wide feature table, rebuilding it when stale."""
+    return vector_store.derived_from_index("patient_features", _build)
+
+
+def patient_boosts(results: list[dict[str, Any]], patient_data: dict) -> np.ndarray:
+    """Patient-mode score adjustment for each retrieval result.
+
+    Uses the precomputed table; candidates unknown to it (e.g. a result
+    list not produced by the current index) get a table built from their
+    (rule) metadata instead.
+    """
+    table = get_feature_table()
+    rows = table.rows([r["chunk_id"] for r in results])
+    if rows is None:
+        table = FeatureTable(
+            [r["chunk_id"] for r in results],
+            rule_metadata([r.get("metadata", {}) for r in results]),
+        )
+        rows = np.arange(len(results))
+    return table.boosts(rows, patient_data)
@@ -0,0 +1,184 @@
+"""
+Speculative Follow-Up Retrieval
+
+After a chat turn updates the session topic, the follow-ups the query
+builder is most likely to build next - the topic followed by one of the
+common follow-up openings in ``query_builder._FOLLOWUP_STARTERS`` ("what
+about", "and if", ...) - are retrieved in the background while the user
+reads the answer, and kept in a small per-session slot.
+
+A follow-up that is only such an opening plus context words ("what about
+it?", "can you explain that?") then starts with its retrieval already
+done; one that adds terms of its own ("what about under 40s?") is
+retrieved as usual.  A follow-up arriving while its prefetch is still
+running waits for that retrieval instead of starting a second one.
+
+Budget:
+  SPECULATIVE_PREFETCH_QUERIES   predicted follow-ups per turn, retrieved
+                                 as one batched call
+  SPECULATIVE_PREFETCH_SESSIONS  slots kept (least recently used evicted)
+
+A prefetch is skipped while the index thread pool has queued work, so
+speculation never delays a live request.  Slots are tied to the topic,
+top_k and index generation they were built for.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter, OrderedDict
+from typing import Any
+
+from app.config import settings
+from app.core import lexical_index, rag_pipeline, retrieval_cache, vector_store
+from app.core.query_builder import _CONTEXT_PRONOUNS, _FOLLOWUP_STARTERS, _STRIP_PUNCT_RE
+
+logger = logging.getLogger(__name__)
+
+# Words a follow-up may add to its opening and still only refer back to
+# the topic (lexical_index.tokenize already drops common stop words)
+_FILLER_WORDS = frozenset({
+    "about", "again", "can", "could", "do", "does", "explain", "how", "i",
+    "if", "me", "mean", "more", "one", "ones", "please", "so", "tell",
+    "then", "you",
+})
+
+# Openings as they appear after punctuation is stripped, longest first
+_STARTERS = sorted(
+    ((_STRIP_PUNCT_RE.sub("", s), s) for s in _FOLLOWUP_STARTERS),
+    key=lambda pair: len(pair[0]),
+    reverse=True,
+)
+
+_slots: "OrderedDict[str, _Slot]" = OrderedDict()
+
+# Prefetch outcomes (see prefetch_stats)
+_counts: Counter[str] = Counter()
+
+
+class _Slot:
+    """One session's in-flight or finished prefetch."""
+
+    def __init__(self, topic: str, top_k: int, predictions: list[tuple[str, str]]) -> None:
+        self.topic = topic
+        self.top_k = top_k
+        # starter -> the query retrieved for it
+        self.queries = dict(predictions)
+        self.generation = vector_store.index_generation()
+        self.task: asyncio.Task | None = None
+
+    def matches(self, topic: str, top_k: int) -> bool:
+        return (
+            self.topic == topic
+            and self.top_k == top_k
+            and self.generation == vector_store.index_generation()
+        )
+
+
+def predicted_queries(topic: str, limit: int) -> list[tuple[str, str]]:
+    """``(starter, query)`` for the *limit* likeliest follow-ups on *topic*,
+    phrased as the query builder would enrich them."""
+    return [(starter, f"{topic} {starter}") for starter in _FOLLOWUP_STARTERS[:limit]]
+
+
+def topic_only_starter(message: str) -> str | None:
+    """The follow-up opening of *message* when it adds no terms of its own."""
+    text = _STRIP_PUNCT_RE.sub("", message.lower()).strip()
+    for stripped, starter in _STARTERS:
+        if text == stripped or text.startswith(stripped + " "):
+            rest = set(lexical_index.tokenize(text[len(stripped):]))
+            return starter if rest <= _FILLER_WORDS | _CONTEXT_PRONOUNS else None
+    return None
+
+
+async def _retrieve(slot: _Slot, predictions: list[tuple[str, str]]) -> dict[str, list[Any]]:
+    batch = await rag_pipeline.aretrieve_many(
+        [query for _, query in predictions], top_k=slot.top_k, topic=slot.topic,
+    )
+    return {starter: results for (starter, _), results in zip(predictions, batch)}
+
+
+def _finished(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        _counts["failed"] += 1
+        logger.warning("Speculative prefetch failed: %s", task.exception())
+
+
+def schedule(session_id: str, topic: str, top_k: int) -> bool:
+    """Start prefetching the likely follow-ups to *session_id*'s *topic*.
+
+    Must be called from the event loop; the retrieval runs as a
+    background task.  Returns False when nothing was started (disabled,
+    this topic already prefetched, or the index pool is busy).
+    """
+    if not settings.SPECULATIVE_PREFETCH or not topic:
+        return False
+    slot = _slots.get(session_id)
+    if slot is not None and slot.matches(topic, top_k):
+        return False
+    if vector_store.index_pool_stats()["queued"]:
+        _counts["skipped_busy"] += 1
+        return False
+
+    discard(session_id)
+    predictions = predicted_queries(topic, settings.SPECULATIVE_PREFETCH_QUERIES)
+    slot = _Slot(topic, top_k, predictions)
+    slot.task = asyncio.get_running_loop().create_task(_retrieve(slot, predictions))
+    slot.task.add_done_callback(_finished)
+    _slots[session_id] = slot
+    while len(_slots) > settings.SPECULATIVE_PREFETCH_SESSIONS:
+        discard(next(iter(_slots)))
+    _counts["scheduled"] += 1
+    return True
+
+
+async def take(
+    session_id: str, message: str, topic: str, top_k: int,
+) -> tuple[str, list[Any]] | None:
+    """``(query, results)`` prefetched for a follow-up turn, or None to
+    retrieve as usual.
+
+    Only a topic-only follow-up (see :func:`topic_only_starter`) whose
+    opening was predicted for the session's current topic is served.
+    *query* is the predicted query the results were retrieved for, which
+    can differ in wording from the one built from *message*.
+    """
+    slot = _slots.get(session_id)
+    if slot is None or not settings.SPECULATIVE_PREFETCH:
+        return None
+    starter = topic_only_starter(message)
+    if starter not in slot.queries or not slot.matches(topic, top_k) or slot.task.cancelled():
+        _counts["misses"] += 1
+        return None
+    try:
+        prefetched = await asyncio.shield(slot.task)
+    except Exception:  # noqa: BLE001 - logged by _finished
+        _counts["misses"] += 1
+        return None
+    _slots.move_to_end(session_id)
+    _counts["hits"] += 1
+    return slot.queries[starter], retrieval_cache.copy_results(prefetched[starter])
+
+
+def discard(session_id: str) -> None:
+    """Drop a session's slot, cancelling a prefetch still in flight."""
+    slot = _slots.pop(session_id, None)
+    if slot is not None and slot.task is not None:
+        slot.task.cancel()
+
+
+def clear() -> None:
+    """Drop every slot."""
+    for session_id in list(_slots):
+        discard(session_id)
+
+
+def prefetch_stats() -> dict[str, int]:
+    """Slots held and how prefetches were used."""
+    stats = {
+        key: _counts[key]
+        for key in ("scheduled", "skipped_busy", "hits", "misses", "failed")
+    }
+    stats["sessions"] = len(_slots)
+    return stats
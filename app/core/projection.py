@@ -0,0 +1,160 @@
+"""
+Embedding Projection
+
+Fits a linear projection (PCA or Gaussian random projection) on the corpus
+embeddings at ingest time so that documents and queries can be searched in
+a reduced space (e.g. 768 -> 128 dims).  The fitted matrix is stored next
+to the vector index and applied to every query embedding.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+PROJECTION_METHODS = {"pca", "random"}
+
+
+class Projection:
+    """A fitted linear map from the full embedding space to a reduced one.
+
+    ``transform`` subtracts ``mean``, multiplies by the projection matrix
+    and L2-normalises each row.  Both fitted methods use a zero mean: an
+    uncentred map keeps cosine scores on the full index's scale (exactly so
+    for vectors inside the kept subspace), which the absolute chat
+    guardrail thresholds depend on.  Centring would shift every score.
+    """
+
+    def __init__(self, matrix: np.ndarray, mean: np.ndarray, method: str) -> None:
+        self.matrix = np.asarray(matrix, dtype=np.float32)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.method = method
+
+    @property
+    def input_dim(self) -> int:
+        return int(self.matrix.shape[0])
+
+    @property
+    def output_dim(self) -> int:
+        return int(self.matrix.shape[1])
+
+    def transform(self, vectors: np.ndarray | list[list[float]]) -> np.ndarray:
+        """Project a batch of embeddings into the reduced space.
+
+        Args:
+            vectors: Array of shape (n, input_dim).
+
+        Returns:
+            Float32 array of shape (n, output_dim) with unit-length rows.
+        """
+        x = np.asarray(vectors, dtype=np.float32)
+        reduced = (x - self.mean) @ self.matrix
+        return _normalize_rows(reduced)
+
+    def save(self, path: str | Path) -> None:
+        """Write the projection to an ``.npz`` file.
+
+        Written to a temporary file and renamed into place, so a worker
+        reloading it never reads a partial file.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(tmp, matrix=self.matrix, mean=self.mean, method=self.method)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Projection":
+        """Read a projection previously written by :meth:`save`."""
+        with np.load(path) as data:
+            return cls(data["matrix"], data["mean"], str(data["method"]))
+
+
+def fit_pca(embeddings: np.ndarray, dim: int) -> Projection:
+    """Fit a PCA-style projection onto the top ``dim`` singular vectors.
+
+    The SVD is taken of the raw (uncentred) embeddings, so the basis spans
+    the directions carrying most of the corpus' energy and projected
+    cosine scores stay comparable to the full-dimension index.
+
+    ``dim`` is clamped to the rank available from the corpus
+    (min of sample count and input dimension).
+    """
+    x = np.asarray(embeddings, dtype=np.float32)
+    dim = max(1, min(dim, x.shape[0], x.shape[1]))
+    # Rows of vt are the singular directions, ordered by singular value
+    _, _, vt = np.linalg.svd(x, full_matrices=False)
+    return Projection(vt[:dim].T, np.zeros(x.shape[1], dtype=np.float32), "pca")
+
+
+def fit_random(embeddings: np.ndarray, dim: int, seed: int = 0) -> Projection:
+    """Build a Gaussian random projection (Johnson-Lindenstrauss).
+
+    The corpus is only used for its input dimension; no centring is
+    applied so the projection is data-independent.
+    """
+    x = np.asarray(embeddings, dtype=np.float32)
+    dim = max(1, min(dim, x.shape[1]))
+    rng = np.random.default_rng(seed)
+    matrix = rng.standard_normal((x.shape[1], dim)).astype(np.float32)
+    matrix /= np.sqrt(dim)
+    return Projection(matrix, np.zeros(x.shape[1], dtype=np.float32), "random")
+
+
+def fit_projection(method: str, embeddings: np.ndarray, dim: int) -> Projection:
+    """Fit a projection by method name ("pca" or "random")."""
+    if method == "pca":
+        return fit_pca(embeddings, dim)
+    if method == "random":
+        return fit_random(embeddings, dim)
+    raise ValueError(
+        f"Unknown projection method {method!r}; expected one of "
+        f"{sorted(PROJECTION_METHODS)}"
+    )
+
+
+def recall_at_k(
+    doc_full: np.ndarray,
+    query_full: np.ndarray,
+    projection: Projection,
+    k: int = 5,
+) -> float:
+    """Fraction of full-dimension top-k neighbours recovered after projection.
+
+    Both searches use exact cosine similarity, so the result isolates the
+    loss introduced by the projection itself (not by the ANN index).
+
+    Args:
+        doc_full: Corpus embeddings, shape (n_docs, input_dim).
+        query_full: Query embeddings, shape (n_queries, input_dim).
+        projection: The fitted projection to evaluate.
+        k: Neighbourhood size.
+
+    Returns:
+        Mean recall@k over all queries, in [0, 1].
+    """
+    k = min(k, len(doc_full))
+    full_top = _top_k(_normalize_rows(query_full) @ _normalize_rows(doc_full).T, k)
+    reduced_top = _top_k(
+        projection.transform(query_full) @ projection.transform(doc_full).T, k
+    )
+    hits = [
+        len(set(full_row) & set(reduced_row))
+        for full_row, reduced_row in zip(full_top.tolist(), reduced_top.tolist())
+    ]
+    return float(np.mean(hits)) / k if hits else 0.0
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the column indices of the k highest scores in each row."""
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def _normalize_rows(x: np.ndarray) -> np.ndarray:
+    """L2-normalise each row, leaving all-zero rows untouched."""
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
@@ -2,24 +2,86 @@
 Shared RAG Pipeline
 
 Used by both Part 1 (assessment) and Part 2 (chat).
-Provides retrieve(query, top_k, patient_data) function.
+Provides retrieve(query, top_k, patient_data) and its async counterpart
+aretrieve(), which embeds the query on the embedding thread pool and
+searches, enriches and ranks on the vector store's index thread pool
+(vector_store.run_on_index), so the event loop never waits on index
+I/O; plus the batched
+retrieve_many() / aretrieve_many() for fan-out retrieval: all queries are
+embedded in one provider call, searched with one multi-query index call
+and enriched with one canonical lookup.
 
 When patient_data is provided (Part 1), applies deterministic score boosts
-based on age, symptoms, smoking history, and gender match.
+based on age, symptoms, smoking history, and gender match, computed over
+the precomputed columnar feature table (app.core.patient_features).
+
+With a multi-vector index, several rule_search vectors share one rule_id;
+the candidate pool is over-fetched by the most vectors any rule has, and
+collapsed to the best-scoring vector per rule before re-ranking, so
+top_k still holds top_k distinct rules.
+
+With HYBRID_RETRIEVAL enabled, BM25 matches from the in-memory lexical
+index are fused into the dense candidate pool (see _fuse_lexical).
+
+With PATIENT_PREFILTER enabled, the patient's gender and age become a
+metadata ``where`` filter on the similarity search itself, so chunks that
+can never apply do not take up candidate slots (see _patient_where).  The
+filter fields only hold constraints that cover every branch of a rule;
+per-branch and inferred conditions stay soft patient boosts.
+
+Results are memoised in a bounded LRU + TTL cache keyed on the normalised
+query, top_k, patient fingerprint and index generation
+(app.core.retrieval_cache).
+
+With PARTITION_ROUTING enabled, a chat query that names a cancer type
+(or whose session topic does) only searches that type's partitions of
+the index (app.core.partitions); patient-mode retrieval is not routed.
+
+Chat-mode re-ranking is a cascade (app.core.rerank): metadata and
+precomputed per-chunk feature boosts on every candidate, then an optional
+CPU cross-encoder over the top results while the RERANK_BUDGET_MS budget
+allows.
+
+With ADAPTIVE_FETCH enabled, the candidate pool starts small and is only
+expanded while an unfetched chunk could still reach the top_k after
+boosting (see _rank_adaptive); the result is the same ranking as
+re-ranking the whole index.
 """
 
 import json
-import re
+import time
+from collections import Counter
+from types import MappingProxyType
 from typing import Any
 
-from app.core import vector_store
+from app.config import settings
+from app.core import (
+    lexical_index,
+    partitions,
+    patient_features,
+    reference_graph,
+    retrieval_cache,
+    rerank,
+    rule_index,
+    vector_store,
+)
+from app.core.filters import FILTER_ANY_GENDER
+from app.core.retrieval_hit import RetrievalHit
+from app.core.vector_backends import matches_where
+
+# Adaptive over-fetch: initial pool is top_k + this many, doubled per round
+_ADAPTIVE_MARGIN = 3
+
+# How often each adaptive over-fetch path is taken (see adaptive_fetch_stats)
+_adaptive_counts: Counter[str] = Counter()
 
 
 def retrieve(
     query: str,
     top_k: int = 5,
     patient_data: dict | None = None,
-) -> list[dict[str, Any]]:
+    topic: str = "",
+) -> list[RetrievalHit]:
     """Retrieve the most relevant NG12 guideline chunks for a query.
 
     When patient_data is provided (Part 1 assessment), applies deterministic
@@ -40,139 +102,530 @@ def retrieve(
         top_k: Number of top results to return.
         patient_data: Optional patient dict with keys:
             age, symptoms, smoking_history, gender.
+        topic: Chat session topic, used to route follow-ups that name no
+            cancer type themselves (PARTITION_ROUTING).
 
     Returns:
-        List of result dicts with keys: chunk_id, text, metadata, score.
+        List of :class:`RetrievalHit` (chunk_id, text, metadata, score,
+        plus the attached canonical text), best first.
     """
-    # Fetch 3x candidates for both modes so re-ranking has room to work
-    fetch_k = top_k * 3
-    results = vector_store.query(query, top_k=fetch_k)
+    return retrieve_many([query], top_k=top_k, patient_data=patient_data, topic=topic)[0]
 
-    if not patient_data:
-        results = _chat_rerank(query, results)
-        top_results = results[:top_k]
-        _attach_canonicals(top_results)
-        return top_results
-
-    # Apply deterministic score adjustments
-    patient_age = patient_data.get("age", 0)
-    patient_symptoms = [s.lower() for s in patient_data.get("symptoms", [])]
-    patient_smoking = patient_data.get("smoking_history", "Never Smoked")
-    patient_gender = patient_data.get("gender", "")
-
-    for result in results:
-        meta = result["metadata"]
-        boost = 0.0
-
-        # Age match: patient meets age_min threshold
-        age_min = meta.get("age_min")
-        if age_min is not None and patient_age >= age_min:
-            boost += 0.15
-
-        # Age match: patient meets "under X" threshold
-        age_max = meta.get("age_max")
-        if age_max is not None and patient_age < age_max:
-            boost += 0.15
-
-        # Symptom overlap
-        chunk_symptoms = meta.get("symptom_keywords", [])
-        if isinstance(chunk_symptoms, str):
-            try:
-                chunk_symptoms = json.loads(chunk_symptoms)
-            except (json.JSONDecodeError, TypeError):
-                chunk_symptoms = []
-
-        overlap_count = 0
-        for ps in patient_symptoms:
-            for cs in chunk_symptoms:
-                if cs in ps or ps in cs:
-                    overlap_count += 1
-                    break
-        boost += 0.1 * overlap_count
-
-        # Smoking risk factor
-        if (
-            patient_smoking != "Never Smoked"
-            and meta.get("risk_factor_smoking")
-        ):
-            boost += 0.1
-
-        # Gender match / clash
-        gender_specific = meta.get("gender_specific")
-        if gender_specific:
-            if (
-                (gender_specific == "Female" and patient_gender == "Female")
-                or (gender_specific == "Male" and patient_gender == "Male")
-            ):
-                boost += 0.05
-            elif (
-                (gender_specific == "Female" and patient_gender == "Male")
-                or (gender_specific == "Male" and patient_gender == "Female")
-            ):
-                boost -= 0.3
 
-        result["score"] += boost
+async def aretrieve(
+    query: str,
+    top_k: int = 5,
+    patient_data: dict | None = None,
+    topic: str = "",
+) -> list[RetrievalHit]:
+    """Async variant of :func:`retrieve` for LangGraph nodes.
+
+    The query embedding is awaited on the embedding thread pool and the
+    search on the index thread pool, so neither stalls other in-flight
+    requests; ranking is identical to :func:`retrieve` and both share the
+    result cache.
+    """
+    return (await aretrieve_many(
+        [query], top_k=top_k, patient_data=patient_data, topic=topic,
+    ))[0]
 
-    # Re-sort by adjusted score and take top_k
-    results.sort(key=lambda r: r["score"], reverse=True)
-    results = results[:top_k]
 
-    # Enrich results with canonical text from the canonical collection
-    _attach_canonicals(results)
+def retrieve_many(
+    queries: list[str],
+    top_k: int = 5,
+    patient_data: dict | None = None,
+    topic: str = "",
+) -> list[list[RetrievalHit]]:
+    """Retrieve for several queries at once, ranked as by :func:`retrieve`.
+
+    Cache hits are served directly; the remaining distinct queries are
+    embedded in one batch, searched with a single multi-query index call,
+    and canonical text for all of their results is resolved together.
 
+    Returns:
+        One result list per query, in input order.
+    """
+    results, pending = _cached_results(queries, top_k, patient_data, topic)
+    if pending:
+        texts = [queries[indices[0]] for indices in pending.values()]
+        query_embeddings = vector_store.embed_queries(texts)
+        _retrieve_pending(texts, query_embeddings, pending, results, top_k, patient_data)
+    return results
+
+
+async def aretrieve_many(
+    queries: list[str],
+    top_k: int = 5,
+    patient_data: dict | None = None,
+    topic: str = "",
+) -> list[list[RetrievalHit]]:
+    """Async variant of :func:`retrieve_many` (embedding and search off the
+    event loop)."""
+    results, pending = _cached_results(queries, top_k, patient_data, topic)
+    if pending:
+        texts = [queries[indices[0]] for indices in pending.values()]
+        query_embeddings = await vector_store.aembed_queries(texts)
+        await vector_store.run_on_index(
+            _retrieve_pending, texts, query_embeddings, pending, results, top_k, patient_data,
+        )
     return results
 
 
-# Precompiled patterns for chat-mode query-aware reranking
-_URGENCY_RE = re.compile(r"urgent|red\s*flag|emergency|immediate", re.IGNORECASE)
-_AGE_RE = re.compile(r"age|under\s+\d|over\s+\d|years?\s*old|\byo\b|\byrs?\b", re.IGNORECASE)
-_DURATION_RE = re.compile(r"weeks?|months?|persistent|duration|lasting", re.IGNORECASE)
-_EXACT_RE = re.compile(r"quote|exact|wording|verbatim", re.IGNORECASE)
+def merge_results(
+    result_lists: list[list[dict[str, Any]]],
+    top_k: int,
+) -> list[RetrievalHit]:
+    """Union several result lists, keeping each chunk's best-scoring hit."""
+    best: dict[str, dict[str, Any]] = {}
+    for results in result_lists:
+        for result in results:
+            current = best.get(result["chunk_id"])
+            if current is None or result["score"] > current["score"]:
+                best[result["chunk_id"]] = result
+    return sorted(best.values(), key=lambda r: r["score"], reverse=True)[:top_k]
+
+
+def rule_matches(patient_data: dict, top_k: int) -> list[RetrievalHit]:
+    """Rules matched directly by the symptom-to-rule index.
+
+    No embedding or vector search: the patient's symptoms are looked up
+    in app.core.rule_index and every rule they hit is a candidate.  Age
+    and gender do not remove candidates; as in vector retrieval, each is
+    scored 1.0 plus its soft patient-mode boost (from the canonical
+    metadata), so rules that suit the patient come first.  Results are
+    tagged with ``matched_symptoms``.  Returns [] when no rule index has
+    been built.
+    """
+    index = rule_index.get_rule_index()
+    if index is None:
+        return []
+    hits = index.lookup(patient_data)
+    canonicals = vector_store.get_canonicals([rule_id for rule_id, _ in hits])
+    results = []
+    for rule_id, matched in hits:
+        canonical = canonicals.get(rule_id)
+        if canonical is None:
+            continue
+        results.append(RetrievalHit(
+            canonical["chunk_id"], canonical["text"],
+            MappingProxyType(canonical["metadata"]), 1.0,
+            matched_symptoms=matched,
+        ))
+    if not results:
+        return []
+    table = patient_features.FeatureTable(
+        [r.chunk_id for r in results], [r.metadata for r in results],
+    )
+    boosts = table.boosts(table.rows([r.chunk_id for r in results]), patient_data)
+    for result, boost in zip(results, boosts.tolist()):
+        result.score += boost
+    # Stable: equal scores keep the lookup order (matched symptoms, section)
+    results.sort(key=lambda r: r.score, reverse=True)
+    return results[:top_k]
+
+
+async def arule_matches(patient_data: dict, top_k: int) -> list[RetrievalHit]:
+    """Async variant of :func:`rule_matches` (runs on the index thread pool)."""
+    return await vector_store.run_on_index(rule_matches, patient_data, top_k)
+
+
+def fill_gaps(
+    primary: list[dict[str, Any]],
+    fallback: list[dict[str, Any]],
+    top_k: int,
+) -> list[RetrievalHit]:
+    """Top up *primary* with *fallback* results for rules not yet covered."""
+    covered = {
+        r["metadata"].get("section") or r["metadata"].get("rule_id") for r in primary
+    }
+    merged = list(primary)
+    for result in fallback:
+        if len(merged) >= top_k:
+            break
+        if result["metadata"].get("rule_id") in covered:
+            continue
+        merged.append(result)
+    return merged
+
+
+def _cached_results(
+    queries: list[str],
+    top_k: int,
+    patient_data: dict | None,
+    topic: str = "",
+) -> tuple[list[Any], dict[tuple, list[int]]]:
+    """Split *queries* into cache hits and the distinct misses.
+
+    Returns the per-query result slots (filled for hits, None otherwise)
+    and a map from each missing cache key to the query positions that
+    share it.  The key's last element is the query's partition route.
+    """
+    cache = retrieval_cache.get_cache()
+    results: list[Any] = [None] * len(queries)
+    pending: dict[tuple, list[int]] = {}
+    for i, query in enumerate(queries):
+        route = None
+        if settings.PARTITION_ROUTING and not patient_data:
+            route = partitions.route(query, topic)
+        key = retrieval_cache.make_key(query, top_k, patient_data, route)
+        if key in pending:
+            pending[key].append(i)
+            continue
+        cached = cache.get(key)
+        if cached is not None:
+            results[i] = retrieval_cache.copy_results(cached)
+        else:
+            pending[key] = [i]
+    return results, pending
+
+
+def _retrieve_pending(
+    texts: list[str],
+    query_embeddings: list[list[float]],
+    pending: dict[tuple, list[int]],
+    results: list[Any],
+    top_k: int,
+    patient_data: dict | None,
+) -> None:
+    """Search, re-rank and enrich the cache misses, filling *results*."""
+    deadline = time.perf_counter() + settings.RERANK_BUDGET_MS / 1000
+    routes = [None if key[-1] is None else json.loads(key[-1]) for key in pending]
+    if settings.ADAPTIVE_FETCH:
+        ranked = _rank_adaptive(texts, query_embeddings, top_k, patient_data, routes)
+    else:
+        pools = _candidates_many(texts, query_embeddings, top_k, patient_data, routes=routes)
+        ranked = [
+            _rank_candidates(query, pool, top_k, patient_data)
+            for query, (pool, _) in zip(texts, pools)
+        ]
+    # One canonical lookup for every result, whichever query found it
+    _attach_canonicals([r for top in ranked for r in top])
+
+    # Cascade stage 3 (chat only); a ranking the budget cut short is not cached
+    complete = [
+        bool(patient_data) or rerank.cross_encode(query, top, deadline)
+        for query, top in zip(texts, ranked)
+    ]
+
+    cache = retrieval_cache.get_cache()
+    for (key, indices), top, cacheable in zip(pending.items(), ranked, complete):
+        if cacheable:
+            cache.put(key, retrieval_cache.copy_results(top))
+        results[indices[0]] = top
+        for i in indices[1:]:
+            results[i] = retrieval_cache.copy_results(top)
+
+
+def _candidates_many(
+    queries: list[str],
+    query_embeddings: list[list[float]],
+    top_k: int,
+    patient_data: dict | None,
+    fetch_k: int | None = None,
+    routes: list[dict[str, Any] | None] | None = None,
+) -> list[tuple[list[dict[str, Any]], float | None]]:
+    """Fetch the candidate pool that _rank_candidates re-ranks, per query.
+
+    Dense-only retrieval fetches 3x candidates so re-ranking has room to
+    work.  A patient pre-filter, a partition route or the lexical index
+    (which supplies exact-term matches) each make a 2x dense pool
+    sufficient.  An explicit *fetch_k* (adaptive mode) overrides both.
+
+    *routes* holds each query's partition filter (None = unrouted); it
+    takes the place of the patient filter, which only applies to
+    unrouted patient-mode queries.  Queries sharing a filter are
+    searched in one batched index call.
+
+    Returns one ``(pool, unseen_bound)`` pair per query.  ``unseen_bound``
+    is the lowest dense score fetched - no chunk left out of the pool
+    scores higher before boosting - or None when the dense search already
+    returned every matching chunk.
+
+    With MULTI_VECTOR_INDEX the default pool sizes are multiplied by the
+    rule fan-out (see _rule_fanout), so the pool still holds as many
+    distinct rules once _collapse_rule_vectors has run.  Adaptive mode
+    needs no such factor: it keeps expanding until top_k rules settle.
+    """
+    patient_where = _patient_where(patient_data)
+    wheres = [
+        route if route is not None else patient_where
+        for route in (routes or [None] * len(queries))
+    ]
+    lexical_k = top_k * 2
+    if fetch_k is None:
+        fanout = _rule_fanout()
+        requested = [
+            top_k * (2 if where is not None or settings.HYBRID_RETRIEVAL else 3) * fanout
+            for where in wheres
+        ]
+        fallback_k = top_k * 3 * fanout
+    else:
+        requested = [fetch_k] * len(queries)
+        fallback_k = fetch_k
+
+    pools = _query_grouped(query_embeddings, wheres, requested)
+    # Index built before the filter fields existed, or the filter is too
+    # tight for this corpus: fall back to the unfiltered pool.
+    short = [
+        i for i, results in enumerate(pools)
+        if wheres[i] is not None and len(results) < top_k
+    ]
+    if short:
+        fallback = vector_store.query_many_by_vector(
+            [query_embeddings[i] for i in short], top_k=fallback_k,
+        )
+        for i, results in zip(short, fallback):
+            pools[i] = results
+            wheres[i] = None
+            requested[i] = fallback_k
+
+    # Recorded before lexical fusion adds its boosts
+    bounds = [
+        results[-1]["score"] if results and len(results) >= k else None
+        for results, k in zip(pools, requested)
+    ]
+
+    if settings.HYBRID_RETRIEVAL:
+        index = lexical_index.get_lexical_index()
+        pools = [
+            _fuse_lexical(results, index.search(query, top_k=lexical_k), qemb, w)
+            for query, results, qemb, w in zip(queries, pools, query_embeddings, wheres)
+        ]
+    return list(zip(pools, bounds))
+
+
+def _query_grouped(
+    query_embeddings: list[list[float]],
+    wheres: list[dict[str, Any] | None],
+    fetch_ks: list[int],
+) -> list[list[dict[str, Any]]]:
+    """Dense search per query, one index call per distinct (filter, k)."""
+    groups: dict[tuple[str, int], list[int]] = {}
+    for i, (where, k) in enumerate(zip(wheres, fetch_ks)):
+        groups.setdefault((json.dumps(where, sort_keys=True), k), []).append(i)
+
+    pools: list[list[dict[str, Any]]] = [[] for _ in query_embeddings]
+    for (_, k), indices in groups.items():
+        found = vector_store.query_many_by_vector(
+            [query_embeddings[i] for i in indices], top_k=k, where=wheres[indices[0]],
+        )
+        for i, results in zip(indices, found):
+            pools[i] = results
+    return pools
+
+
+def _max_boost(query: str, patient_data: dict | None) -> float:
+    """Largest score increase re-ranking can give any single chunk."""
+    if patient_data:
+        bound = patient_features.max_boost(patient_data)
+    else:
+        bound = rerank.max_boost(query)
+    if settings.HYBRID_RETRIEVAL:
+        bound += settings.HYBRID_LEXICAL_WEIGHT
+    return bound
+
+
+def _rank_adaptive(
+    queries: list[str],
+    query_embeddings: list[list[float]],
+    top_k: int,
+    patient_data: dict | None,
+    routes: list[dict[str, Any] | None] | None = None,
+) -> list[list[dict[str, Any]]]:
+    """Rank with the smallest candidate pool that gives the exhaustive result.
+
+    Each round fetches ``fetch_k`` dense candidates for every unfinished
+    query (one batched index call) and re-ranks them.  A query is done
+    when its top_k-th adjusted score beats ``unseen_bound + max_boost``:
+    no chunk outside the pool can then overtake it.  Otherwise the pool
+    doubles, until the dense search runs out of chunks.
+    """
+    ranked: list[list[dict[str, Any]]] = [[] for _ in queries]
+    routes = routes or [None] * len(queries)
+    bounds = [_max_boost(query, patient_data) for query in queries]
+    active = list(range(len(queries)))
+    fetch_k = top_k + _ADAPTIVE_MARGIN
+    first_round = True
+
+    while active:
+        pools = _candidates_many(
+            [queries[i] for i in active],
+            [query_embeddings[i] for i in active],
+            top_k, patient_data, fetch_k=fetch_k,
+            routes=[routes[i] for i in active],
+        )
+        still_active = []
+        for i, (pool, unseen_bound) in zip(active, pools):
+            top = _rank_candidates(queries[i], pool, top_k, patient_data)
+            ranked[i] = top
+            if unseen_bound is None:
+                _adaptive_counts["exhausted"] += 1
+            elif len(top) == top_k and top[-1]["score"] > unseen_bound + bounds[i]:
+                _adaptive_counts["early_stop" if first_round else "expanded"] += 1
+            else:
+                still_active.append(i)
+        if still_active:
+            _adaptive_counts["expansions"] += len(still_active)
+        active = still_active
+        fetch_k *= 2
+        first_round = False
+    return ranked
+
+
+def adaptive_fetch_stats() -> dict[str, int]:
+    """How often each adaptive over-fetch path was taken.
+
+    early_stop: top_k settled on the initial pool
+    expanded:   top_k settled after one or more pool expansions
+    exhausted:  the pool grew to every matching chunk
+    expansions: total expansion rounds over all queries
+    """
+    return {
+        key: _adaptive_counts[key]
+        for key in ("early_stop", "expanded", "exhausted", "expansions")
+    }
+
+
+def _patient_where(patient_data: dict | None) -> dict[str, Any] | None:
+    """Translate a patient's hard constraints into a metadata filter.
+
+    Only active with PATIENT_PREFILTER.  Matches the filter fields the
+    chunker puts on every indexable chunk:
+      gender_filter in {"Any", patient gender}
+      age_floor <= patient age < age_ceiling
+    These hold only whole-rule constraints (see chunker._filter_fields),
+    so the filter never removes a rule one of whose branches applies.
+    Returns None when there is nothing to filter on.
+    """
+    if not settings.PATIENT_PREFILTER or not patient_data:
+        return None
+
+    clauses: list[dict[str, Any]] = []
+    gender = patient_data.get("gender")
+    if gender in ("Female", "Male"):
+        clauses.append({
+            "gender_filter": {"$in": [FILTER_ANY_GENDER, gender]}
+        })
+    age = patient_data.get("age")
+    if isinstance(age, (int, float)) and not isinstance(age, bool):
+        clauses.append({"age_floor": {"$lte": age}})
+        clauses.append({"age_ceiling": {"$gt": age}})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _fuse_lexical(
+    dense: list[dict[str, Any]],
+    lexical: list[tuple[str, float]],
+    query_embedding: list[float],
+    where: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """Merge BM25 hits into dense results.
+
+    Lexical-only hits are scored with their cosine similarity (via
+    ``vector_store.score_chunks``) so every candidate's score stays on the
+    dense scale the guardrail thresholds expect.  Each lexical hit then
+    gets ``HYBRID_LEXICAL_WEIGHT * bm25 / best_bm25`` added, like the other
+    additive boosts in this module, and the pool is re-sorted.  Lexical
+    hits failing the patient pre-filter *where* are dropped.
+    """
+    if not lexical:
+        return dense
+    by_id = {r["chunk_id"]: r for r in dense}
+    missing = [chunk_id for chunk_id, _ in lexical if chunk_id not in by_id]
+    for result in vector_store.score_chunks(query_embedding, missing):
+        if where is None or matches_where(result["metadata"], where):
+            by_id[result["chunk_id"]] = result
+
+    best = lexical[0][1]
+    for chunk_id, bm25 in lexical:
+        result = by_id.get(chunk_id)
+        if result is not None:
+            result["score"] += settings.HYBRID_LEXICAL_WEIGHT * bm25 / best
 
-# Urgency values that warrant a boost
-_URGENCY_VALUES = {"immediate", "very_urgent", "urgent"}
+    return sorted(by_id.values(), key=lambda r: r["score"], reverse=True)
 
 
-def _chat_rerank(
+def _rank_candidates(
     query: str,
     results: list[dict[str, Any]],
+    top_k: int,
+    patient_data: dict | None,
 ) -> list[dict[str, Any]]:
-    """Apply lightweight query-aware boosts for chat-mode retrieval.
+    """Re-rank fetched candidates and keep top_k.
 
-    Adjusts scores based on query intent signals (urgency, age, duration,
-    exact-wording) and re-sorts.  Does not mutate the original score
-    permanently - boosts are additive for ranking purposes only.
+    Canonical text is attached afterwards by the caller, so that a batch
+    of queries shares one canonical lookup.
     """
-    q_urgency = bool(_URGENCY_RE.search(query))
-    q_age = bool(_AGE_RE.search(query))
-    q_duration = bool(_DURATION_RE.search(query))
-    q_exact = bool(_EXACT_RE.search(query))
+    results = _collapse_rule_vectors(results)
+
+    if not patient_data:
+        results = _chat_rerank(query, results)
+        return results[:top_k]
+
+    # Apply deterministic score adjustments (vectorised over all candidates)
+    boosts = patient_features.patient_boosts(results, patient_data)
+    for result, boost in zip(results, boosts.tolist()):
+        result["score"] += boost
+
+    # Re-sort by adjusted score and take top_k
+    results.sort(key=lambda r: r["score"], reverse=True)
+    return results[:top_k]
 
-    for result in results:
-        meta = result.get("metadata", {})
-        boost = 0.0
 
-        # Urgency boost
-        if q_urgency:
-            urgency = meta.get("urgency", "").lower()
-            if urgency in _URGENCY_VALUES:
-                boost += 0.1
+def _collapse_rule_vectors(results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Keep only the max-similarity hit per rule for multi-vector results.
 
-        # Age boost - chunk has age thresholds
-        if q_age:
-            if meta.get("age_min") is not None or meta.get("age_max") is not None:
-                boost += 0.1
+    Hits carrying ``vector_kind`` metadata are grouped by ``rule_id``;
+    every other hit is its own group.  ``vector_store.query`` returns hits
+    in descending score order, so the first occurrence of each group is
+    its maximum.
+    """
+    if len(results) < 2:
+        return results
+    seen: set[str] = set()
+    collapsed = []
+    for r in results:
+        meta = r["metadata"]
+        key = meta["rule_id"] if meta.get("vector_kind") and meta.get("rule_id") else r["chunk_id"]
+        if key not in seen:
+            seen.add(key)
+            collapsed.append(r)
+    return collapsed if len(collapsed) < len(results) else results
+
+
+def _count_rule_fanout(data: dict[str, Any]) -> int:
+    counts = Counter(
+        meta["rule_id"] for meta in data["metadatas"]
+        if meta.get("vector_kind") and meta.get("rule_id")
+    )
+    return max(counts.values(), default=1)
+
+
+def _rule_fanout() -> int:
+    """Most vectors any single rule has in the index (1 without
+    MULTI_VECTOR_INDEX)."""
+    if not settings.MULTI_VECTOR_INDEX:
+        return 1
+    return vector_store.derived_from_index("rule_fanout", _count_rule_fanout)
 
-        # Duration boost - chunk mentions duration-related terms
-        if q_duration:
-            chunk_text = result.get("text", "").lower()
-            if _DURATION_RE.search(chunk_text):
-                boost += 0.1
 
-        # Exact wording boost - canonical text is available
-        if q_exact and meta.get("doc_type") == "rule_search":
-            boost += 0.15
+def _chat_rerank(
+    query: str,
+    results: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """Apply lightweight query-aware boosts for chat-mode retrieval.
 
+    Adjusts scores based on query intent signals (urgency, age, duration,
+    exact-wording) and re-sorts.  The boosts are stages 1 and 2 of the
+    re-ranking cascade in app.core.rerank, read from precomputed
+    per-chunk columns; the optional cross-encoder stage runs later, on
+    the final top_k (see _retrieve_pending).
+    """
+    boosts = rerank.chat_boosts(query, results)
+    for result, boost in zip(results, boosts.tolist()):
         result["score"] += boost
 
     results.sort(key=lambda r: r["score"], reverse=True)
@@ -186,46 +639,55 @@ def _attach_canonicals(results: list[dict[str, Any]]) -> None:
     ``canonical_text`` and ``canonical_metadata``.
 
     For symptom_index docs: collects all referenced canonical entries
-    into ``referenced_canonicals``.
+    into ``referenced_canonicals``, reading the citations from the
+    reference graph (falling back to ``references_json`` for rows the
+    graph does not know).
 
+    All referenced rule IDs are collected and deduplicated first, then
+    resolved with a single ``vector_store.get_canonicals`` call.
     Silently skips any rule_id that cannot be found in the canonical
     collection.
     """
-    for result in results:
+    graph = None
+    references: dict[int, list[str]] = {}
+    wanted: dict[str, None] = {}
+    for i, result in enumerate(results):
+        meta = result.get("metadata", {})
+        doc_type = meta.get("doc_type")
+        if doc_type == "rule_search" and meta.get("rule_id"):
+            wanted[meta["rule_id"]] = None
+        elif doc_type == "symptom_index":
+            if graph is None:
+                graph = reference_graph.get_reference_graph()
+            refs = graph.rules_for_row(result.get("chunk_id", ""))
+            if refs is None:
+                refs = reference_graph.referenced_rule_ids(meta)
+            references[i] = refs
+            wanted.update(dict.fromkeys(refs))
+
+    if not wanted:
+        return
+    canonicals = vector_store.get_canonicals(list(wanted))
+
+    for i, result in enumerate(results):
         meta = result.get("metadata", {})
         doc_type = meta.get("doc_type")
 
         if doc_type == "rule_search":
-            rule_id = meta.get("rule_id")
-            if not rule_id:
-                continue
-            canonical = vector_store.get_canonical(rule_id)
+            canonical = canonicals.get(meta.get("rule_id", ""))
             if canonical:
                 result["canonical_text"] = canonical["text"]
                 result["canonical_metadata"] = canonical["metadata"]
 
         elif doc_type == "symptom_index":
-            refs_json = meta.get("references_json", "[]")
-            if isinstance(refs_json, str):
-                try:
-                    refs = json.loads(refs_json)
-                except (json.JSONDecodeError, TypeError):
-                    refs = []
-            else:
-                refs = refs_json
-
-            referenced = []
-            for ref in refs:
-                # Strip brackets: "[1.5.2]" -> "1.5.2"
-                rule_id = ref.strip("[]")
-                if not rule_id:
-                    continue
-                canonical = vector_store.get_canonical(rule_id)
-                if canonical:
-                    referenced.append({
-                        "rule_id": rule_id,
-                        "text": canonical["text"],
-                        "metadata": canonical["metadata"],
-                    })
+            referenced = [
+                {
+                    "rule_id": rule_id,
+                    "text": canonicals[rule_id]["text"],
+                    "metadata": canonicals[rule_id]["metadata"],
+                }
+                for rule_id in references[i]
+                if rule_id in canonicals
+            ]
             if referenced:
                 result["referenced_canonicals"] = referenced
@@ -0,0 +1,150 @@
+"""
+Symptom / Rule Cross-Reference Graph
+
+Part B symptom_index rows cite Part A rules (``references_json``, e.g.
+``["[1.5.2]", "[1.6.1]"]``).  This module turns those citations into a
+bipartite adjacency structure held in compact integer arrays (CSR):
+
+  row_offsets, row_rules    int32   symptom row -> cited rule positions
+  rule_offsets, rule_rows   int32   rule -> positions of rows citing it
+
+so canonical enrichment and "related rules" expansion are array slices
+instead of JSON parsing per query.  ``expand`` walks rule -> citing rows
+-> co-cited rules for any number of hops.
+
+Held per index generation by ``vector_store.derived_from_index``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any
+
+import numpy as np
+
+from app.core import vector_store
+
+logger = logging.getLogger(__name__)
+
+
+def referenced_rule_ids(meta: dict[str, Any]) -> list[str]:
+    """Return the rule IDs cross-referenced by a symptom_index chunk."""
+    refs_json = meta.get("references_json", "[]")
+    if isinstance(refs_json, str):
+        try:
+            refs = json.loads(refs_json)
+        except (json.JSONDecodeError, TypeError):
+            refs = []
+    else:
+        refs = refs_json
+    # Strip brackets: "[1.5.2]" -> "1.5.2"
+    return [rule_id for rule_id in (ref.strip("[]") for ref in refs) if rule_id]
+
+
+def _section_key(rule_id: str) -> tuple:
+    return tuple((0, int(p), "") if p.isdigit() else (1, 0, p) for p in rule_id.split("."))
+
+
+class ReferenceGraph:
+    """Bipartite symptom-row / rule citation graph in CSR form."""
+
+    def __init__(self, row_ids: list[str], row_refs: list[list[str]]) -> None:
+        self.row_ids = list(row_ids)
+        self.row_positions = {chunk_id: i for i, chunk_id in enumerate(self.row_ids)}
+        self.rule_ids = sorted({r for refs in row_refs for r in refs}, key=_section_key)
+        self.rule_positions = {rule_id: i for i, rule_id in enumerate(self.rule_ids)}
+
+        # Citation order is kept (deduplicated) so enrichment matches the source
+        cited = [
+            list(dict.fromkeys(self.rule_positions[r] for r in refs)) for refs in row_refs
+        ]
+        self.row_offsets = np.zeros(len(self.row_ids) + 1, dtype=np.int32)
+        self.row_offsets[1:] = np.cumsum([len(c) for c in cited])
+        self.row_rules = np.fromiter(
+            (r for c in cited for r in c), dtype=np.int32, count=int(self.row_offsets[-1]),
+        )
+
+        # Reverse edges: stable sort by rule keeps citing rows in row order
+        row_of_edge = np.repeat(
+            np.arange(len(self.row_ids), dtype=np.int32), np.diff(self.row_offsets),
+        )
+        order = np.argsort(self.row_rules, kind="stable")
+        self.rule_rows = row_of_edge[order]
+        self.rule_offsets = np.zeros(len(self.rule_ids) + 1, dtype=np.int32)
+        self.rule_offsets[1:] = np.cumsum(
+            np.bincount(self.row_rules, minlength=len(self.rule_ids)),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (
+            self.row_offsets, self.row_rules, self.rule_offsets, self.rule_rows,
+        ))
+
+    def rules_for_row(self, chunk_id: str) -> list[str] | None:
+        """Rules cited by a symptom row, or None if the row is unknown."""
+        pos = self.row_positions.get(chunk_id)
+        if pos is None:
+            return None
+        cited = self.row_rules[self.row_offsets[pos]:self.row_offsets[pos + 1]]
+        return [self.rule_ids[r] for r in cited]
+
+    def rows_for_rule(self, rule_id: str) -> list[str]:
+        """Symptom rows citing a rule."""
+        pos = self.rule_positions.get(rule_id)
+        if pos is None:
+            return []
+        rows = self.rule_rows[self.rule_offsets[pos]:self.rule_offsets[pos + 1]]
+        return [self.row_ids[r] for r in rows]
+
+    def expand(self, rule_ids: list[str], hops: int = 1) -> list[str]:
+        """Rules reachable from *rule_ids* via shared symptom rows.
+
+        One hop is rule -> rows citing it -> other rules those rows cite.
+        Seeds are excluded; results are ordered by hop distance, then
+        NG12 section order.
+        """
+        seen = np.zeros(len(self.rule_ids), dtype=bool)
+        frontier = np.array(
+            sorted({self.rule_positions[r] for r in rule_ids if r in self.rule_positions}),
+            dtype=np.int32,
+        )
+        seen[frontier] = True
+        related: list[str] = []
+        for _ in range(hops):
+            if not len(frontier):
+                break
+            rows = np.unique(_gather(self.rule_offsets, self.rule_rows, frontier))
+            rules = np.unique(_gather(self.row_offsets, self.row_rules, rows))
+            frontier = rules[~seen[rules]]
+            seen[frontier] = True
+            related.extend(self.rule_ids[r] for r in frontier)
+        return related
+
+
+def _gather(offsets: np.ndarray, values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Concatenate the CSR neighbour lists of *positions*."""
+    if not len(positions):
+        return np.zeros(0, dtype=values.dtype)
+    return np.concatenate([values[offsets[p]:offsets[p + 1]] for p in positions])
+
+
+def _build(data: dict[str, Any]) -> ReferenceGraph:
+    """Build the graph over the symptom_index rows of the search collection."""
+    row_ids, row_refs = [], []
+    for chunk_id, meta in zip(data["ids"], data["metadatas"]):
+        if meta.get("doc_type") == "symptom_index":
+            row_ids.append(chunk_id)
+            row_refs.append(referenced_rule_ids(meta))
+    graph = ReferenceGraph(row_ids, row_refs)
+    logger.info(
+        "Built reference graph: %d symptom rows, %d rules, %d edges",
+        len(graph.row_ids), len(graph.rule_ids), len(graph.row_rules),
+    )
+    return graph
+
+
+def get_reference_graph() -> ReferenceGraph:
+    """Return the process-wide graph, rebuilding it when stale."""
+    return vector_store.derived_from_index("reference_graph", _build)
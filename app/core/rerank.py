@@ -0,0 +1,299 @@
+"""
+Chat Re-ranking Cascade
+
+Chat-mode re-ranking runs as a cascade of increasingly expensive stages:
+
+  1. metadata       urgency / age-threshold / exact-wording boosts, read
+                    from per-chunk metadata columns (urgency and age
+                    thresholds joined from the canonical rule on rule_id)
+  2. features       the duration boost, read from a per-chunk flag
+                    computed once per index instead of running the
+                    duration regex over every candidate's text per query
+  3. cross-encoder  optional local CPU model scoring (query, chunk) pairs
+                    for the top RERANK_CROSS_ENCODER_TOP_N results only
+
+Stages 1 and 2 are array lookups in a columnar table over the search
+collection (see ``vector_store.derived_from_index``) and always run.
+Stage 3 only reorders results already in the top_k, and only as many of
+them as fit in what is left of the RERANK_BUDGET_MS latency budget,
+estimated from its observed per-pair cost.  A cross-encoder stage cut
+short by the budget is reported so that its ranking is not cached.
+
+Cross-encoders, selected with ``settings.RERANK_CROSS_ENCODER``:
+  - none    : no stage 3
+  - minilm  : sentence-transformers ms-marco-MiniLM-L-6-v2 on CPU
+              (requires the sentence-transformers package)
+  - overlap : query-term coverage of the chunk text, no model to load
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+import time
+from collections import Counter
+from typing import Any
+
+import numpy as np
+
+from app.config import settings
+from app.core import lexical_index, patient_features, vector_store
+
+logger = logging.getLogger(__name__)
+
+CROSS_ENCODERS = ("none", "minilm", "overlap")
+
+# Query intent signals
+URGENCY_RE = re.compile(r"urgent|red\s*flag|emergency|immediate", re.IGNORECASE)
+AGE_RE = re.compile(r"age|under\s+\d|over\s+\d|years?\s*old|\byo\b|\byrs?\b", re.IGNORECASE)
+DURATION_RE = re.compile(r"weeks?|months?|persistent|duration|lasting", re.IGNORECASE)
+EXACT_RE = re.compile(r"quote|exact|wording|verbatim", re.IGNORECASE)
+
+# Urgency values that warrant a boost
+URGENCY_VALUES = {"immediate", "very_urgent", "urgent"}
+
+# Stage 1/2 boosts
+SIGNAL_BOOST = 0.1
+EXACT_BOOST = 0.15
+
+# Weight of the EWMA update of the cross-encoder's per-pair cost
+_COST_SMOOTHING = 0.2
+
+_cross_encoder: "CrossEncoder | None" = None
+_pair_cost_ms: float | None = None
+
+# How far the cascade went (see cascade_stats)
+_stage_counts: Counter[str] = Counter()
+
+
+class ChatFeatureTable:
+    """Stage 1 / 2 chat features for a fixed list of chunks."""
+
+    def __init__(
+        self,
+        ids: list[str],
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        self.positions = {chunk_id: i for i, chunk_id in enumerate(ids)}
+        self.urgent = np.array(
+            [str(m.get("urgency", "")).lower() in URGENCY_VALUES for m in metadatas],
+            dtype=bool,
+        )
+        self.has_age = np.array(
+            [m.get("age_min") is not None or m.get("age_max") is not None for m in metadatas],
+            dtype=bool,
+        )
+        self.rule_search = np.array(
+            [m.get("doc_type") == "rule_search" for m in metadatas], dtype=bool,
+        )
+        self.duration = np.array(
+            [bool(DURATION_RE.search(text or "")) for text in documents], dtype=bool,
+        )
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def rows(self, chunk_ids: list[str]) -> np.ndarray | None:
+        """Row index for each chunk id, or None if any id is unknown."""
+        try:
+            return np.fromiter(
+                (self.positions[c] for c in chunk_ids), dtype=np.int64,
+                count=len(chunk_ids),
+            )
+        except KeyError:
+            return None
+
+
+def _build(data: dict[str, Any]) -> ChatFeatureTable:
+    """Build the chat feature table over every chunk in the search collection."""
+    table = ChatFeatureTable(
+        data["ids"], data["documents"], patient_features.rule_metadata(data["metadatas"]),
+    )
+    logger.info(
+        "Built chat feature table: %d chunks, %d with duration terms",
+        len(table), int(table.duration.sum()),
+    )
+    return table
+
+
+def get_chat_features() -> ChatFeatureTable:
+    """Return the process-wide chat feature table, rebuilding it when stale."""
+    return vector_store.derived_from_index("chat_features", _build)
+
+
+def query_signals(query: str) -> tuple[bool, bool, bool, bool]:
+    """(urgency, age, duration, exact) intent flags of a chat query."""
+    return (
+        bool(URGENCY_RE.search(query)),
+        bool(AGE_RE.search(query)),
+        bool(DURATION_RE.search(query)),
+        bool(EXACT_RE.search(query)),
+    )
+
+
+def max_boost(query: str) -> float:
+    """Largest boost stages 1 and 2 can give any chunk for *query*."""
+    urgency, age, duration, exact = query_signals(query)
+    return SIGNAL_BOOST * (urgency + age + duration) + (EXACT_BOOST if exact else 0.0)
+
+
+def chat_boosts(query: str, results: list[dict[str, Any]]) -> np.ndarray:
+    """Stage 1 + 2 score adjustment for each result.
+
+    Candidates unknown to the precomputed table (e.g. a result list not
+    produced by the current index) get a table built from their own
+    (rule) metadata and text instead.
+    """
+    urgency, age, duration, exact = query_signals(query)
+    boost = np.zeros(len(results), dtype=np.float64)
+    if not results or not (urgency or age or duration or exact):
+        return boost
+
+    table = get_chat_features()
+    rows = table.rows([r["chunk_id"] for r in results])
+    if rows is None:
+        table = ChatFeatureTable(
+            [r["chunk_id"] for r in results],
+            [r.get("text", "") for r in results],
+            patient_features.rule_metadata([r.get("metadata", {}) for r in results]),
+        )
+        rows = np.arange(len(results))
+
+    # Stage 1: metadata columns
+    if urgency:
+        boost += SIGNAL_BOOST * table.urgent[rows]
+    if age:
+        boost += SIGNAL_BOOST * table.has_age[rows]
+    if exact:
+        boost += EXACT_BOOST * table.rule_search[rows]
+    # Stage 2: precomputed text features
+    if duration:
+        boost += SIGNAL_BOOST * table.duration[rows]
+    return boost
+
+
+# ---- stage 3: cross-encoders ----------------------------------------------
+class CrossEncoder:
+    """Base class for stage 3 scorers."""
+
+    name = "base"
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        """Relevance of each text to *query*, in [0, 1]."""
+        raise NotImplementedError
+
+
+class MiniLMCrossEncoder(CrossEncoder):
+    """ms-marco-MiniLM-L-6-v2 via sentence-transformers, on CPU."""
+
+    name = "minilm"
+    model_name = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+    def __init__(self) -> None:
+        from sentence_transformers import CrossEncoder as _Model
+
+        self._model = _Model(self.model_name, device="cpu")
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        logits = self._model.predict([(query, text) for text in texts])
+        return [1.0 / (1.0 + math.exp(-float(v))) for v in logits]
+
+
+class OverlapCrossEncoder(CrossEncoder):
+    """Fraction of the query's terms that occur in each text."""
+
+    name = "overlap"
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        terms = set(lexical_index.tokenize(query))
+        if not terms:
+            return [0.0] * len(texts)
+        return [len(terms & set(lexical_index.tokenize(t))) / len(terms) for t in texts]
+
+
+_CROSS_ENCODERS: dict[str, type[CrossEncoder]] = {
+    "minilm": MiniLMCrossEncoder,
+    "overlap": OverlapCrossEncoder,
+}
+
+
+def create_cross_encoder(name: str) -> CrossEncoder | None:
+    """Instantiate a stage 3 scorer by name (None for ``"none"``).
+
+    Raises:
+        ValueError: If *name* is not a known cross-encoder.
+    """
+    if name == "none":
+        return None
+    if name not in _CROSS_ENCODERS:
+        raise ValueError(
+            f"Unknown RERANK_CROSS_ENCODER {name!r}; expected one of "
+            f"{list(CROSS_ENCODERS)}"
+        )
+    return _CROSS_ENCODERS[name]()
+
+
+def get_cross_encoder() -> CrossEncoder | None:
+    """Return the configured stage 3 scorer, creating it on first use."""
+    global _cross_encoder
+    if _cross_encoder is None and settings.RERANK_CROSS_ENCODER != "none":
+        _cross_encoder = create_cross_encoder(settings.RERANK_CROSS_ENCODER)
+        logger.info("Using %s cross-encoder", _cross_encoder.name)
+    return _cross_encoder
+
+
+def cross_encode(
+    query: str,
+    results: list[dict[str, Any]],
+    deadline: float,
+) -> bool:
+    """Stage 3: re-score the head of a ranked list within the budget.
+
+    The top RERANK_CROSS_ENCODER_TOP_N results (fewer if the remaining
+    budget only covers fewer pairs) gain ``RERANK_CROSS_ENCODER_WEIGHT *
+    relevance``.  Boosts are non-negative and go to results already
+    ranked above the rest, so only their order changes.  Scores the
+    canonical text when it has been attached.
+
+    Returns:
+        False when the budget cut the stage short, True otherwise.
+    """
+    global _pair_cost_ms
+    encoder = get_cross_encoder()
+    if encoder is None or not results:
+        return True
+
+    wanted = min(settings.RERANK_CROSS_ENCODER_TOP_N, len(results))
+    remaining_ms = (deadline - time.perf_counter()) * 1000
+    head = wanted
+    if _pair_cost_ms is not None:
+        head = min(wanted, int(remaining_ms / _pair_cost_ms)) if _pair_cost_ms > 0 else wanted
+    if head <= 0:
+        _stage_counts["cross_encoder_skipped"] += 1
+        return False
+
+    start = time.perf_counter()
+    texts = [r.get("canonical_text") or r.get("text", "") for r in results[:head]]
+    for result, relevance in zip(results, encoder.score(query, texts)):
+        result["score"] += settings.RERANK_CROSS_ENCODER_WEIGHT * relevance
+    results.sort(key=lambda r: r["score"], reverse=True)
+
+    cost = (time.perf_counter() - start) * 1000 / head
+    _pair_cost_ms = cost if _pair_cost_ms is None else (
+        _COST_SMOOTHING * cost + (1 - _COST_SMOOTHING) * _pair_cost_ms
+    )
+    _stage_counts["cross_encoder" if head == wanted else "cross_encoder_partial"] += 1
+    return head == wanted
+
+
+def cascade_stats() -> dict[str, Any]:
+    """How often stage 3 ran in full, partially or not at all, and its
+    estimated per-pair cost."""
+    stats: dict[str, Any] = {
+        key: _stage_counts[key]
+        for key in ("cross_encoder", "cross_encoder_partial", "cross_encoder_skipped")
+    }
+    stats["pair_cost_ms"] = _pair_cost_ms
+    return stats
@@ -0,0 +1,158 @@
+"""
+Retrieval Result Cache
+
+Bounded LRU + TTL cache in front of ``rag_pipeline.retrieve`` so that
+repeated questions skip embedding, vector search, re-ranking and
+canonical enrichment.
+
+Cache key:
+  - normalised query text (case, whitespace, trailing punctuation)
+  - top_k
+  - patient fingerprint (the fields patient-mode ranking reads)
+  - index generation (bumped by every ingest, so a re-ingest makes all
+    existing entries unreachable)
+  - the retrieval-mode settings that change results
+  - the partition filter a routed chat query searched
+
+Sized by RETRIEVAL_CACHE_SIZE (0 disables) and RETRIEVAL_CACHE_TTL.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from app.config import settings
+from app.core import vector_store
+
+_WS_RE = re.compile(r"\s+")
+
+_cache: "RetrievalCache | None" = None
+
+
+class RetrievalCache:
+    """Thread-safe LRU cache whose entries also expire after *ttl* seconds."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value for *key*, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if self._clock() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store *value*, evicting the least recently used entry if full."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for monitoring (e.g. /admin/stats)."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def get_cache() -> RetrievalCache:
+    """Return the process-wide retrieval cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = RetrievalCache(
+            max_entries=settings.RETRIEVAL_CACHE_SIZE,
+            ttl=settings.RETRIEVAL_CACHE_TTL,
+        )
+    return _cache
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query."""
+    return _WS_RE.sub(" ", query.lower()).strip().rstrip("?.! ")
+
+
+def patient_fingerprint(patient_data: dict | None) -> tuple | None:
+    """Hashable summary of the patient fields that affect ranking."""
+    if not patient_data:
+        return None
+    return (
+        patient_data.get("age"),
+        patient_data.get("gender"),
+        patient_data.get("smoking_history"),
+        tuple(sorted(s.lower() for s in patient_data.get("symptoms", []))),
+    )
+
+
+def make_key(
+    query: str,
+    top_k: int,
+    patient_data: dict | None,
+    route: dict[str, Any] | None = None,
+) -> tuple:
+    """Cache key for one retrieve() call (*route*: its partition filter)."""
+    return (
+        normalize_query(query),
+        top_k,
+        patient_fingerprint(patient_data),
+        vector_store.index_generation(),
+        settings.HYBRID_RETRIEVAL,
+        settings.PATIENT_PREFILTER,
+        None if route is None else json.dumps(route, sort_keys=True),
+    )
+
+
+def copy_results(results: list[Any]) -> list[Any]:
+    """Shallow-copy results so callers cannot alter cached scores.
+
+    A RetrievalHit copy shares its metadata and canonical references.
+    """
+    return [r.copy() for r in results]
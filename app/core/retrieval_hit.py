@@ -0,0 +1,114 @@
+"""
+Retrieval Result Type
+
+``RetrievalHit`` is the object ``vector_store`` search returns and
+``rag_pipeline`` ranks, enriches and caches.  It is slotted (no per-hit
+``__dict__``) and holds references instead of copies:
+
+  metadata             the index's shared, read-only metadata mapping for
+                       the chunk (decoded once per index generation)
+  canonical_metadata   the in-memory canonical map's entry
+  canonical_text       the canonical map's text
+
+so a hit costs one small object, and ``score`` is its only per-query
+state.  Copying a hit (the result cache does, so callers cannot alter
+cached scores) copies eight references.
+
+Consumers read attributes (``hit.metadata``, ``hit.canonical_metadata``).
+The dict protocol (``hit["score"]``, ``hit.get("canonical_text")``) is
+kept for code that handles plain result dicts too; optional fields that
+were never set read as missing.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+_EMPTY: Mapping[str, Any] = {}
+
+
+class RetrievalHit(Mapping):
+    """One ranked chunk: chunk_id, text, metadata, score, plus enrichment."""
+
+    __slots__ = (
+        "chunk_id",
+        "text",
+        "metadata",
+        "score",
+        "canonical_text",
+        "canonical_metadata",
+        "referenced_canonicals",
+        "matched_symptoms",
+    )
+
+    def __init__(
+        self,
+        chunk_id: str,
+        text: str,
+        metadata: Mapping[str, Any],
+        score: float,
+        canonical_text: str | None = None,
+        canonical_metadata: Mapping[str, Any] | None = None,
+        referenced_canonicals: list[dict[str, Any]] | None = None,
+        matched_symptoms: int | None = None,
+    ) -> None:
+        self.chunk_id = chunk_id
+        self.text = text
+        self.metadata = metadata
+        self.score = score
+        self.canonical_text = canonical_text
+        self.canonical_metadata = canonical_metadata
+        self.referenced_canonicals = referenced_canonicals
+        self.matched_symptoms = matched_symptoms
+
+    @property
+    def section(self) -> str | None:
+        """Rule section from the chunk, falling back to its canonical rule."""
+        return self.metadata.get("section") or (self.canonical_metadata or _EMPTY).get("section")
+
+    @property
+    def page(self) -> Any:
+        """Page number from the chunk, falling back to its canonical rule."""
+        return self.metadata.get("page") or (self.canonical_metadata or _EMPTY).get("page")
+
+    def copy(self) -> "RetrievalHit":
+        """Shallow copy: shares metadata and canonical references."""
+        return RetrievalHit(
+            self.chunk_id, self.text, self.metadata, self.score,
+            self.canonical_text, self.canonical_metadata,
+            self.referenced_canonicals, self.matched_symptoms,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Plain-dict form with the fields that are set."""
+        return {key: getattr(self, key) for key in self}
+
+    # ---- dict protocol -----------------------------------------------------
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self.__slots__ if getattr(self, key) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"RetrievalHit({self.chunk_id!r}, score={self.score:.4f})"
@@ -0,0 +1,204 @@
+"""
+Symptom-to-Rule Index
+
+Deterministic lookup from a patient's symptoms to the NG12 rules whose
+extracted ``symptom_keywords_json`` mention them, built at ingest time
+from the canonical chunks:
+
+  terms      normalised symptom keyword (plus its SYNONYM_MAP expansions)
+             -> int32 array of rule positions
+  smoking    bool per rule (ever_smoked risk factor)
+  info       action_type / urgency / cancer_type per rule
+
+The index only generates candidates.  The extracted age_min /
+gender_specific fields are heuristic: an age can qualify a single OR
+branch of a rule ("dysphagia, or aged 55 and over with ..."), and a
+gender can come from a differential list or the next section's header.
+So they are never compiled into hard eligibility masks here.  Patient
+fit is left to the soft patient-mode boosts (see
+rag_pipeline.rule_matches).  app.core.screening compiles the same table
+for whole populations.
+
+A patient symptom matches a term when either string contains the other
+(as in patient_features), so "unexplained hemoptysis" hits the
+"hemoptysis" synonym of "haemoptysis".
+
+Persisted as JSON next to the vector index so API workers load the table
+fitted by the last ingest instead of re-deriving it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.config import settings
+from app.core.index_files import FileStamp, file_stamp, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+RULE_INDEX_FILENAME = "rule_index.json"
+
+_WS_RE = re.compile(r"\s+")
+
+# (file stamp, index) - a rebuild by another worker changes the stamp
+_rule_index: "tuple[FileStamp, RuleIndex] | None" = None
+
+
+def normalize_symptom(text: str) -> str:
+    """Lower-case and collapse whitespace."""
+    return _WS_RE.sub(" ", text.lower()).strip()
+
+
+class RuleIndex:
+    """Inverted symptom index over the canonical rules."""
+
+    def __init__(
+        self,
+        rule_ids: list[str],
+        terms: dict[str, list[int]],
+        smoking: list[bool] | None = None,
+        info: list[dict[str, str]] | None = None,
+    ) -> None:
+        self.rule_ids = list(rule_ids)
+        self.terms = {
+            term: np.asarray(rows, dtype=np.int32) for term, rows in terms.items()
+        }
+        self.smoking = np.asarray(
+            smoking if smoking is not None else [False] * len(rule_ids), dtype=bool,
+        )
+        self.info = info if info is not None else [{} for _ in rule_ids]
+        self._term_matches: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rule_ids)
+
+    @classmethod
+    def from_canonicals(
+        cls,
+        chunks: list[dict[str, Any]],
+        synonyms: dict[str, list[str]],
+    ) -> "RuleIndex":
+        """Build the index from rule_canonical chunks.
+
+        Args:
+            chunks: Canonical chunks (chunk_id, text, metadata) with the
+                chunker's extracted rule metadata.
+            synonyms: Keyword -> synonym list (the chunker's SYNONYM_MAP).
+        """
+        rule_ids: list[str] = []
+        terms: dict[str, list[int]] = {}
+        smoking: list[bool] = []
+        info: list[dict[str, str]] = []
+
+        for chunk in chunks:
+            meta = chunk["metadata"]
+            row = len(rule_ids)
+            rule_ids.append(meta.get("section") or meta.get("rule_id", ""))
+            smoking.append(bool(meta.get("risk_factor_smoking")))
+            info.append({
+                key: meta.get(key, "")
+                for key in ("action_type", "urgency", "cancer_type")
+            })
+
+            keywords = meta.get("symptom_keywords_json") or "[]"
+            if isinstance(keywords, str):
+                keywords = json.loads(keywords)
+            for keyword in keywords:
+                for term in [keyword, *synonyms.get(keyword.lower(), [])]:
+                    rows = terms.setdefault(normalize_symptom(term), [])
+                    if not rows or rows[-1] != row:
+                        rows.append(row)
+
+        return cls(rule_ids, terms, smoking, info)
+
+    def matching_terms(self, symptom: str) -> list[str]:
+        """Index terms matched by one (normalised) patient symptom."""
+        matched = self._term_matches.get(symptom)
+        if matched is None:
+            matched = [t for t in self.terms if t in symptom or symptom in t]
+            self._term_matches[symptom] = matched
+        return matched
+
+    def lookup(self, patient_data: dict, limit: int | None = None) -> list[tuple[str, int]]:
+        """Rules whose symptom terms the patient's symptoms hit.
+
+        Only the symptoms are used; the patient's age and gender never
+        remove a candidate (see module docstring).
+
+        Returns:
+            ``(rule_id, matched_symptom_count)`` pairs, most matched
+            symptoms first; ties keep NG12 section order.
+        """
+        hits = np.zeros(len(self.rule_ids), dtype=np.int32)
+        for symptom in patient_data.get("symptoms", []):
+            rows = [self.terms[t] for t in self.matching_terms(normalize_symptom(symptom))]
+            if rows:
+                matched = np.zeros(len(self.rule_ids), dtype=bool)
+                matched[np.concatenate(rows)] = True
+                hits += matched
+
+        rows = np.flatnonzero(hits)
+        order = rows[np.lexsort((rows, -hits[rows]))]
+        if limit is not None:
+            order = order[:limit]
+        return [(self.rule_ids[i], int(hits[i])) for i in order]
+
+    # ---- persistence -------------------------------------------------------
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "rule_ids": self.rule_ids,
+            "terms": {term: rows.tolist() for term, rows in self.terms.items()},
+            "smoking": self.smoking.tolist(),
+            "info": self.info,
+        }
+
+    def save(self, path: Path | str) -> None:
+        write_json_atomic(path, self.to_dict())
+
+    @classmethod
+    def load(cls, path: Path | str) -> "RuleIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["rule_ids"], data["terms"], data.get("smoking"), data.get("info"))
+
+
+def _index_path() -> Path:
+    return Path(settings.CHROMA_PERSIST_DIR) / RULE_INDEX_FILENAME
+
+
+def rebuild(chunks: list[dict[str, Any]], synonyms: dict[str, list[str]]) -> RuleIndex:
+    """Build the index from canonical chunks, persist it and make it current."""
+    global _rule_index
+    index = RuleIndex.from_canonicals(chunks, synonyms)
+    index.save(_index_path())
+    _rule_index = (file_stamp(_index_path()), index)
+    return index
+
+
+def get_rule_index() -> RuleIndex | None:
+    """Return the symptom-to-rule index, loading it from disk on first use.
+
+    Reloaded whenever the file changes, so every worker follows a
+    re-ingest run in any process.  Returns None when no ingest has
+    written one yet.
+    """
+    global _rule_index
+    stamp = file_stamp(_index_path())
+    if stamp is None:
+        _rule_index = None
+        return None
+    cached = _rule_index
+    if cached is None or cached[0] != stamp:
+        index = RuleIndex.load(_index_path())
+        cached = _rule_index = (stamp, index)
+        logger.info(
+            "Loaded rule index: %d rules, %d symptom terms",
+            len(index), len(index.terms),
+        )
+    return cached[1]
@@ -0,0 +1,142 @@
+"""
+Bulk Patient Screening
+
+Finds, for whole populations of patient records, the NG12 rules whose
+symptom keywords their symptoms mention - with no LLM call and no vector
+search, using the compiled rule table from app.core.rule_index:
+
+  rule_terms  uint64 (n_rules, n_words)  bitset of each rule's symptom terms
+
+A population is encoded once - one term bitset per patient symptom - and
+matched in a few array operations:
+
+  hits[s, r]    = any(symptom_bits[s] & rule_terms[r])   (per distinct s)
+  counts[p, r]  = sum of hits over patient p's symptoms
+
+Semantics are identical to ``RuleIndex.lookup``: a rule is a candidate
+when at least one symptom hits one of its terms.  Only rules with
+extracted symptom keywords can be candidates.
+
+The output is keyword candidates, not met recommendations.  The rules'
+real conditions are not compiled: minimum symptom counts ("2 or more of
+the following"), smoking branches and per-branch ages.  A candidate may
+therefore not apply; "fatigue" alone makes the lung and mesothelioma
+X-ray rules 1.1.2 / 1.1.5 candidates.  Conversely, no rule that
+mentions a patient's symptom is ever left out.  Each candidate still
+needs clinical (or LLM) assessment against the rule text.
+
+Can be run standalone over a JSON list of patient records:
+  python -m app.core.screening patients.json
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from typing import Any
+
+import numpy as np
+
+from app.core.rule_index import RuleIndex, get_rule_index, normalize_symptom
+
+
+class ScreeningEngine:
+    """Decision table compiled from a :class:`RuleIndex`."""
+
+    def __init__(self, index: RuleIndex) -> None:
+        self.index = index
+        self.terms = list(index.terms)
+        words = max(1, -(-len(self.terms) // 64))
+        self.rule_terms = np.zeros((len(index), words), dtype=np.uint64)
+        for bit, term in enumerate(self.terms):
+            self.rule_terms[index.terms[term], bit // 64] |= np.uint64(1 << (bit % 64))
+        self._bit_of = {term: bit for bit, term in enumerate(self.terms)}
+        self._symptom_bits: dict[str, np.ndarray] = {}
+
+    def symptom_bits(self, symptom: str) -> np.ndarray:
+        """Term bitset for one patient symptom (cached per distinct string)."""
+        bits = self._symptom_bits.get(symptom)
+        if bits is None:
+            bits = np.zeros(self.rule_terms.shape[1], dtype=np.uint64)
+            for term in self.index.matching_terms(normalize_symptom(symptom)):
+                bit = self._bit_of[term]
+                bits[bit // 64] |= np.uint64(1 << (bit % 64))
+            self._symptom_bits[symptom] = bits
+        return bits
+
+    def candidate_counts(self, patients: list[dict[str, Any]]) -> np.ndarray:
+        """Matched-symptom count per (patient, rule); 0 = not a candidate.
+
+        Returns:
+            int32 array of shape (n_patients, n_rules).
+        """
+        n = len(patients)
+        symptoms = [p.get("symptoms", []) for p in patients]
+        lengths = np.fromiter((len(s) for s in symptoms), dtype=np.int64, count=n)
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+
+        if bounds[-1]:
+            # Symptom strings repeat across a population: match each
+            # distinct one against the rule table once.
+            distinct: dict[str, int] = {}
+            positions = np.fromiter(
+                (distinct.setdefault(s, len(distinct)) for group in symptoms for s in group),
+                dtype=np.int64, count=int(bounds[-1]),
+            )
+            bits = np.stack([self.symptom_bits(s) for s in distinct])
+            distinct_hits = ((bits[:, None, :] & self.rule_terms[None, :, :]) != 0).any(axis=2)
+            hits = distinct_hits[positions]
+            cumulative = np.vstack([
+                np.zeros((1, len(self.index)), dtype=np.int32),
+                np.cumsum(hits, axis=0, dtype=np.int32),
+            ])
+            counts = cumulative[bounds[1:]] - cumulative[bounds[:-1]]
+        else:
+            counts = np.zeros((n, len(self.index)), dtype=np.int32)
+
+        return counts
+
+    def screen(self, patients: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+        """Candidate NG12 recommendations for each patient.
+
+        Each candidate carries rule_id, action_type, urgency, cancer_type,
+        matched_symptoms and smoking_risk (the rule lists smoking as a
+        risk factor and the patient has smoked), ordered by matched
+        symptoms, then NG12 section order.  Candidates are not verified
+        against the rule's conditions (see module docstring).
+        """
+        counts = self.candidate_counts(patients)
+        smokers = np.array(
+            [p.get("smoking_history", "Never Smoked") != "Never Smoked" for p in patients],
+            dtype=bool,
+        )
+        results = []
+        for p, row in enumerate(counts):
+            rules = np.flatnonzero(row)
+            rules = rules[np.lexsort((rules, -row[rules]))]
+            results.append([
+                {
+                    "rule_id": self.index.rule_ids[r],
+                    **self.index.info[r],
+                    "matched_symptoms": int(row[r]),
+                    "smoking_risk": bool(smokers[p] and self.index.smoking[r]),
+                }
+                for r in rules
+            ])
+        return results
+
+
+def get_engine() -> ScreeningEngine | None:
+    """Screening engine over the current rule index (None before ingest)."""
+    index = get_rule_index()
+    return None if index is None else ScreeningEngine(index)
+
+
+if __name__ == "__main__":
+    engine = get_engine()
+    if engine is None:
+        sys.exit("No rule index found; run python -m app.ingestion.ingest first")
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        records = json.load(f)
+    for record, candidates in zip(records, engine.screen(records)):
+        print(json.dumps({"patient_id": record.get("patient_id"), "candidates": candidates}))
@@ -0,0 +1,614 @@
+"""
+Vector Store Backends
+
+Pluggable storage / nearest-neighbour search for the search collection,
+selected with ``settings.VECTOR_BACKEND``:
+  - chroma : ChromaDB collection (HNSW + SQLite), persisted by Chroma
+  - numpy  : exact brute-force index held in memory (app.core.numpy_index)
+  - hnsw   : hnswlib approximate index held in memory (optional dependency,
+             ``pip install hnswlib``)
+  - mmap   : the numpy index exported to a read-only file that every worker
+             process memory-maps (app.core.mapped_index)
+
+Every backend implements the same small interface - add / query /
+query_many / get / count / reset / snapshot.  ``query`` returns
+:class:`RetrievalHit` objects built in the search loop, with score = cosine
+similarity; ``get`` returns ``{"chunk_id", "text", "metadata"}`` dicts.
+Hit metadata is the stored mapping itself (not a copy, do not mutate it);
+decoding of JSON fields is left to app.core.vector_store.
+
+``query`` accepts an optional Chroma-style ``where`` metadata filter
+($and / $or and $eq, $ne, $gt, $gte, $lt, $lte, $in, $nin).  Chroma
+evaluates it natively; the in-memory backends evaluate it once per
+distinct filter into a cached row mask (see matches_where).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import operator
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.core.index_files import file_stamp, write_json_atomic
+from app.core.mapped_index import MappedIndex, save_mapped
+from app.core.numpy_index import NumpyIndex
+from app.core.retrieval_hit import RetrievalHit
+
+logger = logging.getLogger(__name__)
+
+VECTOR_BACKENDS = ("chroma", "numpy", "hnsw", "mmap")
+
+_WHERE_OPS = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+}
+
+
+def matches_where(meta: dict[str, Any], where: dict[str, Any]) -> bool:
+    """Evaluate a Chroma-style ``where`` filter against one metadata dict.
+
+    As in Chroma, a field comparison on a missing key never matches.
+
+    Raises:
+        ValueError: If the filter uses an unsupported operator.
+    """
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(meta, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(meta, c) for c in condition):
+                return False
+        elif key not in meta:
+            return False
+        elif isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op not in _WHERE_OPS:
+                    raise ValueError(f"Unsupported where operator {op!r}")
+                if not _WHERE_OPS[op](meta[key], operand):
+                    return False
+        elif meta[key] != condition:
+            return False
+    return True
+
+
+class _MaskCache:
+    """Boolean row masks for ``where`` filters, keyed by the filter.
+
+    Patient filters repeat (same gender / age band), so each distinct
+    filter is evaluated over the metadata rows once and then reused until
+    the backend is written to.
+    """
+
+    max_entries = 512
+
+    def __init__(self) -> None:
+        self._masks: dict[str, np.ndarray] = {}
+
+    def clear(self) -> None:
+        self._masks = {}
+
+    def get(self, metadatas: list[dict[str, Any]], where: dict[str, Any]) -> np.ndarray:
+        key = json.dumps(where, sort_keys=True)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = np.fromiter(
+                (matches_where(m, where) for m in metadatas),
+                dtype=bool, count=len(metadatas),
+            )
+            if len(self._masks) >= self.max_entries:
+                self._masks.clear()
+            self._masks[key] = mask
+        return mask
+
+
+class VectorBackend:
+    """Base class for search-collection backends.
+
+    ``add`` upserts (existing ids are overwritten).  ``snapshot`` makes
+    the current contents durable so that other processes - and this one
+    after a restart - see them; backends that persist on every write
+    implement it as a no-op.
+    """
+
+    name = "base"
+
+    def add(
+        self,
+        ids: list[str],
+        documents: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        raise NotImplementedError
+
+    def query(
+        self,
+        query_embedding: list[float],
+        top_k: int = 5,
+        where: dict[str, Any] | None = None,
+    ) -> list[RetrievalHit]:
+        """Return the *top_k* most similar chunks matching *where*, best first."""
+        raise NotImplementedError
+
+    def query_many(
+        self,
+        query_embeddings: list[list[float]],
+        top_k: int = 5,
+        where: dict[str, Any] | None = None,
+    ) -> list[list[RetrievalHit]]:
+        """Batched :meth:`query`; one result list per query, in order."""
+        return [self.query(q, top_k=top_k, where=where) for q in query_embeddings]
+
+    def get(self, ids: list[str] | None = None) -> list[dict[str, Any]]:
+        """Return stored chunks (all, or the subset of *ids* that exist)."""
+        raise NotImplementedError
+
+    def embedding(self, doc_id: str) -> list[float] | None:
+        """Return the stored embedding for *doc_id*, if present."""
+        raise NotImplementedError
+
+    def embeddings(self, ids: list[str]) -> list[list[float] | None]:
+        """Batched :meth:`embedding`; one entry (or None) per id."""
+        return [self.embedding(doc_id) for doc_id in ids]
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        """Remove every chunk, including any persisted snapshot."""
+        raise NotImplementedError
+
+    def snapshot(self) -> None:
+        raise NotImplementedError
+
+    def data_version(self) -> Any:
+        """Token that changes when the stored chunks change underneath this
+        object (another process replaced a file it serves); None when the
+        backend does not track it."""
+        return None
+
+
+# ---- Chroma ---------------------------------------------------------------
+class ChromaBackend(VectorBackend):
+    """A ChromaDB collection with cosine HNSW space."""
+
+    name = "chroma"
+    batch_size = 100
+
+    def __init__(self, client, collection_name: str = "ng12_guidelines") -> None:
+        self._client = client
+        self._collection_name = collection_name
+        self._collection = None
+
+    def _get_collection(self):
+        if self._collection is None:
+            self._collection = self._client.get_or_create_collection(
+                name=self._collection_name,
+                metadata={"hnsw:space": "cosine"},
+            )
+        return self._collection
+
+    def _call(self, method: str, **kwargs):
+        """Call a collection method, re-resolving the collection once if it
+        was dropped and recreated behind this handle (another worker
+        re-indexing a shared ChromaDB server)."""
+        from chromadb.errors import NotFoundError
+
+        try:
+            return getattr(self._get_collection(), method)(**kwargs)
+        except NotFoundError:
+            self._collection = None
+            return getattr(self._get_collection(), method)(**kwargs)
+
+    def add(self, ids, documents, embeddings, metadatas) -> None:
+        for start in range(0, len(ids), self.batch_size):
+            end = start + self.batch_size
+            self._call(
+                "upsert",
+                ids=ids[start:end],
+                documents=documents[start:end],
+                embeddings=embeddings[start:end],
+                metadatas=metadatas[start:end],
+            )
+
+    def query(self, query_embedding, top_k=5, where=None):
+        return self.query_many([query_embedding], top_k=top_k, where=where)[0]
+
+    def query_many(self, query_embeddings, top_k=5, where=None):
+        if not query_embeddings:
+            return []
+        results = self._call(
+            "query",
+            query_embeddings=list(query_embeddings),
+            n_results=top_k,
+            where=where,
+            include=["documents", "metadatas", "distances"],
+        )
+        if not results["ids"]:
+            return [[] for _ in query_embeddings]
+        documents, metadatas = results["documents"], results["metadatas"]
+        distances = results["distances"]
+        return [
+            [
+                RetrievalHit(doc_id, documents[q][i], metadatas[q][i], 1.0 - distances[q][i])
+                for i, doc_id in enumerate(ids)
+            ]
+            for q, ids in enumerate(results["ids"])
+        ]
+
+    def get(self, ids=None):
+        results = self._call("get", ids=ids, include=["documents", "metadatas"])
+        return [
+            {
+                "chunk_id": doc_id,
+                "text": results["documents"][i],
+                "metadata": dict(results["metadatas"][i]),
+            }
+            for i, doc_id in enumerate(results["ids"])
+        ]
+
+    def embedding(self, doc_id):
+        results = self._call("get", ids=[doc_id], include=["embeddings"])
+        if not results["ids"]:
+            return None
+        return [float(x) for x in results["embeddings"][0]]
+
+    def embeddings(self, ids):
+        if not ids:
+            return []
+        results = self._call("get", ids=ids, include=["embeddings"])
+        found = {
+            doc_id: [float(x) for x in results["embeddings"][i]]
+            for i, doc_id in enumerate(results["ids"])
+        }
+        return [found.get(doc_id) for doc_id in ids]
+
+    def count(self) -> int:
+        return self._call("count")
+
+    def reset(self) -> None:
+        from chromadb.errors import NotFoundError
+
+        try:
+            self._client.delete_collection(name=self._collection_name)
+        except (ValueError, KeyError, NotFoundError):
+            pass  # Collection does not exist or DB schema is stale
+        self._collection = None
+        self._get_collection()
+
+    def snapshot(self) -> None:
+        pass  # Chroma persists every write
+
+
+# ---- NumPy ----------------------------------------------------------------
+class NumpyBackend(VectorBackend):
+    """Exact in-memory search, snapshotted to a single .npz file."""
+
+    name = "numpy"
+    filename = "numpy_index.npz"
+
+    def __init__(self, persist_dir: str) -> None:
+        self._path = Path(persist_dir) / self.filename
+        self._index = NumpyIndex.load(self._path) if self._path.exists() else NumpyIndex()
+        self._masks = _MaskCache()
+
+    def add(self, ids, documents, embeddings, metadatas) -> None:
+        self._index.add(ids, documents, embeddings, metadatas)
+        self._masks.clear()
+
+    def query(self, query_embedding, top_k=5, where=None):
+        mask = self._masks.get(self._index.metadatas, where) if where else None
+        return self._index.query(query_embedding, top_k=top_k, mask=mask)
+
+    def query_many(self, query_embeddings, top_k=5, where=None):
+        mask = self._masks.get(self._index.metadatas, where) if where else None
+        return self._index.query_many(query_embeddings, top_k=top_k, mask=mask)
+
+    def get(self, ids=None):
+        return self._index.get(ids)
+
+    def embedding(self, doc_id):
+        return self._index.embedding(doc_id)
+
+    def count(self) -> int:
+        return self._index.count()
+
+    def reset(self) -> None:
+        self._index.reset()
+        self._masks.clear()
+        self._path.unlink(missing_ok=True)
+
+    def snapshot(self) -> None:
+        self._index.save(self._path)
+
+
+# ---- memory-mapped --------------------------------------------------------
+class MappedBackend(NumpyBackend):
+    """Exact search over a read-only, memory-mapped index file.
+
+    Worker processes map the same file, so the OS page cache holds one
+    copy of the index for all of them.  Writes (ingest) go to a writable
+    in-memory copy; ``snapshot`` exports it and maps the new file.
+
+    A re-index replaces the file rather than rewriting it, so a worker
+    that mapped the old one would keep serving it.  Every read therefore
+    checks the file's stamp and re-maps the file when another process
+    has replaced (or removed) it.
+    """
+
+    name = "mmap"
+    filename = "mapped_index.bin"
+
+    def __init__(self, persist_dir: str) -> None:
+        self._path = Path(persist_dir) / self.filename
+        self._index = NumpyIndex()
+        self._stamp = None
+        self._masks = _MaskCache()
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Re-map the file if it changed since it was mapped.
+
+        Skipped while this process holds unexported writes.
+        """
+        if not isinstance(self._index, MappedIndex) and self._index.count():
+            return
+        stamp = file_stamp(self._path)
+        if stamp == self._stamp:
+            return
+        self._index = MappedIndex.open(self._path) if stamp else NumpyIndex()
+        self._stamp = stamp
+        self._masks.clear()
+
+    def add(self, ids, documents, embeddings, metadatas) -> None:
+        self._refresh()
+        if isinstance(self._index, MappedIndex):
+            self._index = self._index.to_numpy()
+        super().add(ids, documents, embeddings, metadatas)
+
+    def query(self, query_embedding, top_k=5, where=None):
+        self._refresh()
+        return super().query(query_embedding, top_k=top_k, where=where)
+
+    def query_many(self, query_embeddings, top_k=5, where=None):
+        self._refresh()
+        return super().query_many(query_embeddings, top_k=top_k, where=where)
+
+    def get(self, ids=None):
+        self._refresh()
+        return super().get(ids)
+
+    def embedding(self, doc_id):
+        self._refresh()
+        return super().embedding(doc_id)
+
+    def count(self) -> int:
+        self._refresh()
+        return super().count()
+
+    def reset(self) -> None:
+        self._index = NumpyIndex()
+        self._masks.clear()
+        self._path.unlink(missing_ok=True)
+        self._stamp = None
+
+    def snapshot(self) -> None:
+        save_mapped(self._index, self._path)
+        self._index = MappedIndex.open(self._path)
+        self._stamp = file_stamp(self._path)
+        self._masks.clear()
+
+    def data_version(self) -> Any:
+        self._refresh()
+        return self._stamp
+
+
+# ---- hnswlib --------------------------------------------------------------
+class HnswBackend(VectorBackend):
+    """hnswlib cosine index held in memory, with a JSON sidecar for
+    documents and metadata.
+
+    Approximate like Chroma's HNSW, but without the SQLite round-trip.
+    ``ef`` is raised to at least ``top_k`` on each query so small indexes
+    are searched (near) exhaustively.  ``snapshot`` replaces both files
+    atomically, sidecar last.
+    """
+
+    name = "hnsw"
+    index_filename = "hnsw_index.bin"
+    sidecar_filename = "hnsw_index.json"
+    ef_construction = 200
+    m = 16
+    ef_search = 64
+
+    def __init__(self, persist_dir: str) -> None:
+        import hnswlib  # optional dependency
+
+        self._hnswlib = hnswlib
+        self._index_path = Path(persist_dir) / self.index_filename
+        self._sidecar_path = Path(persist_dir) / self.sidecar_filename
+        self._clear()
+        if self._index_path.exists() and self._sidecar_path.exists():
+            self._load()
+
+    def _clear(self) -> None:
+        self._index = None
+        self._dim = 0
+        self._ids: list[str] = []
+        self._documents: list[str] = []
+        self._metadatas: list[dict[str, Any]] = []
+        self._labels: dict[str, int] = {}
+        self._masks = _MaskCache()
+
+    def _new_index(self, dim: int, capacity: int):
+        index = self._hnswlib.Index(space="cosine", dim=dim)
+        index.init_index(
+            max_elements=max(capacity, 1),
+            ef_construction=self.ef_construction,
+            M=self.m,
+        )
+        return index
+
+    def _load(self) -> None:
+        with open(self._sidecar_path, "r", encoding="utf-8") as f:
+            sidecar = json.load(f)
+        self._dim = sidecar["dim"]
+        self._ids = sidecar["ids"]
+        self._documents = sidecar["documents"]
+        self._metadatas = sidecar["metadatas"]
+        self._labels = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self._index = self._hnswlib.Index(space="cosine", dim=self._dim)
+        self._index.load_index(str(self._index_path), max_elements=max(len(self._ids), 1))
+
+    def add(self, ids, documents, embeddings, metadatas) -> None:
+        if not ids:
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if self._index is None:
+            self._dim = vectors.shape[1]
+            self._index = self._new_index(self._dim, len(ids))
+        elif vectors.shape[1] != self._dim:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match "
+                f"index dimension {self._dim}"
+            )
+
+        labels = []
+        for i, doc_id in enumerate(ids):
+            label = self._labels.get(doc_id)
+            if label is None:
+                label = len(self._ids)
+                self._labels[doc_id] = label
+                self._ids.append(doc_id)
+                self._documents.append(documents[i])
+                self._metadatas.append(dict(metadatas[i]))
+            else:
+                self._documents[label] = documents[i]
+                self._metadatas[label] = dict(metadatas[i])
+            labels.append(label)
+        self._masks.clear()
+
+        if len(self._ids) > self._index.get_max_elements():
+            self._index.resize_index(max(len(self._ids), 2 * self._index.get_max_elements()))
+        self._index.add_items(vectors, np.asarray(labels, dtype=np.int64))
+
+    def query(self, query_embedding, top_k=5, where=None):
+        return self.query_many([query_embedding], top_k=top_k, where=where)[0]
+
+    def query_many(self, query_embeddings, top_k=5, where=None):
+        mask = self._masks.get(self._metadatas, where) if where else None
+        n = self.count() if mask is None else int(mask.sum())
+        if n == 0 or top_k <= 0 or not len(query_embeddings):
+            return [[] for _ in query_embeddings]
+        k = min(top_k, n)
+        ef = max(self.ef_search, k)
+        while True:
+            self._index.set_ef(ef)
+            try:
+                labels, distances = self._index.knn_query(
+                    np.asarray(query_embeddings, dtype=np.float32), k=k,
+                    filter=None if mask is None else (lambda label: bool(mask[label])),
+                )
+                break
+            except RuntimeError:
+                # hnswlib raises when the search reaches fewer than k items
+                # (a selective filter): search the whole graph, then settle
+                # for fewer results.
+                if ef < self.count():
+                    ef = self.count()
+                elif k > 1:
+                    k -= 1
+                else:
+                    return [[] for _ in query_embeddings]
+        return [
+            [
+                RetrievalHit(
+                    self._ids[label], self._documents[label], self._metadatas[label],
+                    1.0 - float(dist),
+                )
+                for label, dist in zip(row_labels.tolist(), row_distances)
+            ]
+            for row_labels, row_distances in zip(labels, distances)
+        ]
+
+    def _result(self, label: int) -> dict[str, Any]:
+        return {
+            "chunk_id": self._ids[label],
+            "text": self._documents[label],
+            "metadata": dict(self._metadatas[label]),
+        }
+
+    def get(self, ids=None):
+        if ids is None:
+            labels = range(len(self._ids))
+        else:
+            labels = [self._labels[i] for i in ids if i in self._labels]
+        return [self._result(label) for label in labels]
+
+    def embedding(self, doc_id):
+        label = self._labels.get(doc_id)
+        if label is None:
+            return None
+        return [float(x) for x in self._index.get_items([label])[0]]
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def reset(self) -> None:
+        self._clear()
+        self._index_path.unlink(missing_ok=True)
+        self._sidecar_path.unlink(missing_ok=True)
+
+    def snapshot(self) -> None:
+        if self._index is None:
+            return
+        self._index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._index_path.with_name(self._index_path.name + ".tmp")
+        self._index.save_index(str(tmp))
+        os.replace(tmp, self._index_path)
+        write_json_atomic(self._sidecar_path, {
+            "dim": self._dim,
+            "ids": self._ids,
+            "documents": self._documents,
+            "metadatas": self._metadatas,
+        })
+
+
+def create_backend(name: str, persist_dir: str, client=None) -> VectorBackend:
+    """Instantiate a vector backend by name.
+
+    Args:
+        name: One of VECTOR_BACKENDS.
+        persist_dir: Directory for persisted index data.
+        client: Existing ChromaDB client to reuse (chroma backend only).
+
+    Raises:
+        ValueError: If *name* is not a known backend.
+    """
+    if name == "chroma":
+        if client is None:
+            import chromadb
+
+            client = chromadb.PersistentClient(path=persist_dir)
+        return ChromaBackend(client)
+    if name == "numpy":
+        return NumpyBackend(persist_dir)
+    if name == "hnsw":
+        return HnswBackend(persist_dir)
+    if name == "mmap":
+        return MappedBackend(persist_dir)
+    raise ValueError(
+        f"Unknown VECTOR_BACKEND {name!r}; expected one of {list(VECTOR_BACKENDS)}"
+    )
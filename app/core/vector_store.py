@@ -2,44 +2,142 @@
 ChromaDB Vector Store
 
 Manages the NG12 guideline vector index.
-Uses ChromaDB PersistentClient with default embeddings.
+The search collection is stored in the backend selected by
+``settings.VECTOR_BACKEND`` (see app.core.vector_backends); the canonical
+collection always lives in ChromaDB.
+
+ChromaDB runs embedded (a PersistentClient over CHROMA_PERSIST_DIR) by
+default.  With CHROMA_SERVER_HOST set it is reached over HTTP instead, so
+every worker process shares one server and one copy of its index; each
+process keeps a single client whose keep-alive connection pool serves
+all of its threads.
+
+Search-collection embeddings are computed explicitly (see
+app.core.embeddings) so that an optional fitted projection can reduce
+documents and queries to the same low-dimensional space.
+
+Every read has an async variant (``aquery_by_vector``, ``aget_all``,
+``aget_canonical`` ...) for handlers and LangGraph nodes.  These run the
+blocking index call on a dedicated, bounded thread pool
+(VECTOR_STORE_THREADS) so concurrent sessions do not serialize on the
+event loop; ``index_pool_stats`` reports its queue depth.
+
+Every index write bumps the index generation, which keys the in-memory
+views of the index (canonical map, metadata views, derived structures,
+retrieval cache).  A bump also replaces a generation stamp file under
+CHROMA_PERSIST_DIR.  Each process checks that file's stamp before
+serving from its views and moves to a new generation when it changed.
+So an ingest or refresh in any worker or CLI process invalidates every
+process's views, and the search backend is reopened on the new index.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Any, Optional
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional, TypeVar
 
 import chromadb
+import numpy as np
+from chromadb.api import ClientAPI
+from chromadb.config import Settings as ChromaSettings
+from chromadb.errors import NotFoundError
 
 from app.config import settings
+from app.core import embeddings
+from app.core.index_files import FileStamp, file_stamp, write_json_atomic
+from app.core.projection import Projection, fit_projection
+from app.core.retrieval_hit import RetrievalHit
+from app.core.vector_backends import VectorBackend, create_backend
+
+T = TypeVar("T")
 
 COLLECTION_NAME = "ng12_guidelines"
 CANONICAL_COLLECTION_NAME = "ng12_canonical"
+PROJECTION_FILENAME = "projection.npz"
+GENERATION_FILENAME = "index_generation.json"
 
-_client: Optional[chromadb.PersistentClient] = None
-_collection: Optional[chromadb.Collection] = None
+_client: Optional[ClientAPI] = None
+_backend: Optional[VectorBackend] = None
 _canonical_collection: Optional[chromadb.Collection] = None
+# (file stamp, projection) - a refit by another worker changes the stamp
+_projection: tuple[FileStamp, Projection] | None = None
+
+# Bumped by every write to either collection (i.e. on each ingest), here
+# or - via the generation file - in another process, and when the backend
+# re-maps an index file another process replaced.  In-memory structures
+# derived from the index compare against it to know when they are stale.
+_index_generation = 0
+# Stamp of the generation file as of this process's current generation
+_generation_stamp: FileStamp | None = None
+# Backend data version (e.g. mapped file stamp) as of the current generation
+_backend_version: Any = None
+# (generation, chunk_id -> canonical chunk) - replaced as a single tuple so
+# readers never observe a half-built map.
+_canonical_cache: tuple[int, Mapping[str, dict[str, Any]]] | None = None
+# (generation, chunk_id -> decoded read-only metadata) shared by every
+# search hit on that chunk
+_metadata_views: tuple[int, dict[str, Mapping[str, Any]]] = (-1, {})
+# (generation, name -> structure) built by derived_from_index; the
+# generation's get_all() result is kept under _ALL_CHUNKS for the builders
+_derived: tuple[int, dict[str, Any]] = (-1, {})
+_ALL_CHUNKS = "_all_chunks"
+
+# Thread pool for the async API and its queue metrics (see index_pool_stats)
+_index_executor: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_pool_queued = 0
+_pool_active = 0
+_pool_max_queued = 0
+_pool_completed = 0
+_pool_wait_ms = 0.0
+
+
+def _create_client() -> ClientAPI:
+    """ChromaDB client for the configured mode (embedded or server)."""
+    if not settings.CHROMA_SERVER_HOST:
+        return chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIR)
+    return chromadb.HttpClient(
+        host=settings.CHROMA_SERVER_HOST,
+        port=settings.CHROMA_SERVER_PORT,
+        settings=ChromaSettings(
+            anonymized_telemetry=False,
+            chroma_http_keepalive_secs=settings.CHROMA_HTTP_KEEPALIVE_SECS,
+            chroma_http_max_connections=settings.CHROMA_HTTP_MAX_CONNECTIONS,
+            chroma_http_max_keepalive_connections=settings.CHROMA_HTTP_MAX_CONNECTIONS,
+        ),
+    )
 
 
-def _get_client() -> chromadb.PersistentClient:
-    """Lazy-initialize the ChromaDB persistent client."""
+def _get_client() -> ClientAPI:
+    """Lazy-initialize the process-wide ChromaDB client."""
     global _client
     if _client is None:
-        _client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIR)
+        _client = _create_client()
     return _client
 
 
-def get_or_create_collection() -> chromadb.Collection:
-    """Return the ChromaDB collection, creating it if necessary."""
-    global _collection
-    if _collection is None:
-        client = _get_client()
-        _collection = client.get_or_create_collection(
-            name=COLLECTION_NAME,
-            metadata={"hnsw:space": "cosine"},
+def get_backend() -> VectorBackend:
+    """Return the search-collection backend, creating it on first use.
+
+    Reopened when another process has re-indexed (see _sync_generation).
+    """
+    global _backend, _backend_version
+    _sync_generation()
+    if _backend is None:
+        _backend = create_backend(
+            settings.VECTOR_BACKEND,
+            settings.CHROMA_PERSIST_DIR,
+            client=_get_client() if settings.VECTOR_BACKEND == "chroma" else None,
         )
-    return _collection
+        _backend_version = _backend.data_version()
+    return _backend
 
 
 def get_or_create_canonical_collection() -> chromadb.Collection:
@@ -53,6 +151,187 @@ def get_or_create_canonical_collection() -> chromadb.Collection:
     return _canonical_collection
 
 
+def _canonical_call(method: str, **kwargs: Any) -> Any:
+    """Call a canonical collection method, re-resolving the collection once
+    if another worker dropped and recreated it on a shared server."""
+    global _canonical_collection
+    try:
+        return getattr(get_or_create_canonical_collection(), method)(**kwargs)
+    except NotFoundError:
+        _canonical_collection = None
+        return getattr(get_or_create_canonical_collection(), method)(**kwargs)
+
+
+def _decode_metadata(meta: Mapping[str, Any]) -> dict[str, Any]:
+    """Copy a stored metadata dict, decoding symptom_keywords_json to a list."""
+    meta = dict(meta)
+    if "symptom_keywords_json" in meta:
+        try:
+            meta["symptom_keywords"] = json.loads(meta["symptom_keywords_json"])
+        except (json.JSONDecodeError, TypeError):
+            meta["symptom_keywords"] = []
+    return meta
+
+
+def _metadata_view(chunk_id: str, meta: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Shared, decoded, read-only metadata for a search chunk.
+
+    Decoded once per chunk per index generation; every hit on the chunk
+    references the same mapping instead of carrying its own copy.
+    """
+    global _metadata_views
+    generation, views = _metadata_views
+    if generation != _index_generation:
+        views = {}
+        _metadata_views = (_index_generation, views)
+    view = views.get(chunk_id)
+    if view is None:
+        view = views[chunk_id] = MappingProxyType(_decode_metadata(meta))
+    return view
+
+
+def _share_metadata(hits: list[RetrievalHit]) -> list[RetrievalHit]:
+    """Point each backend hit at its chunk's shared metadata view, in place."""
+    for hit in hits:
+        hit.metadata = _metadata_view(hit.chunk_id, hit.metadata)
+    return hits
+
+
+def _generation_path() -> Path:
+    return Path(settings.CHROMA_PERSIST_DIR) / GENERATION_FILENAME
+
+
+def _sync_generation() -> None:
+    """Move to a new generation if another process bumped the shared one
+    or replaced the data the open backend serves.
+
+    One stat of the generation file (plus one of a mapped index file).  On
+    a shared bump the backend is dropped too, so the next get_backend()
+    reopens it on the new index (reloads a snapshot, re-resolves a
+    recreated Chroma collection).  A backend that re-mapped a replaced
+    file is kept, but everything derived from its old contents is stale.
+    """
+    global _index_generation, _generation_stamp, _backend, _backend_version
+    stamp = file_stamp(_generation_path())
+    if stamp != _generation_stamp:
+        _generation_stamp = stamp
+        _index_generation += 1
+        _backend = None
+    elif _backend is not None:
+        version = _backend.data_version()
+        if version != _backend_version:
+            _backend_version = version
+            _index_generation += 1
+
+
+def index_generation() -> int:
+    """Return the current index generation counter."""
+    _sync_generation()
+    return _index_generation
+
+
+def bump_generation() -> int:
+    """Mark every in-memory view of the index as stale, in every process.
+
+    Returns:
+        The new generation number.
+    """
+    global _index_generation, _generation_stamp, _backend_version
+    _index_generation += 1
+    write_json_atomic(_generation_path(), {"pid": os.getpid(), "time": time.time()})
+    _generation_stamp = file_stamp(_generation_path())
+    if _backend is not None:
+        _backend_version = _backend.data_version()
+    return _index_generation
+
+
+def _projection_path() -> Path:
+    """Location of the fitted projection, stored alongside the index."""
+    return Path(settings.CHROMA_PERSIST_DIR) / PROJECTION_FILENAME
+
+
+def get_projection() -> Projection | None:
+    """Return the projection in use for the search collection, if any.
+
+    Loaded lazily from disk so that every worker process applies the
+    matrix fitted at ingest time, and reloaded whenever the file changes
+    (i.e. after a re-index in any process).
+    """
+    global _projection
+    if settings.EMBEDDING_PROJECTION == "none":
+        return None
+    path = _projection_path()
+    stamp = file_stamp(path)
+    if stamp is None:
+        _projection = None
+        return None
+    cached = _projection
+    if cached is None or cached[0] != stamp:
+        cached = _projection = (stamp, Projection.load(path))
+    return cached[1]
+
+
+def _embed_documents(documents: list[str]) -> list[list[float]]:
+    """Embed documents for the search collection.
+
+    When a projection method is configured and none has been fitted yet
+    (i.e. right after ``reset``), the projection is fitted on this batch
+    and persisted before the vectors are reduced.
+    """
+    global _projection
+    vectors = embeddings.embed_texts(documents)
+    if settings.EMBEDDING_PROJECTION == "none" or not vectors:
+        return vectors
+
+    projection = get_projection()
+    if projection is None:
+        projection = fit_projection(
+            settings.EMBEDDING_PROJECTION,
+            np.asarray(vectors, dtype=np.float32),
+            settings.EMBEDDING_PROJECTION_DIM,
+        )
+        projection.save(_projection_path())
+        _projection = (file_stamp(_projection_path()), projection)
+    return projection.transform(vectors).tolist()
+
+
+def _project_query(vector: list[float]) -> list[float]:
+    """Map a raw query embedding into the search collection's space."""
+    projection = get_projection()
+    if projection is None:
+        return vector
+    return projection.transform([vector])[0].tolist()
+
+
+def _project_queries(vectors: list[list[float]]) -> list[list[float]]:
+    """Batched :func:`_project_query`."""
+    projection = get_projection()
+    if projection is None or not vectors:
+        return vectors
+    return projection.transform(vectors).tolist()
+
+
+def embed_query(query_text: str) -> list[float]:
+    """Embed a query into the same space as the search collection."""
+    return _project_query(embeddings.embed_texts([query_text])[0])
+
+
+async def aembed_query(query_text: str) -> list[float]:
+    """Async variant of embed_query (embedding runs on a thread pool)."""
+    vectors = await embeddings.aembed_texts([query_text])
+    return _project_query(vectors[0])
+
+
+def embed_queries(query_texts: list[str]) -> list[list[float]]:
+    """Embed several queries in one provider call."""
+    return _project_queries(embeddings.embed_texts(query_texts))
+
+
+async def aembed_queries(query_texts: list[str]) -> list[list[float]]:
+    """Async variant of embed_queries."""
+    return _project_queries(await embeddings.aembed_texts(query_texts))
+
+
 def add_chunks(chunks: list[dict[str, Any]]) -> int:
     """Add document chunks to the vector store.
 
@@ -60,14 +339,15 @@ def add_chunks(chunks: list[dict[str, Any]]) -> int:
       - Removes None values from metadata (ChromaDB rejects them)
       - list-type values should already be JSON-serialized by the chunker
 
+    Embeddings are computed up front (and projected when
+    ``EMBEDDING_PROJECTION`` is enabled) rather than left to ChromaDB.
+
     Args:
         chunks: List of dicts with keys: chunk_id, text, metadata.
 
     Returns:
         Number of chunks indexed.
     """
-    collection = get_or_create_collection()
-
     ids = []
     documents = []
     metadatas = []
@@ -81,23 +361,25 @@ def add_chunks(chunks: list[dict[str, Any]]) -> int:
         }
         metadatas.append(clean_meta)
 
-    # ChromaDB supports batched upsert; use upsert to be idempotent
-    batch_size = 100
-    for start in range(0, len(ids), batch_size):
-        end = start + batch_size
-        collection.upsert(
-            ids=ids[start:end],
-            documents=documents[start:end],
-            metadatas=metadatas[start:end],
-        )
+    vectors = _embed_documents(documents)
+
+    # Backends upsert, so re-adding the same chunks is idempotent
+    backend = get_backend()
+    backend.add(ids, documents, vectors, metadatas)
+    backend.snapshot()
 
+    bump_generation()
     return len(ids)
 
 
-def query(query_text: str, top_k: int = 5) -> list[dict[str, Any]]:
+def query(
+    query_text: str,
+    top_k: int = 5,
+    where: dict[str, Any] | None = None,
+) -> list[RetrievalHit]:
     """Query the vector store for relevant chunks.
 
-    ChromaDB uses cosine distance by default:
+    The search collection uses cosine distance:
       distance = 1 - cosine_similarity
       score = 1 - distance  (range 0..1, 1 = most similar)
 
@@ -106,43 +388,96 @@ def query(query_text: str, top_k: int = 5) -> list[dict[str, Any]]:
     Args:
         query_text: The search query.
         top_k: Number of results to return.
+        where: Optional metadata filter applied before the similarity
+            search (Chroma ``where`` syntax).
 
     Returns:
-        List of result dicts with keys: chunk_id, text, metadata, score.
+        List of :class:`RetrievalHit` (chunk_id, text, metadata, score),
+        best first; metadata is the chunk's shared read-only mapping.
     """
-    collection = get_or_create_collection()
+    return query_by_vector(embed_query(query_text), top_k=top_k, where=where)
 
-    results = collection.query(
-        query_texts=[query_text],
-        n_results=top_k,
-        include=["documents", "metadatas", "distances"],
-    )
 
-    output = []
-    if not results["ids"] or not results["ids"][0]:
-        return output
-
-    for i, doc_id in enumerate(results["ids"][0]):
-        distance = results["distances"][0][i]
-        score = 1.0 - distance  # cosine similarity
-
-        meta = dict(results["metadatas"][0][i])
-        # Convert symptom_keywords_json back to list
-        if "symptom_keywords_json" in meta:
-            try:
-                meta["symptom_keywords"] = json.loads(
-                    meta["symptom_keywords_json"]
-                )
-            except (json.JSONDecodeError, TypeError):
-                meta["symptom_keywords"] = []
-
-        output.append({
-            "chunk_id": doc_id,
-            "text": results["documents"][0][i],
-            "metadata": meta,
-            "score": score,
-        })
+async def aquery(
+    query_text: str,
+    top_k: int = 5,
+    where: dict[str, Any] | None = None,
+) -> list[RetrievalHit]:
+    """Async variant of :func:`query`.
+
+    Awaits the query embedding on the embedding thread pool, then the
+    search on the index thread pool.
+    """
+    return await aquery_by_vector(await aembed_query(query_text), top_k=top_k, where=where)
+
 
+def query_by_vector(
+    query_embedding: list[float],
+    top_k: int = 5,
+    where: dict[str, Any] | None = None,
+) -> list[RetrievalHit]:
+    """Query the search collection with a precomputed query embedding.
+
+    Args:
+        query_embedding: Query vector in the collection's (projected) space.
+        top_k: Number of results to return.
+        where: Optional metadata pre-filter (Chroma ``where`` syntax).
+
+    Returns:
+        List of :class:`RetrievalHit`, best first.
+    """
+    return _share_metadata(get_backend().query(query_embedding, top_k=top_k, where=where))
+
+
+def query_many_by_vector(
+    query_embeddings: list[list[float]],
+    top_k: int = 5,
+    where: dict[str, Any] | None = None,
+) -> list[list[RetrievalHit]]:
+    """Batched :func:`query_by_vector`: a single index call for all queries.
+
+    Returns:
+        One result list per query embedding, in input order.
+    """
+    batch = get_backend().query_many(query_embeddings, top_k=top_k, where=where)
+    return [_share_metadata(results) for results in batch]
+
+
+def score_chunks(
+    query_embedding: list[float],
+    chunk_ids: list[str],
+) -> list[RetrievalHit]:
+    """Score specific chunks against a query embedding.
+
+    Used to give candidates found by other means (e.g. the lexical index)
+    the same cosine score ``query_by_vector`` would have assigned.
+
+    Args:
+        query_embedding: Query vector in the collection's (projected) space.
+        chunk_ids: Chunks to score; unknown ids are skipped.
+
+    Returns:
+        List of :class:`RetrievalHit`, in the order of *chunk_ids*.
+    """
+    if not chunk_ids:
+        return []
+    backend = get_backend()
+    chunks = {c["chunk_id"]: c for c in backend.get(chunk_ids)}
+    q = np.asarray(query_embedding, dtype=np.float32)
+    q /= np.linalg.norm(q) or 1.0
+
+    output = []
+    for chunk_id, vector in zip(chunk_ids, backend.embeddings(chunk_ids)):
+        chunk = chunks.get(chunk_id)
+        if chunk is None or vector is None:
+            continue
+        v = np.asarray(vector, dtype=np.float32)
+        output.append(RetrievalHit(
+            chunk_id,
+            chunk["text"],
+            _metadata_view(chunk_id, chunk["metadata"]),
+            float(v @ q / (np.linalg.norm(v) or 1.0)),
+        ))
     return output
 
 
@@ -179,9 +514,38 @@ def add_canonical_chunks(chunks: list[dict[str, Any]]) -> int:
             metadatas=metadatas[start:end],
         )
 
+    bump_generation()
     return len(ids)
 
 
+def load_canonical_cache() -> Mapping[str, dict[str, Any]]:
+    """Return the in-memory canonical map, (re)loading it when stale.
+
+    The whole canonical collection is read once per index generation into
+    a read-only mapping of chunk_id -> {chunk_id, text, metadata}.  The
+    entries are shared between callers and must not be mutated.
+    """
+    global _canonical_cache
+    _sync_generation()
+    cache = _canonical_cache
+    if cache is not None and cache[0] == _index_generation:
+        return cache[1]
+
+    generation = _index_generation
+    results = _canonical_call("get", include=["documents", "metadatas"])
+    chunks = {
+        cid: {
+            "chunk_id": cid,
+            "text": results["documents"][i],
+            "metadata": results["metadatas"][i],
+        }
+        for i, cid in enumerate(results["ids"])
+    }
+    mapping = MappingProxyType(chunks)
+    _canonical_cache = (generation, mapping)
+    return mapping
+
+
 def get_canonical(rule_id: str) -> dict[str, Any] | None:
     """Look up a canonical chunk by rule_id (e.g. "1.1.1").
 
@@ -191,16 +555,30 @@ def get_canonical(rule_id: str) -> dict[str, Any] | None:
     Returns:
         Dict with keys: chunk_id, text, metadata, or None if not found.
     """
-    collection = get_or_create_canonical_collection()
-    chunk_id = "ng12_" + rule_id.replace(".", "_")
-    results = collection.get(ids=[chunk_id], include=["documents", "metadatas"])
-    if results and results["ids"]:
-        return {
-            "chunk_id": results["ids"][0],
-            "text": results["documents"][0],
-            "metadata": results["metadatas"][0],
-        }
-    return None
+    return get_canonicals([rule_id]).get(rule_id)
+
+
+def get_canonicals(rule_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """Look up several canonical chunks by rule_id.
+
+    Served from the in-memory canonical map (see load_canonical_cache),
+    so no database round-trip is made once the map is loaded.
+
+    Args:
+        rule_ids: Rule identifiers such as ["1.1.1", "1.5.2"]; duplicates
+            are fetched once.
+
+    Returns:
+        Dict mapping each found rule_id to a dict with keys: chunk_id,
+        text, metadata.  Unknown rule_ids are omitted.
+    """
+    canonical = load_canonical_cache()
+    found: dict[str, dict[str, Any]] = {}
+    for rule_id in rule_ids:
+        chunk = canonical.get("ng12_" + rule_id.replace(".", "_"))
+        if chunk is not None:
+            found[rule_id] = chunk
+    return found
 
 
 def list_canonical() -> list[dict[str, Any]]:
@@ -209,22 +587,12 @@ def list_canonical() -> list[dict[str, Any]]:
     Returns:
         List of dicts with keys: chunk_id, text, metadata.
     """
-    collection = get_or_create_canonical_collection()
-    results = collection.get(include=["documents", "metadatas"])
-    chunks = []
-    for i, cid in enumerate(results["ids"]):
-        chunks.append({
-            "chunk_id": cid,
-            "text": results["documents"][i],
-            "metadata": results["metadatas"][i],
-        })
-    return chunks
+    return list(load_canonical_cache().values())
 
 
 def count_canonical() -> int:
     """Return the number of documents in the canonical collection."""
-    collection = get_or_create_canonical_collection()
-    return collection.count()
+    return _canonical_call("count")
 
 
 def reset_canonical() -> None:
@@ -233,29 +601,30 @@ def reset_canonical() -> None:
     client = _get_client()
     try:
         client.delete_collection(name=CANONICAL_COLLECTION_NAME)
-    except (ValueError, KeyError):
+    except (ValueError, KeyError, NotFoundError):
         pass
     _canonical_collection = None
     get_or_create_canonical_collection()
+    bump_generation()
 
 
 def reset() -> None:
-    """Delete and recreate both collections (search + canonical)."""
-    global _collection
-    client = _get_client()
-    try:
-        client.delete_collection(name=COLLECTION_NAME)
-    except (ValueError, KeyError):
-        pass  # Collection does not exist or DB schema is stale
-    _collection = None
-    get_or_create_collection()
+    """Delete and recreate both collections (search + canonical).
+
+    Also discards any fitted projection so the next ``add_chunks`` call
+    refits it on the new corpus.
+    """
+    global _projection
+    get_backend().reset()
+    _projection = None
+    _projection_path().unlink(missing_ok=True)
+    bump_generation()
     reset_canonical()
 
 
 def count() -> int:
     """Return the number of documents in the collection."""
-    collection = get_or_create_collection()
-    return collection.count()
+    return get_backend().count()
 
 
 def get_all() -> dict[str, Any]:
@@ -265,26 +634,41 @@ def get_all() -> dict[str, Any]:
         Dict with keys: ids, documents, metadatas.
         symptom_keywords_json is decoded back to a list in each metadata entry.
     """
-    collection = get_or_create_collection()
-    results = collection.get(include=["documents", "metadatas"])
-
-    # Decode symptom_keywords_json back to list
-    for meta in results["metadatas"]:
-        if "symptom_keywords_json" in meta:
-            try:
-                meta["symptom_keywords"] = json.loads(
-                    meta["symptom_keywords_json"]
-                )
-            except (json.JSONDecodeError, TypeError):
-                meta["symptom_keywords"] = []
-
+    chunks = get_backend().get()
     return {
-        "ids": results["ids"],
-        "documents": results["documents"],
-        "metadatas": results["metadatas"],
+        "ids": [c["chunk_id"] for c in chunks],
+        "documents": [c["text"] for c in chunks],
+        "metadatas": [_decode_metadata(c["metadata"]) for c in chunks],
     }
 
 
+def derived_from_index(name: str, build: Callable[[dict[str, Any]], T]) -> T:
+    """Return the in-memory structure *name* derived from the whole search
+    collection, building it on first use in each index generation.
+
+    Every builder is handed the same :func:`get_all` result, read once per
+    generation, so an ingest costs one full scan however many structures
+    (BM25 index, feature tables, reference graph ...) are derived from it.
+    The shared result must not be mutated.
+
+    Args:
+        name: Cache key of the structure.
+        build: Called with the ``get_all()`` dict when the structure is
+            missing or stale.
+    """
+    global _derived
+    _sync_generation()
+    generation, built = _derived
+    if generation != _index_generation:
+        built = {}
+        _derived = (_index_generation, built)
+    if name not in built:
+        if _ALL_CHUNKS not in built:
+            built[_ALL_CHUNKS] = get_all()
+        built[name] = build(built[_ALL_CHUNKS])
+    return built[name]
+
+
 def get_by_id(chunk_id: str) -> dict[str, Any] | None:
     """Retrieve a single chunk by ID with document, metadata, and embedding preview.
 
@@ -295,30 +679,127 @@ def get_by_id(chunk_id: str) -> dict[str, Any] | None:
         Dict with keys: chunk_id, text, metadata, embedding_preview (first 10 dims),
         or None if not found.
     """
-    collection = get_or_create_collection()
-    results = collection.get(
-        ids=[chunk_id],
-        include=["documents", "metadatas", "embeddings"],
-    )
-
-    if not results["ids"]:
+    backend = get_backend()
+    found = backend.get([chunk_id])
+    if not found:
         return None
 
-    meta = dict(results["metadatas"][0])
-    if "symptom_keywords_json" in meta:
+    embedding = backend.embedding(chunk_id) or []
+    return {
+        **found[0],
+        "metadata": _decode_metadata(found[0]["metadata"]),
+        "embedding_preview": embedding[:10],
+    }
+
+
+# ---- async API --------------------------------------------------------------
+def _get_index_executor() -> ThreadPoolExecutor:
+    """Return the index thread pool, creating it on first use."""
+    global _index_executor
+    if _index_executor is None:
+        _index_executor = ThreadPoolExecutor(
+            max_workers=settings.VECTOR_STORE_THREADS,
+            thread_name_prefix="index",
+        )
+    return _index_executor
+
+
+async def run_on_index(fn, *args: Any, **kwargs: Any) -> Any:
+    """Await a blocking index call on the index thread pool.
+
+    Calls beyond VECTOR_STORE_THREADS wait in the pool's queue; a caller
+    cancelled while still queued withdraws its call.
+    """
+    global _pool_queued, _pool_max_queued
+    submitted = time.perf_counter()
+
+    def _call() -> Any:
+        global _pool_queued, _pool_active, _pool_completed, _pool_wait_ms
+        with _pool_lock:
+            _pool_queued -= 1
+            _pool_active += 1
+            _pool_wait_ms += (time.perf_counter() - submitted) * 1000
         try:
-            meta["symptom_keywords"] = json.loads(
-                meta["symptom_keywords_json"]
-            )
-        except (json.JSONDecodeError, TypeError):
-            meta["symptom_keywords"] = []
+            return fn(*args, **kwargs)
+        finally:
+            with _pool_lock:
+                _pool_active -= 1
+                _pool_completed += 1
+
+    with _pool_lock:
+        _pool_queued += 1
+        _pool_max_queued = max(_pool_max_queued, _pool_queued)
+    future = _get_index_executor().submit(_call)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        if future.cancel():
+            with _pool_lock:
+                _pool_queued -= 1
+        raise
 
-    embedding = results["embeddings"][0] if results["embeddings"] else []
-    embedding_preview = embedding[:10] if embedding else []
 
-    return {
-        "chunk_id": results["ids"][0],
-        "text": results["documents"][0],
-        "metadata": meta,
-        "embedding_preview": embedding_preview,
-    }
+def index_pool_stats() -> dict[str, Any]:
+    """Queue depth and throughput of the index thread pool."""
+    with _pool_lock:
+        return {
+            "threads": settings.VECTOR_STORE_THREADS,
+            "queued": _pool_queued,
+            "active": _pool_active,
+            "max_queued": _pool_max_queued,
+            "completed": _pool_completed,
+            "mean_wait_ms": round(_pool_wait_ms / _pool_completed, 3) if _pool_completed else 0.0,
+        }
+
+
+async def aquery_by_vector(
+    query_embedding: list[float],
+    top_k: int = 5,
+    where: dict[str, Any] | None = None,
+) -> list[RetrievalHit]:
+    """Async variant of :func:`query_by_vector`."""
+    return await run_on_index(query_by_vector, query_embedding, top_k=top_k, where=where)
+
+
+async def aquery_many_by_vector(
+    query_embeddings: list[list[float]],
+    top_k: int = 5,
+    where: dict[str, Any] | None = None,
+) -> list[list[RetrievalHit]]:
+    """Async variant of :func:`query_many_by_vector`."""
+    return await run_on_index(query_many_by_vector, query_embeddings, top_k=top_k, where=where)
+
+
+async def ascore_chunks(query_embedding: list[float], chunk_ids: list[str]) -> list[RetrievalHit]:
+    """Async variant of :func:`score_chunks`."""
+    return await run_on_index(score_chunks, query_embedding, chunk_ids)
+
+
+async def aget_canonical(rule_id: str) -> dict[str, Any] | None:
+    """Async variant of :func:`get_canonical`."""
+    return await run_on_index(get_canonical, rule_id)
+
+
+async def aget_canonicals(rule_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """Async variant of :func:`get_canonicals`."""
+    return await run_on_index(get_canonicals, rule_ids)
+
+
+async def alist_canonical() -> list[dict[str, Any]]:
+    """Async variant of :func:`list_canonical`."""
+    return await run_on_index(list_canonical)
+
+
+async def acount() -> int:
+    """Async variant of :func:`count`."""
+    return await run_on_index(count)
+
+
+async def aget_all() -> dict[str, Any]:
+    """Async variant of :func:`get_all`."""
+    return await run_on_index(get_all)
+
+
+async def aget_by_id(chunk_id: str) -> dict[str, Any] | None:
+    """Async variant of :func:`get_by_id`."""
+    return await run_on_index(get_by_id, chunk_id)
@@ -0,0 +1,95 @@
+"""
+Startup Warm-up
+
+Pays the one-off initialisation costs (ChromaDB client, collection and
+HNSW segment loading, embedding model load) at boot instead of on the
+first /chat or /assess request after a deploy.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from app.config import settings
+from app.core import (
+    embeddings,
+    lexical_index,
+    partitions,
+    patient_features,
+    rag_pipeline,
+    reference_graph,
+    rerank,
+    rule_index,
+    vector_store,
+)
+
+logger = logging.getLogger(__name__)
+
+# Representative queries covering chat mode and patient (assessment) mode
+WARMUP_QUERIES: list[str] = [
+    "urgent referral for unexplained haemoptysis aged 40 and over",
+    "what are the referral criteria for a breast lump",
+    "rectal bleeding and change in bowel habit",
+]
+WARMUP_PATIENT: dict = {
+    "age": 55,
+    "gender": "Male",
+    "smoking_history": "Current Smoker",
+    "symptoms": ["unexplained hemoptysis", "fatigue"],
+}
+
+
+def warm_up() -> dict[str, float]:
+    """Run the warm-up phase and return per-step timings in milliseconds.
+
+    Steps:
+      1. open the persistent ChromaDB client
+      2. load both collections (search + the in-memory canonical map),
+         the patient and chat feature tables, the reference graph, the
+         configured cross-encoder, the BM25 index when HYBRID_RETRIEVAL
+         is on, the symptom-to-rule index when RULE_INDEX_FASTPATH is on,
+         and the partition router when PARTITION_ROUTING is on
+      3. initialise the embedding backend (and projection, if configured)
+      4. run the representative queries through rag_pipeline.retrieve
+
+    Returns:
+        Dict with keys: client_ms, collections_ms, embeddings_ms,
+        queries_ms, total_ms.
+    """
+    timings: dict[str, float] = {}
+    start = time.perf_counter()
+
+    step = time.perf_counter()
+    vector_store._get_client()
+    timings["client_ms"] = (time.perf_counter() - step) * 1000
+
+    step = time.perf_counter()
+    vector_store.count()
+    vector_store.load_canonical_cache()
+    patient_features.get_feature_table()
+    reference_graph.get_reference_graph()
+    rerank.get_chat_features()
+    rerank.get_cross_encoder()
+    if settings.HYBRID_RETRIEVAL:
+        lexical_index.get_lexical_index()
+    if settings.RULE_INDEX_FASTPATH:
+        rule_index.get_rule_index()
+    if settings.PARTITION_ROUTING:
+        partitions.get_router()
+    timings["collections_ms"] = (time.perf_counter() - step) * 1000
+
+    step = time.perf_counter()
+    embeddings.embed_texts(["warm-up"])
+    vector_store.get_projection()
+    timings["embeddings_ms"] = (time.perf_counter() - step) * 1000
+
+    step = time.perf_counter()
+    for query in WARMUP_QUERIES:
+        rag_pipeline.retrieve(query, top_k=5)
+    rag_pipeline.retrieve(WARMUP_QUERIES[0], top_k=5, patient_data=WARMUP_PATIENT)
+    timings["queries_ms"] = (time.perf_counter() - step) * 1000
+
+    timings["total_ms"] = (time.perf_counter() - start) * 1000
+    logger.info("Warm-up complete: %s", timings)
+    return timings
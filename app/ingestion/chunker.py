@@ -20,6 +20,12 @@ from typing import Any
 
 import fitz  # pymupdf
 
+from app.core.filters import (
+    FILTER_AGE_CEILING,
+    FILTER_AGE_FLOOR,
+    FILTER_ANY_GENDER,
+)
+
 
 # ---------------------------------------------------------------------------
 # Regex patterns
@@ -37,6 +43,15 @@ RE_AGE_AND_OVER = re.compile(r"aged?\s+(\d+)\s+and\s+over", re.IGNORECASE)
 RE_AGE_OR_OVER = re.compile(r"aged?\s+(\d+)\s+or\s+over", re.IGNORECASE)
 RE_AGE_UNDER = re.compile(r"(?:aged?\s+)?under\s+(\d+)", re.IGNORECASE)
 
+# Patient pre-filter predicates (see _filter_fields).  A recommendation is
+# sex-specific only when its population is women / men; organ terms are
+# not enough (they also occur in differential lists and bleed in from the
+# next section's header).  An age applies to the whole recommendation only
+# when nothing before it opens an alternative branch.
+RE_FEMALE_SUBJECT = re.compile(r"\bwom[ae]n\b", re.IGNORECASE)
+RE_MALE_SUBJECT = re.compile(r"\bmen\b", re.IGNORECASE)
+RE_BRANCH = re.compile(r"[\u2022\uff0d]|\bor\b|\bespecially\b", re.IGNORECASE)
+
 SYMPTOM_KEYWORDS = [
     "haemoptysis", "hemoptysis", "dysphagia", "haematuria", "hematuria",
     "breast lump", "rectal bleeding", "hoarseness", "weight loss",
@@ -270,7 +285,7 @@ def _next_nonblank_text(lines: list[dict], idx: int) -> str | None:
 # C) Main chunking logic
 # ---------------------------------------------------------------------------
 
-def chunk_ng12(lines: list[dict]) -> list[dict]:
+def chunk_ng12(lines: list[dict], multi_vector: bool = False) -> list[dict]:
     """Split NG12 lines into structured chunks with rich metadata.
 
     Uses a state machine with three states:
@@ -278,6 +293,12 @@ def chunk_ng12(lines: list[dict]) -> list[dict]:
       - PART_B: Recommendations organised by symptom (collected for later)
       - STOP:   Appendix material (discarded)
 
+    Args:
+        lines: Cleaned lines from parse_pdf_to_lines.
+        multi_vector: When True, each rule also gets extra rule_search
+            vectors (one per criterion sentence and per synonym expansion)
+            alongside the template vector.
+
     Returns:
         List of chunk dicts with keys: chunk_id, text, metadata.
     """
@@ -398,10 +419,20 @@ def chunk_ng12(lines: list[dict]) -> list[dict]:
 
     # Generate a rule_search companion for every rule_canonical chunk
     search_chunks: list[dict] = []
+    rule_pairs: list[tuple[dict, dict]] = []
     for c in chunks:
         if c["metadata"].get("doc_type") == "rule_canonical":
-            search_chunks.append(_generate_rule_search(c))
+            search_chunk = _generate_rule_search(c)
+            search_chunks.append(search_chunk)
+            rule_pairs.append((c, search_chunk))
     search_chunks = _deduplicate_ids(search_chunks)
+
+    if multi_vector:
+        for canonical_chunk, search_chunk in rule_pairs:
+            search_chunk["metadata"]["vector_kind"] = "template"
+            search_chunks.extend(
+                _generate_rule_vectors(canonical_chunk, search_chunk)
+            )
     chunks.extend(search_chunks)
 
     print(f"Part B lines collected: {len(part_b_lines)}")
@@ -706,11 +737,133 @@ def _generate_rule_search(canonical_chunk: dict) -> dict:
         "page": meta.get("page", 0),
         "page_end": meta.get("page_end", 0),
         "chunk_id": chunk_id,
+        **_filter_fields(canonical_chunk["text"]),
     }
 
     return {"chunk_id": chunk_id, "text": search_text, "metadata": search_meta}
 
 
+def _filter_fields(text: str) -> dict[str, Any]:
+    """Patient pre-filter fields for an indexable chunk.
+
+    ``gender_filter`` / ``age_floor`` / ``age_ceiling`` (patient applies
+    when age_floor <= age < age_ceiling) hold only the constraints that
+    exclude a patient from every branch of the recommendation *text*, so
+    a hard filter on them never drops a rule that applies.  They are
+    stricter than gender_specific / age_min / age_max, which also record
+    per-branch and inferred conditions for soft re-ranking.  Sentinel
+    values mean "no constraint".
+    """
+    fields: dict[str, Any] = {
+        "gender_filter": FILTER_ANY_GENDER,
+        "age_floor": FILTER_AGE_FLOOR,
+        "age_ceiling": FILTER_AGE_CEILING,
+    }
+    female = RE_FEMALE_SUBJECT.search(text) is not None
+    male = RE_MALE_SUBJECT.search(text) is not None
+    if female != male:
+        fields["gender_filter"] = "Female" if female else "Male"
+
+    ages = [
+        (m.start(), field, int(m.group(1)))
+        for regex, field in (
+            (RE_AGE_AND_OVER, "age_floor"),
+            (RE_AGE_OR_OVER, "age_floor"),
+            (RE_AGE_UNDER, "age_ceiling"),
+        )
+        for m in [regex.search(text)] if m
+    ]
+    if ages:
+        start, field, age = min(ages)
+        if not RE_BRANCH.search(text[:start]):
+            fields[field] = age
+    return fields
+
+
+# Trailing evidence-year tags such as "[2015]" or "[2015, amended 2021]"
+RE_YEAR_TAG = re.compile(r"\s*\[\d{4}[^\]]*\]")
+
+
+def _split_criteria(text: str) -> list[str]:
+    """Split recommendation text into standalone criterion sentences.
+
+    Bulleted criteria are each prefixed with the lead-in sentence
+    ("Refer people ... if they:") so every vector keeps the action context.
+    Unbulleted text is split into sentences.
+    """
+    lead: list[str] = []
+    items: list[str] = []
+    for line in text.split("\n"):
+        line = RE_PAGE_FOOTER.sub("", RE_YEAR_TAG.sub("", line)).strip()
+        if not line:
+            continue
+        if RE_BULLET.match(line) or RE_NUMBERED_BULLET.match(line):
+            item = RE_NUMBERED_BULLET.sub("", RE_BULLET.sub("", line, count=1), count=1)
+            items.append(item.strip())
+        elif items:
+            items[-1] += " " + line  # wrapped bullet continuation
+        else:
+            lead.append(line)
+
+    lead_text = " ".join(lead)
+    if items:
+        criteria = [f"{lead_text} {item}".strip() for item in items]
+    else:
+        criteria = re.split(r"(?<=[.;])\s+", lead_text)
+
+    unique: list[str] = []
+    for criterion in criteria:
+        criterion = re.sub(r"\s+", " ", criterion).strip()
+        # Drop the dangling conjunction that links bullet items
+        criterion = re.sub(r"\s+(or|and)$", "", criterion)
+        if criterion and criterion not in unique:
+            unique.append(criterion)
+    return unique
+
+
+def _generate_rule_vectors(canonical_chunk: dict, search_chunk: dict) -> list[dict]:
+    """Build the extra rule_search vectors for one rule (multi-vector mode).
+
+    Produces one chunk per criterion sentence of the canonical text and one
+    per synonym expansion of its symptom keywords.  Each carries the same
+    rule_id as the template so retrieval can aggregate them with
+    max-similarity per rule.
+    """
+    meta = canonical_chunk["metadata"]
+    section = meta["section"]
+    cancer_type = meta.get("cancer_type", "")
+    header = f"NG12 Rule {section}"
+    if cancer_type:
+        header += f" ({cancer_type})"
+
+    variants: list[tuple[str, str]] = [
+        ("criterion", f"{header}\n{criterion}")
+        for criterion in _split_criteria(canonical_chunk["text"])
+    ]
+
+    if "symptom_keywords_json" in meta:
+        for sym in json.loads(meta["symptom_keywords_json"]):
+            for synonym in SYNONYM_MAP.get(sym.lower(), []):
+                variants.append((
+                    "synonym",
+                    f"{header}\nAction: {meta.get('action_type', '')}\n"
+                    f"Symptom: {synonym}",
+                ))
+
+    base_id = search_chunk["chunk_id"]
+    vectors: list[dict] = []
+    for i, (kind, text) in enumerate(variants, 1):
+        chunk_id = f"{base_id}_v{i}"
+        vector_meta = dict(search_chunk["metadata"])
+        vector_meta.update({
+            "chunk_id": chunk_id,
+            "vector_kind": kind,
+            "parent_chunk_id": base_id,
+        })
+        vectors.append({"chunk_id": chunk_id, "text": text, "metadata": vector_meta})
+    return vectors
+
+
 # ---------------------------------------------------------------------------
 # G) Part B: symptom_index parsing
 # ---------------------------------------------------------------------------
@@ -865,6 +1018,7 @@ def _parse_part_b(part_b_lines: list[dict]) -> list[dict]:
             "page": page_start,
             "page_end": page_end,
             "chunk_id": chunk_id,
+            **_filter_fields(""),
         }
         chunks.append({"chunk_id": chunk_id, "text": text, "metadata": metadata})
         row_index += 1
@@ -6,8 +6,21 @@ Can be run standalone: python -m app.ingestion.ingest
 """
 
 from app.config import settings
-from app.core import vector_store
-from app.ingestion.chunker import chunk_ng12, parse_pdf_to_lines
+from app.core import (
+    lexical_index,
+    partitions,
+    patient_features,
+    reference_graph,
+    rerank,
+    rule_index,
+    vector_store,
+)
+from app.ingestion.chunker import (
+    KNOWN_CANCER_TYPES,
+    SYNONYM_MAP,
+    chunk_ng12,
+    parse_pdf_to_lines,
+)
 
 INDEXABLE_TYPES = {"rule_search", "symptom_index"}
 
@@ -18,10 +31,22 @@ def ingest_ng12(pdf_path: str) -> int:
     Pipeline:
       1. parse_pdf_to_lines - extract and clean text lines from PDF
       2. chunk_ng12 - split into structured recommendation chunks
+         (plus per-criterion/synonym vectors when MULTI_VECTOR_INDEX is on)
       3. Separate canonical chunks from indexable chunks
       4. vector_store.reset - clear both collections
       5. vector_store.add_chunks - embed and store search chunks
       6. vector_store.add_canonical_chunks - store canonical chunks
+      7. patient_features.get_feature_table - precompute the columnar
+         patient-mode features
+      8. lexical_index.get_lexical_index - build the BM25 index
+         (only when HYBRID_RETRIEVAL is on)
+      9. rule_index.rebuild - build and persist the symptom-to-rule index
+     10. reference_graph.get_reference_graph - build the symptom / rule
+         cross-reference graph
+     11. partitions.rebuild - build and persist the cancer-type
+         partition router
+     12. rerank.get_chat_features - precompute the chat re-ranking
+         cascade's per-chunk features
 
     Args:
         pdf_path: Path to the NG12 guideline PDF file.
@@ -33,7 +58,7 @@ def ingest_ng12(pdf_path: str) -> int:
     lines = parse_pdf_to_lines(pdf_path)
     print(f"Extracted {len(lines)} cleaned lines")
 
-    chunks = chunk_ng12(lines)
+    chunks = chunk_ng12(lines, multi_vector=settings.MULTI_VECTOR_INDEX)
 
     # Separate canonical vs indexable chunks
     canonical_chunks = [
@@ -54,6 +79,41 @@ def ingest_ng12(pdf_path: str) -> int:
     print(f"Indexing {len(canonical_chunks)} canonical chunks into ChromaDB...")
     vector_store.add_canonical_chunks(canonical_chunks)
 
+    features = patient_features.get_feature_table()
+    print(
+        f"Built patient feature table: {len(features)} chunks, "
+        f"{len(features.vocab)} symptom keywords"
+    )
+
+    if settings.HYBRID_RETRIEVAL:
+        bm25 = lexical_index.get_lexical_index()
+        print(
+            f"Built BM25 index: {len(bm25.vocab)} terms, "
+            f"{len(bm25.doc_ids)} postings ({bm25.nbytes / 1024:.1f} KB)"
+        )
+
+    rules = rule_index.rebuild(canonical_chunks, SYNONYM_MAP)
+    print(f"Built rule index: {len(rules)} rules, {len(rules.terms)} symptom terms")
+
+    graph = reference_graph.get_reference_graph()
+    print(
+        f"Built reference graph: {len(graph.row_ids)} symptom rows, "
+        f"{len(graph.rule_ids)} rules, {len(graph.row_rules)} edges "
+        f"({graph.nbytes / 1024:.1f} KB)"
+    )
+
+    router = partitions.rebuild(chunks, KNOWN_CANCER_TYPES)
+    print(
+        f"Built partition router: {len(router)} partitions, "
+        f"{len(router.keywords)} cancer-type keywords"
+    )
+
+    chat_features = rerank.get_chat_features()
+    print(
+        f"Built chat feature table: {len(chat_features)} chunks, "
+        f"{int(chat_features.duration.sum())} with duration terms"
+    )
+
     # Print write summary
     search_count = len([
         c for c in index_chunks
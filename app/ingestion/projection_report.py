@@ -0,0 +1,110 @@
+"""
+Projection Recall Report
+
+Compares reduced-dimension search against full-dimension search on the
+NG12 corpus.  Each rule_canonical text is used as a query against the
+indexable chunks (rule_search + symptom_index); recall@k is the fraction
+of full-dimension top-k neighbours still retrieved after projection.
+
+Can be run standalone: python -m app.ingestion.projection_report
+"""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from app.config import settings
+from app.core import embeddings
+from app.core.projection import fit_projection, recall_at_k
+from app.ingestion.chunker import chunk_ng12, parse_pdf_to_lines
+from app.ingestion.ingest import INDEXABLE_TYPES
+
+REPORT_DIMS = (32, 64, 128, 256)
+REPORT_METHODS = ("pca", "random")
+REPORT_K = (1, 5, 10)
+
+
+def _time_search(queries: np.ndarray, docs: np.ndarray, k: int) -> float:
+    """Average per-query brute-force search time in microseconds."""
+    start = time.perf_counter()
+    for q in queries:
+        scores = docs @ q
+        np.argpartition(-scores, k - 1)[:k]
+    return (time.perf_counter() - start) / max(len(queries), 1) * 1e6
+
+
+def projection_report(pdf_path: str) -> list[dict]:
+    """Build and print the recall@k report for every method/dimension.
+
+    Args:
+        pdf_path: Path to the NG12 guideline PDF file.
+
+    Returns:
+        List of row dicts with keys: method, dim, recall@k..., bytes,
+        us_per_query.
+    """
+    chunks = chunk_ng12(parse_pdf_to_lines(pdf_path))
+    docs = [
+        c["text"] for c in chunks
+        if c["metadata"].get("doc_type") in INDEXABLE_TYPES
+    ]
+    queries = [
+        c["text"] for c in chunks
+        if c["metadata"].get("doc_type") == "rule_canonical"
+    ]
+
+    print(f"\nEmbedding {len(docs)} documents and {len(queries)} queries...")
+    doc_full = np.asarray(embeddings.embed_texts(docs), dtype=np.float32)
+    query_full = np.asarray(embeddings.embed_texts(queries), dtype=np.float32)
+    full_dim = doc_full.shape[1]
+
+    doc_norm = doc_full / np.linalg.norm(doc_full, axis=1, keepdims=True)
+    query_norm = query_full / np.linalg.norm(query_full, axis=1, keepdims=True)
+    rows = [{
+        "method": "full",
+        "dim": full_dim,
+        **{f"recall@{k}": 1.0 for k in REPORT_K},
+        "bytes": doc_full.nbytes,
+        "us_per_query": _time_search(query_norm, doc_norm, max(REPORT_K)),
+    }]
+
+    for method in REPORT_METHODS:
+        for dim in REPORT_DIMS:
+            if dim >= full_dim:
+                continue
+            projection = fit_projection(method, doc_full, dim)
+            reduced_docs = projection.transform(doc_full)
+            rows.append({
+                "method": method,
+                "dim": projection.output_dim,
+                **{
+                    f"recall@{k}": recall_at_k(doc_full, query_full, projection, k)
+                    for k in REPORT_K
+                },
+                "bytes": reduced_docs.nbytes,
+                "us_per_query": _time_search(
+                    projection.transform(query_full), reduced_docs, max(REPORT_K)
+                ),
+            })
+
+    header = (
+        f"{'method':<8}{'dim':>6}"
+        + "".join(f"{f'recall@{k}':>11}" for k in REPORT_K)
+        + f"{'index KB':>11}{'us/query':>11}"
+    )
+    print(f"\nProjection recall report (queries = rule_canonical texts)")
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['method']:<8}{row['dim']:>6}"
+            + "".join(f"{row[f'recall@{k}']:>11.3f}" for k in REPORT_K)
+            + f"{row['bytes'] / 1024:>11.1f}{row['us_per_query']:>11.1f}"
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    projection_report(settings.PDF_PATH)
@@ -3,7 +3,10 @@ NG12 Cancer Risk Assessor - FastAPI Application Entry Point
 
 Registers routers for assessment, chat, and admin endpoints.
 Serves the static frontend from the /static directory.
-Auto-ingests the NG12 PDF on startup if the vector store is empty.
+Auto-ingests the NG12 PDF on startup if the vector store is empty, then
+warms up the vector store and embedding model so the first request does
+not pay for lazy initialisation.  With several uvicorn workers sharing a
+ChromaDB server, only the first worker to start runs the ingest.
 """
 
 import os
@@ -43,20 +46,31 @@ app.mount("/", StaticFiles(directory="static", html=True), name="static")
 
 @app.on_event("startup")
 async def startup_event():
-    """Auto-ingest the NG12 PDF if the vector store is empty."""
+    """Auto-ingest the NG12 PDF if the vector store is empty, then warm up."""
     try:
         from app.core import vector_store
         from app.config import settings
+        from app.core.index_files import ingest_lock
         from app.ingestion.ingest import ingest_ng12
 
-        search_count = vector_store.count()
-        canonical_count = vector_store.count_canonical()
-        if search_count == 0 or canonical_count == 0:
-            print("One or both collections are empty. Running initial ingestion...")
-            ingest_ng12(settings.PDF_PATH)
-        else:
-            print(f"Search collection: {search_count} documents")
-            print(f"Canonical collection: {canonical_count} documents")
+        with ingest_lock(settings.CHROMA_PERSIST_DIR):
+            search_count = vector_store.count()
+            canonical_count = vector_store.count_canonical()
+            if search_count == 0 or canonical_count == 0:
+                print("One or both collections are empty. Running initial ingestion...")
+                ingest_ng12(settings.PDF_PATH)
+            else:
+                print(f"Search collection: {search_count} documents")
+                print(f"Canonical collection: {canonical_count} documents")
+
+        if settings.WARMUP_ON_STARTUP:
+            from app.core.warmup import warm_up
+
+            timings = warm_up()
+            print(
+                "[Startup] Warm-up: "
+                + ", ".join(f"{k}={v:.0f}" for k, v in timings.items())
+            )
     except Exception as e:
         print(f"[Startup] Vector store initialization failed: {e}")
         print("[Startup] Continuing without vector store (chat history debug still works)")
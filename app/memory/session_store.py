@@ -4,13 +4,23 @@ Session Store
 Manages conversation history and topic state for Part 2 chat.
 Provides a SessionStore class with methods for history, topic tracking,
 and session cleanup.
+
+SessionStore keeps sessions in process memory.  With several uvicorn
+workers a follow-up turn may reach a different worker than the first, so
+setting SESSION_DB_PATH switches to SqliteSessionStore: the same interface
+over one SQLite file that every worker opens.
 """
 
 from __future__ import annotations
 
+import sqlite3
 from collections import Counter
+from contextlib import closing
+from pathlib import Path
 from typing import Any
 
+from app.config import settings
+
 
 # Clinical terms used for topic extraction from chunk text.
 # Covers symptoms, investigation types, and cancer-type names so the topic
@@ -59,6 +69,10 @@ class SessionStore:
         """
         return self._sessions.get(session_id, [])
 
+    def session_ids(self) -> list[str]:
+        """Return the ids of all sessions with history."""
+        return list(self._sessions)
+
     def append(self, session_id: str, role: str, content: str) -> None:
         """Append a message to the session history.
 
@@ -155,10 +169,13 @@ class SessionStore:
         parts.extend(keywords[:2])
 
         topic = " ".join(parts) if parts else "general"
-        self._topics[session_id] = topic
+        self._set_topic(session_id, topic)
 
         print(f"[SessionStore] Updated topic for {session_id}: '{topic}'")
 
+    def _set_topic(self, session_id: str, topic: str) -> None:
+        self._topics[session_id] = topic
+
     def clear_session(self, session_id: str) -> None:
         """Clear a single session's history and topic.
 
@@ -174,5 +191,84 @@ class SessionStore:
         self._topics.clear()
 
 
+class SqliteSessionStore(SessionStore):
+    """Session store shared by every process that opens the same file.
+
+    Each call opens its own short-lived connection, so the store is safe
+    to use from any thread; WAL journaling lets readers run alongside a
+    writer in another worker.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self._path = str(path)
+        Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "role TEXT NOT NULL, content TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS topics ("
+                "session_id TEXT PRIMARY KEY, topic TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> closing[sqlite3.Connection]:
+        return closing(sqlite3.connect(self._path, timeout=10.0, isolation_level=None))
+
+    def get_history(self, session_id: str) -> list[dict[str, str]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? ORDER BY id",
+                (session_id,),
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def session_ids(self) -> list[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT session_id FROM messages GROUP BY session_id ORDER BY MIN(id)"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def append(self, session_id: str, role: str, content: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO messages (session_id, role, content) VALUES (?, ?, ?)",
+                (session_id, role, content),
+            )
+
+    def get_topic(self, session_id: str) -> str:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT topic FROM topics WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row else ""
+
+    def _set_topic(self, session_id: str, topic: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO topics (session_id, topic) VALUES (?, ?)",
+                (session_id, topic),
+            )
+
+    def clear_session(self, session_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM topics WHERE session_id = ?", (session_id,))
+
+    def clear_all(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM messages")
+            conn.execute("DELETE FROM topics")
+
+
 # Module-level singleton instance
-session_store = SessionStore()
+session_store: SessionStore = (
+    SqliteSessionStore(settings.SESSION_DB_PATH) if settings.SESSION_DB_PATH
+    else SessionStore()
+)
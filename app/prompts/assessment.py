@@ -6,6 +6,8 @@ Used by the assessment workflow to instruct Gemini on how to evaluate
 patient data against NG12 guideline passages.
 """
 
+from app.core.retrieval_hit import RetrievalHit
+
 ASSESSMENT_SYSTEM_PROMPT = """You are a clinical decision support agent specializing \
 in the NICE NG12 guideline: Suspected Cancer - Recognition and Referral.
 
@@ -69,37 +71,34 @@ The risk_level should reflect the HIGHEST priority recommendation matched.
 Priority order: Urgent Referral > Urgent Investigation > Consider Referral > No NG12 Criteria Met."""
 
 
-def format_context(chunks: list[dict]) -> str:
+def format_context(chunks: list[RetrievalHit]) -> str:
     """Format RAG chunks into numbered context text for the prompt.
 
     Args:
-        chunks: List of dicts with keys 'text' and 'metadata'.
+        chunks: Retrieval hits; section and page fall back to the
+            canonical rule's metadata.
 
     Returns:
         Formatted string with source headers and chunk text.
     """
     context_parts = []
     for i, chunk in enumerate(chunks, 1):
-        meta = chunk["metadata"]
-        canonical_meta = chunk.get("canonical_metadata", {})
-        section = meta.get("section") or canonical_meta.get("section", "Part B")
-        page = meta.get("page") or canonical_meta.get("page", "N/A")
         header = (
-            f"[Source {i} | Section {section} "
-            f"| Page {page} "
-            f"| {meta.get('cancer_type', 'N/A')}]"
+            f"[Source {i} | Section {chunk.section or 'Part B'} "
+            f"| Page {chunk.page or 'N/A'} "
+            f"| {chunk.metadata.get('cancer_type', 'N/A')}]"
         )
-        context_parts.append(f"{header}\n{chunk['text']}")
+        context_parts.append(f"{header}\n{chunk.text}")
     return "\n\n---\n\n".join(context_parts)
 
 
-def format_assessment_prompt(patient: dict, chunks: list[dict]) -> str:
+def format_assessment_prompt(patient: dict, chunks: list[RetrievalHit]) -> str:
     """Assemble the complete user prompt from patient data and RAG chunks.
 
     Args:
         patient: Patient dict with keys: patient_id, name, age, gender,
                  smoking_history, symptoms, symptom_duration_days.
-        chunks: List of RAG result dicts with keys 'text' and 'metadata'.
+        chunks: Retrieval hits for the patient.
 
     Returns:
         Fully interpolated user prompt string.
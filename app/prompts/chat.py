@@ -7,6 +7,8 @@ Includes query rewriting, qualification, refusal, and citation templates.
 
 import re
 
+from app.core.retrieval_hit import RetrievalHit
+
 
 # ---------------------------------------------------------------------------
 # System-level prompt injected at the start of every chat conversation
@@ -223,49 +225,31 @@ Instructions:
 # ===== Helper / formatting functions ========================================
 
 
-def _get_section(chunk: dict) -> str | None:
-    """Get section number from chunk metadata, falling back to canonical.
-
-    Checks 'section' in the chunk's own metadata first, then in
-    canonical_metadata (attached at query time by _attach_canonicals).
-    Returns None if no section is available (e.g. symptom_index chunks).
-    """
-    meta = chunk.get("metadata", {})
-    section = meta.get("section")
-    if not section:
-        section = chunk.get("canonical_metadata", {}).get("section")
-    return section
-
-
-def _get_page(chunk: dict) -> int | str:
-    """Get page number from chunk metadata, falling back to canonical."""
-    meta = chunk.get("metadata", {})
-    page = meta.get("page")
-    if not page:
-        page = chunk.get("canonical_metadata", {}).get("page")
-    return page if page else "?"
+def _get_page(chunk: RetrievalHit) -> int | str:
+    """Page number from the chunk or its canonical rule, or '?'."""
+    return chunk.page or "?"
 
 
-def _format_citation_ref(chunk: dict) -> str:
+def _format_citation_ref(chunk: RetrievalHit) -> str:
     """Build a human-readable citation reference for a chunk.
 
     Returns:
         'NG12 §1.1.1, p.9'  for rule_search / rule_canonical chunks
         'NG12 Part B, p.43'  for symptom_index chunks
     """
-    doc_type = chunk.get("metadata", {}).get("doc_type", "")
+    doc_type = chunk.metadata.get("doc_type", "")
     page = _get_page(chunk)
 
     if doc_type == "symptom_index":
         return f"NG12 Part B, p.{page}"
 
-    section = _get_section(chunk)
+    section = chunk.section
     if section:
         return f"NG12 \u00a7{section}, p.{page}"
     return f"NG12 p.{page}"
 
 
-def format_chat_context(chunks: list[dict]) -> str:
+def format_chat_context(chunks: list[RetrievalHit]) -> str:
     """Format RAG chunks into numbered context blocks for the prompt.
 
     Each chunk is rendered with a header containing source index, section,
@@ -273,8 +257,8 @@ def format_chat_context(chunks: list[dict]) -> str:
     """
     parts = []
     for i, chunk in enumerate(chunks, 1):
-        meta = chunk["metadata"]
-        section = _get_section(chunk) or "Part B"
+        meta = chunk.metadata
+        section = chunk.section or "Part B"
         page = _get_page(chunk)
         header = (
             f"[Source {i}"
@@ -283,7 +267,7 @@ def format_chat_context(chunks: list[dict]) -> str:
             f" | {meta.get('cancer_type', 'N/A')}"
             f" | {meta.get('action_type', 'N/A')}]"
         )
-        parts.append(f"{header}\n{chunk['text']}")
+        parts.append(f"{header}\n{chunk.text}")
     return "\n\n---\n\n".join(parts)
 
 
@@ -308,7 +292,7 @@ def format_history(history: list[dict], max_turns: int = 6) -> str:
 
 def format_chat_prompt(
     message: str,
-    chunks: list[dict],
+    chunks: list[RetrievalHit],
     history: list[dict],
 ) -> str:
     """Assemble the full chat user prompt from message, chunks, and history."""
@@ -320,7 +304,7 @@ def format_chat_prompt(
 
 
 def build_citations_from_chunks(
-    chunks: list[dict],
+    chunks: list[RetrievalHit],
     answer: str,
 ) -> list[dict]:
     """Extract [Source N] references from *answer* and map them back to chunk metadata.
@@ -355,24 +339,21 @@ def build_citations_from_chunks(
     citations = []
     for i in sorted(cited_indices):
         chunk = chunks[i]
-        meta = chunk["metadata"]
-        section = _get_section(chunk) or "Part B"
-        page = _get_page(chunk)
-        if page == "?":
-            page = 0
+        section = chunk.section or "Part B"
+        page = chunk.page or 0
         citations.append(
             {
                 "source": "NG12 PDF",
                 "section": section,
                 "page": page,
-                "chunk_id": meta.get("chunk_id", "unknown"),
-                "excerpt": chunk["text"][:200],
+                "chunk_id": chunk.metadata.get("chunk_id", "unknown"),
+                "excerpt": chunk.text[:200],
             }
         )
     return citations
 
 
-def clean_answer_sources(answer: str, chunks: list[dict]) -> str:
+def clean_answer_sources(answer: str, chunks: list[RetrievalHit]) -> str:
     """Replace ``[Source N]`` and ``[Source N, N, ...]`` with readable refs.
 
     Uses ``_format_citation_ref`` so that rule_search chunks render as
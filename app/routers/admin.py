@@ -6,6 +6,7 @@ Endpoints for managing and inspecting the ChromaDB vector store:
   GET  /admin/stats             - Collection statistics
   GET  /admin/chunks            - Paginated chunk listing with filters
   GET  /admin/chunks/{chunk_id} - Single chunk detail with embedding preview
+  GET  /admin/canonical/{rule_id}/related - Rules linked via shared symptom rows
 """
 
 from __future__ import annotations
@@ -17,7 +18,16 @@ from typing import Any, Optional
 from fastapi import APIRouter, HTTPException, Query
 
 from app.config import settings
-from app.core import vector_store
+from app.core import (
+    partitions,
+    prefetch,
+    rag_pipeline,
+    reference_graph,
+    rerank,
+    retrieval_cache,
+    vector_store,
+)
+from app.core.index_files import ingest_lock
 from app.ingestion.ingest import ingest_ng12
 from app.memory.session_store import session_store
 from app.models.schemas import RefreshResponse
@@ -29,9 +39,19 @@ router = APIRouter()
 
 @router.post("/refresh", response_model=RefreshResponse)
 async def refresh() -> RefreshResponse:
-    """Re-index the NG12 PDF and clear chat sessions."""
-    count = ingest_ng12(settings.PDF_PATH)
+    """Re-index the NG12 PDF and clear chat sessions.
+
+    Ingestion bumps the index generation, which invalidates the in-memory
+    canonical map and every cached retrieval result; the canonical map is
+    reloaded here so the next query does not pay for it, and the stale
+    result cache is emptied to release its memory.
+    """
+    with ingest_lock(settings.CHROMA_PERSIST_DIR):
+        count = ingest_ng12(settings.PDF_PATH)
+    vector_store.load_canonical_cache()
+    retrieval_cache.get_cache().clear()
     session_store.clear_all()
+    prefetch.clear()
     return RefreshResponse(
         status="success",
         chunks_indexed=count,
@@ -46,7 +66,7 @@ async def refresh() -> RefreshResponse:
 async def stats() -> dict[str, Any]:
     """Return aggregate statistics across both collections."""
     # -- Search collection stats --
-    search_data = vector_store.get_all()
+    search_data = await vector_store.aget_all()
     search_total = len(search_data["ids"])
 
     doc_type_counter: Counter[str] = Counter()
@@ -60,7 +80,7 @@ async def stats() -> dict[str, Any]:
             system_title_counter[st] += 1
 
     # -- Canonical collection stats --
-    canonical_chunks = vector_store.list_canonical()
+    canonical_chunks = await vector_store.alist_canonical()
     canonical_total = len(canonical_chunks)
 
     cancer_type_counter: Counter[str] = Counter()
@@ -91,6 +111,12 @@ async def stats() -> dict[str, Any]:
         "system_title_distribution": dict(system_title_counter),
         "chunks_with_age_threshold": chunks_with_age,
         "chunks_with_symptoms": chunks_with_symptoms,
+        "retrieval_cache": retrieval_cache.get_cache().stats(),
+        "adaptive_fetch": rag_pipeline.adaptive_fetch_stats(),
+        "partition_routing": partitions.route_stats(),
+        "rerank_cascade": rerank.cascade_stats(),
+        "index_pool": vector_store.index_pool_stats(),
+        "speculative_prefetch": prefetch.prefetch_stats(),
     }
 
 
@@ -115,7 +141,7 @@ async def list_chunks(
     items: list[dict[str, Any]] = []
 
     if collection == "canonical":
-        all_chunks = vector_store.list_canonical()
+        all_chunks = await vector_store.alist_canonical()
         for c in all_chunks:
             meta = c["metadata"]
             text = c["text"]
@@ -143,7 +169,7 @@ async def list_chunks(
             })
     else:
         # Default: search collection
-        data = vector_store.get_all()
+        data = await vector_store.aget_all()
         for i, chunk_id in enumerate(data["ids"]):
             meta = data["metadatas"][i]
             text = data["documents"][i]
@@ -196,7 +222,7 @@ async def list_chunks(
 @router.get("/chunks/{chunk_id}")
 async def get_chunk(chunk_id: str) -> dict[str, Any]:
     """Return full detail for a single chunk including embedding preview."""
-    result = vector_store.get_by_id(chunk_id)
+    result = await vector_store.aget_by_id(chunk_id)
     if result is None:
         return {"error": "Chunk not found", "chunk_id": chunk_id}
     return result
@@ -207,7 +233,7 @@ async def get_chunk(chunk_id: str) -> dict[str, Any]:
 @router.get("/canonical")
 async def list_canonical_rules() -> dict[str, Any]:
     """Return all canonical chunks for admin inspection."""
-    chunks = vector_store.list_canonical()
+    chunks = await vector_store.alist_canonical()
     return {
         "count": len(chunks),
         "chunks": [
@@ -229,7 +255,22 @@ async def list_canonical_rules() -> dict[str, Any]:
 @router.get("/canonical/{rule_id}")
 async def get_canonical_rule(rule_id: str) -> dict[str, Any]:
     """Return a single canonical chunk by rule_id (e.g. '1.1.1')."""
-    result = vector_store.get_canonical(rule_id)
+    result = await vector_store.aget_canonical(rule_id)
     if not result:
         raise HTTPException(status_code=404, detail=f"Rule {rule_id} not found")
     return result
+
+
+# ── GET /admin/canonical/{rule_id}/related ─────────────────────────────────
+
+@router.get("/canonical/{rule_id}/related")
+async def get_related_rules(rule_id: str, hops: int = Query(1, ge=1, le=3)) -> dict[str, Any]:
+    """Return the symptom rows citing a rule and the rules they co-cite."""
+    if not await vector_store.aget_canonical(rule_id):
+        raise HTTPException(status_code=404, detail=f"Rule {rule_id} not found")
+    graph = await vector_store.run_on_index(reference_graph.get_reference_graph)
+    return {
+        "rule_id": rule_id,
+        "cited_by": graph.rows_for_rule(rule_id),
+        "related_rules": graph.expand([rule_id], hops=hops),
+    }
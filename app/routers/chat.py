@@ -14,6 +14,7 @@ from fastapi import APIRouter
 
 from app.agents.chat_workflow import run_chat
 from app.agents import chat_workflow as _chat_wf_module
+from app.core import prefetch
 from app.memory.session_store import session_store
 from app.models.schemas import ChatRequest, ChatResponse, Citation
 
@@ -58,8 +59,8 @@ async def get_history(session_id: str) -> dict[str, Any]:
     print(f"[GetHistory][DEBUG] router   session_store id={id(session_store)}")
     print(f"[GetHistory][DEBUG] workflow session_store id={id(workflow_store)}")
     print(f"[GetHistory][DEBUG] same instance? {session_store is workflow_store}")
-    print(f"[GetHistory][DEBUG] router   _sessions keys: {list(session_store._sessions.keys())}")
-    print(f"[GetHistory][DEBUG] workflow _sessions keys: {list(workflow_store._sessions.keys())}")
+    print(f"[GetHistory][DEBUG] router   session ids: {session_store.session_ids()}")
+    print(f"[GetHistory][DEBUG] workflow session ids: {workflow_store.session_ids()}")
     # --- END DEBUG ---
     history = session_store.get_history(session_id)
     topic = session_store.get_topic(session_id)
@@ -76,4 +77,5 @@ async def get_history(session_id: str) -> dict[str, Any]:
 async def clear_history(session_id: str) -> dict[str, str]:
     """Clear a single session's history and topic."""
     session_store.clear_session(session_id)
+    prefetch.discard(session_id)
     return {"status": "cleared", "session_id": session_id}
@@ -0,0 +1,90 @@
+"""Shared test fixtures.
+
+``make_canonical`` builds hand-written canonical rule chunks; ``ng12_chunks``
+is the real chunker output for the bundled NG12 PDF, so tests of
+structures derived from chunk metadata also run against the schema the
+ingest actually writes.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+PDF_PATH = Path(__file__).resolve().parent.parent / "data" / "ng12.pdf"
+
+
+@pytest.fixture(autouse=True)
+def _persist_dir(monkeypatch, tmp_path):
+    """Write index files (generation stamp, projection ...) under tmp_path."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIR", str(tmp_path / "chroma_db"))
+
+
+def _canonical(section: str, symptoms: list[str], **meta) -> dict:
+    return {
+        "chunk_id": "ng12_" + section.replace(".", "_"),
+        "text": f"Rule {section}",
+        "metadata": {
+            "section": section,
+            "doc_type": "rule_canonical",
+            "symptom_keywords_json": json.dumps(symptoms),
+            **meta,
+        },
+    }
+
+
+@pytest.fixture
+def make_canonical():
+    """Factory for a canonical rule chunk: (section, symptoms, **metadata)."""
+    return _canonical
+
+
+@pytest.fixture(scope="session")
+def ng12_chunks() -> list[dict]:
+    """Every chunk ``chunk_ng12`` produces from data/ng12.pdf."""
+    if not PDF_PATH.exists():
+        pytest.skip("data/ng12.pdf not available")
+    from app.ingestion.chunker import chunk_ng12, parse_pdf_to_lines
+
+    return chunk_ng12(parse_pdf_to_lines(str(PDF_PATH)))
+
+
+@pytest.fixture(scope="session")
+def ng12_canonicals(ng12_chunks) -> list[dict]:
+    """The rule_canonical chunks of :func:`ng12_chunks`."""
+    return [c for c in ng12_chunks if c["metadata"]["doc_type"] == "rule_canonical"]
+
+
+@pytest.fixture
+def ng12_store(monkeypatch, tmp_path, ng12_chunks):
+    """:func:`ng12_chunks` ingested into an exact in-memory search backend.
+
+    Embeds with the model-free hashing provider and serves the canonical
+    chunks from memory, so no ChromaDB instance or model download is
+    needed.  Returns the backend.
+    """
+    from types import MappingProxyType
+
+    from app.config import settings
+    from app.core import embeddings, vector_store
+    from app.core.vector_backends import NumpyBackend
+    from app.ingestion.ingest import INDEXABLE_TYPES
+
+    backend = NumpyBackend(str(tmp_path))
+    canonical = MappingProxyType({
+        c["chunk_id"]: c for c in ng12_chunks
+        if c["metadata"]["doc_type"] == "rule_canonical"
+    })
+    monkeypatch.setattr(settings, "EMBEDDING_PROJECTION", "none")
+    monkeypatch.setattr(embeddings, "_provider", embeddings.HashingEmbeddingProvider())
+    monkeypatch.setattr(vector_store, "get_backend", lambda: backend)
+    monkeypatch.setattr(vector_store, "load_canonical_cache", lambda: canonical)
+    monkeypatch.setattr(vector_store, "_derived", (-1, {}))
+    monkeypatch.setattr(vector_store, "_metadata_views", (-1, {}))
+
+    vector_store.add_chunks([
+        c for c in ng12_chunks if c["metadata"]["doc_type"] in INDEXABLE_TYPES
+    ])
+    return backend
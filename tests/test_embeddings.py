@@ -0,0 +1,41 @@
+"""Tests for the offline embedding providers (hashing and stub).
+
+Run with:  python -m pytest tests/test_embeddings.py -v
+"""
+
+import numpy as np
+import pytest
+
+from app.core.embeddings import (
+    HashingEmbeddingProvider,
+    StubEmbeddingProvider,
+    create_provider,
+)
+
+
+def test_stub_is_deterministic_and_unit_length():
+    provider = StubEmbeddingProvider(dim=32)
+    a, b, c = provider.embed(["haemoptysis", "haemoptysis", "breast lump"])
+    assert a == b
+    assert a != c
+    assert np.isclose(np.linalg.norm(a), 1.0)
+
+
+def test_hashing_ranks_lexical_match_first():
+    provider = HashingEmbeddingProvider()
+    query, related, unrelated = np.asarray(provider.embed([
+        "unexplained haemoptysis referral",
+        "Refer people aged 40 and over with unexplained haemoptysis",
+        "Consider a direct access ultrasound scan for testicular cancer",
+    ]))
+    assert query @ related > query @ unrelated
+
+
+def test_provider_is_chroma_embedding_function():
+    provider = create_provider("stub")
+    assert provider(input=["lump"]) == provider.embed(["lump"])
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        create_provider("word2vec")
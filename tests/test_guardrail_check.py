@@ -0,0 +1,46 @@
+"""Tests for the LLM-rewrite retry in guardrail_check_node.
+
+Run with:  python -m pytest tests/test_guardrail_check.py -v
+"""
+
+import asyncio
+
+import pytest
+
+from app.agents import chat_workflow
+from app.core.retrieval_hit import RetrievalHit
+
+
+def _chunks(score: float) -> list[RetrievalHit]:
+    return [RetrievalHit(f"c{i}", "refer for lung cancer", {}, score) for i in range(3)]
+
+
+@pytest.mark.parametrize("rewrite_score, raw_score, want_query, want_strategy", [
+    (0.6, 0.3, "rewritten lung query", "llm_rewrite"),
+    (0.1, 0.6, "lung cancer referral", "direct"),
+])
+def test_retry_reports_the_query_that_won(
+    monkeypatch, rewrite_score, raw_score, want_query, want_strategy,
+):
+    async def generate(system_prompt, user_prompt):
+        return "rewritten lung query"
+
+    async def aretrieve_many(queries, top_k, topic=""):
+        return [_chunks(rewrite_score), _chunks(raw_score)][:len(queries)]
+
+    monkeypatch.setattr(chat_workflow.gemini_client, "_initialized", True, raising=False)
+    monkeypatch.setattr(chat_workflow.gemini_client, "generate", generate)
+    monkeypatch.setattr(chat_workflow.rag_pipeline, "aretrieve_many", aretrieve_many)
+
+    state = {
+        "session_id": "s1",
+        "message": "lung cancer referral",
+        "search_query": "lung cancer referral with topic",
+        "query_strategy": "topic_enriched",
+        "chunks": _chunks(0.1),
+        "history": [{"role": "user", "content": "lung symptoms"}],
+    }
+    result = asyncio.run(chat_workflow.guardrail_check_node(state))
+    assert result["search_query"] == want_query
+    assert result["query_strategy"] == want_strategy
+    assert result["chunks"][0].score == max(rewrite_score, raw_score)
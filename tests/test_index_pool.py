@@ -0,0 +1,103 @@
+"""Tests for the vector store's async API and its bounded index thread pool.
+
+Run with:  python -m pytest tests/test_index_pool.py -v
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core import vector_store
+
+
+@pytest.fixture
+def one_thread_pool(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(vector_store, "_index_executor", pool)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def test_blocking_index_calls_do_not_block_the_event_loop(one_thread_pool):
+    release = threading.Event()
+
+    async def scenario():
+        slow = asyncio.ensure_future(vector_store.run_on_index(release.wait, 5))
+        queued = asyncio.ensure_future(vector_store.run_on_index(lambda: "done"))
+        # The loop keeps serving other coroutines while the pool is busy
+        await asyncio.sleep(0.05)
+        stats = vector_store.index_pool_stats()
+        assert (stats["active"], stats["queued"]) == (1, 1)
+        assert stats["max_queued"] >= 1
+        release.set()
+        return await slow, await queued
+
+    before = vector_store.index_pool_stats()["completed"]
+    assert asyncio.run(scenario()) == (True, "done")
+    stats = vector_store.index_pool_stats()
+    assert stats["completed"] == before + 2
+    assert (stats["active"], stats["queued"]) == (0, 0)
+
+
+def test_cancelled_queued_call_is_withdrawn(one_thread_pool):
+    release = threading.Event()
+    ran = []
+
+    async def scenario():
+        busy = asyncio.ensure_future(vector_store.run_on_index(release.wait, 5))
+        waiting = asyncio.ensure_future(vector_store.run_on_index(ran.append, 1))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert vector_store.index_pool_stats()["queued"] == 0
+        release.set()
+        await busy
+
+    asyncio.run(scenario())
+    assert ran == []
+
+
+def test_async_variants_match_sync_reads(monkeypatch, tmp_path, one_thread_pool):
+    from app.core.vector_backends import NumpyBackend
+
+    backend = NumpyBackend(str(tmp_path))
+    backend.add(
+        ["a", "b"], ["alpha", "beta"], [[1.0, 0.0], [0.0, 1.0]],
+        [{"doc_type": "rule_search"}, {"doc_type": "symptom_index"}],
+    )
+    monkeypatch.setattr(vector_store, "get_backend", lambda: backend)
+
+    async def scenario():
+        return (
+            await vector_store.aquery_by_vector([0.1, 1.0], top_k=1),
+            await vector_store.aquery_many_by_vector([[1.0, 0.0], [0.0, 1.0]], top_k=1),
+            await vector_store.acount(),
+            await vector_store.aget_by_id("b"),
+        )
+
+    hits, batch, total, chunk = asyncio.run(scenario())
+    assert [h.chunk_id for h in hits] == ["b"]
+    assert [[h.chunk_id for h in hs] for hs in batch] == [["a"], ["b"]]
+    assert total == 2
+    assert chunk["text"] == "beta"
+
+
+def test_server_mode_uses_one_pooled_http_client(monkeypatch):
+    import chromadb
+
+    from app.config import settings
+
+    created = []
+    monkeypatch.setattr(chromadb, "HttpClient", lambda **kwargs: created.append(kwargs) or object())
+    monkeypatch.setattr(settings, "CHROMA_SERVER_HOST", "chroma")
+    monkeypatch.setattr(settings, "CHROMA_HTTP_MAX_CONNECTIONS", 6)
+    monkeypatch.setattr(vector_store, "_client", None)
+
+    client = vector_store._get_client()
+    assert vector_store._get_client() is client
+    assert len(created) == 1
+    assert (created[0]["host"], created[0]["port"]) == ("chroma", settings.CHROMA_SERVER_PORT)
+    assert created[0]["settings"].chroma_http_max_connections == 6
+    assert created[0]["settings"].chroma_http_max_keepalive_connections == 6
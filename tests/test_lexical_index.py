@@ -0,0 +1,95 @@
+"""Tests for the in-memory BM25 lexical index.
+
+Run with:  python -m pytest tests/test_lexical_index.py -v
+"""
+
+import numpy as np
+
+from app.core.lexical_index import BM25Index, _indexed_text, tokenize
+
+
+def _index() -> BM25Index:
+    return BM25Index(
+        ["lung", "breast", "bowel", "refs"],
+        [
+            "Refer people aged 40 and over with unexplained haemoptysis 1.1.1",
+            "Refer people aged 30 and over with an unexplained breast lump",
+            "Offer FIT to adults with a change in bowel habit",
+            "Haemoptysis [1.1.1] Lung cancer",
+        ],
+    )
+
+
+def test_tokenize_keeps_rule_numbers_and_drops_stop_words():
+    assert tokenize("What is rule 1.3.4 for X-ray?") == ["rule", "1.3.4", "x-ray"]
+
+
+def test_exact_term_ranks_matching_docs_only():
+    hits = _index().search("haemoptysis", top_k=10)
+    assert {chunk_id for chunk_id, _ in hits} == {"lung", "refs"}
+    assert all(score > 0 for _, score in hits)
+
+
+def test_unknown_terms_return_nothing():
+    assert _index().search("quantum physics") == []
+
+
+def test_postings_are_csr_arrays():
+    index = _index()
+    assert index.offsets[-1] == len(index.doc_ids) == len(index.weights)
+    assert index.doc_ids.dtype == np.int32
+    t = index.vocab["refer"]
+    docs = index.doc_ids[index.offsets[t]:index.offsets[t + 1]]
+    assert sorted(docs.tolist()) == [0, 1]
+
+
+def test_top_k_and_order():
+    hits = _index().search("unexplained breast lump", top_k=2)
+    assert hits[0][0] == "breast"
+    assert len(hits) == 2
+    assert hits[0][1] >= hits[1][1]
+
+
+def test_rule_id_field_outweighs_cross_reference():
+    index = BM25Index(
+        ["rule", "symptom"],
+        [
+            _indexed_text(
+                "Refer adults with rectal bleeding for suspected colorectal cancer",
+                {"rule_id": "1.3.4", "doc_type": "rule_search"},
+            ),
+            _indexed_text("Rectal bleeding [1.3.4]", {"doc_type": "symptom_index"}),
+        ],
+    )
+    assert index.search("1.3.4")[0][0] == "rule"
+
+
+def test_derived_structures_share_one_scan_per_generation(monkeypatch):
+    from app.core import patient_features, reference_graph, rerank, vector_store
+    from app.core.lexical_index import get_lexical_index
+
+    scans = []
+
+    def get_all():
+        scans.append(1)
+        return {
+            "ids": ["lung"],
+            "documents": ["Refer people with unexplained haemoptysis"],
+            "metadatas": [{"doc_type": "rule_search", "rule_id": "1.1.1"}],
+        }
+
+    monkeypatch.setattr(vector_store, "get_all", get_all)
+    monkeypatch.setattr(vector_store, "load_canonical_cache", lambda: {})
+    monkeypatch.setattr(vector_store, "_derived", (-1, {}))
+    monkeypatch.setattr(vector_store, "_index_generation", 0)
+
+    index = get_lexical_index()
+    patient_features.get_feature_table()
+    reference_graph.get_reference_graph()
+    rerank.get_chat_features()
+    assert get_lexical_index() is index
+    assert len(scans) == 1
+
+    vector_store.bump_generation()
+    assert get_lexical_index() is not index
+    assert len(scans) == 2
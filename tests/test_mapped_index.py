@@ -0,0 +1,87 @@
+"""Tests for the memory-mapped read-only vector index.
+
+Run with:  python -m pytest tests/test_mapped_index.py -v
+"""
+
+import numpy as np
+import pytest
+
+from app.core.mapped_index import MappedIndex, save_mapped
+from app.core.numpy_index import NumpyIndex
+from app.core.vector_backends import MappedBackend
+
+
+def _index(n: int = 40, dim: int = 16) -> NumpyIndex:
+    rng = np.random.default_rng(7)
+    idx = NumpyIndex()
+    idx.add(
+        [f"doc_{i}" for i in range(n)],
+        [f"text {i} – naïve" for i in range(n)],
+        rng.standard_normal((n, dim)).tolist(),
+        [{"doc_type": "rule_search", "rule_id": f"1.{i}", "age_min": i} for i in range(n)],
+    )
+    return idx
+
+
+def test_mapped_index_searches_like_the_exported_index(tmp_path):
+    source = _index()
+    save_mapped(source, tmp_path / "index.bin")
+    mapped = MappedIndex.open(tmp_path / "index.bin")
+
+    queries = np.random.default_rng(8).standard_normal((3, 16)).tolist()
+    assert mapped.query_many(queries, top_k=5) == source.query_many(queries, top_k=5)
+    mask = np.array([i % 3 == 0 for i in range(40)])
+    assert mapped.query(queries[0], top_k=4, mask=mask) == source.query(queries[0], top_k=4, mask=mask)
+    assert mapped.get(["doc_7", "missing"]) == source.get(["doc_7"])
+    assert mapped.embedding("doc_3") == source.embedding("doc_3")
+    assert mapped.metadatas == source.metadatas
+
+
+def test_mapped_matrix_is_a_read_only_view_of_the_file(tmp_path):
+    save_mapped(_index(), tmp_path / "index.bin")
+    mapped = MappedIndex.open(tmp_path / "index.bin")
+    assert not mapped._matrix.flags.owndata
+    assert not mapped._matrix.flags.writeable
+    with pytest.raises(TypeError):
+        mapped.add(["x"], ["x"], [[0.0] * 16], [{}])
+
+
+def test_rejects_other_files(tmp_path):
+    (tmp_path / "index.bin").write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        MappedIndex.open(tmp_path / "index.bin")
+
+
+def test_backend_upserts_then_remaps_and_old_mapping_stays_valid(tmp_path):
+    backend = MappedBackend(str(tmp_path))
+    source = _index(4, 2)
+    rows = source.get()
+    backend.add([r["chunk_id"] for r in rows], [r["text"] for r in rows],
+                source._matrix.tolist(), [r["metadata"] for r in rows])
+    backend.snapshot()
+    reader = MappedBackend(str(tmp_path))          # another worker
+    old_mapping = reader._index
+    assert isinstance(old_mapping, MappedIndex)
+
+    backend.add(["doc_0", "new"], ["replaced", "added"], [[1.0, 0.0], [0.0, 1.0]],
+                [{"doc_type": "rule_search"}] * 2)
+    backend.snapshot()
+    assert backend.count() == 5
+    assert backend.get(["doc_0"])[0]["text"] == "replaced"
+    # A mapping taken before the re-index stays readable...
+    assert old_mapping.get(["doc_0"])[0]["text"] == rows[0]["text"]
+    # ...but the other worker re-maps the replaced file on its next read
+    assert reader.get(["doc_0"])[0]["text"] == "replaced"
+    assert reader.count() == 5
+    assert reader.query([0.0, 1.0], top_k=1)[0]["chunk_id"] == "new"
+
+
+def test_backend_follows_a_reset_in_another_worker(tmp_path):
+    writer = MappedBackend(str(tmp_path))
+    writer.add(["a"], ["a"], [[1.0, 0.0]], [{}])
+    writer.snapshot()
+    reader = MappedBackend(str(tmp_path))
+    assert reader.count() == 1
+
+    writer.reset()
+    assert reader.count() == 0
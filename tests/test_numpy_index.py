@@ -0,0 +1,63 @@
+"""Tests for the exact in-memory NumPy vector index.
+
+Run with:  python -m pytest tests/test_numpy_index.py -v
+"""
+
+import numpy as np
+import pytest
+
+from app.core.numpy_index import NumpyIndex
+
+
+@pytest.fixture
+def index() -> NumpyIndex:
+    idx = NumpyIndex()
+    idx.add(
+        ids=["a", "b", "c"],
+        documents=["doc a", "doc b", "doc c"],
+        embeddings=[[1, 0, 0], [0.8, 0.6, 0], [0, 0, 2]],
+        metadatas=[{"doc_type": "rule_search"}, {}, {"doc_type": "symptom_index"}],
+    )
+    return idx
+
+
+def test_query_returns_exact_cosine_ranking(index: NumpyIndex):
+    results = index.query([1, 0, 0], top_k=2)
+    assert [r["chunk_id"] for r in results] == ["a", "b"]
+    assert results[0]["score"] == pytest.approx(1.0)
+    assert results[1]["score"] == pytest.approx(0.8)
+    assert results[0]["text"] == "doc a"
+    assert results[0]["metadata"] == {"doc_type": "rule_search"}
+
+
+def test_top_k_larger_than_index(index: NumpyIndex):
+    assert len(index.query([0, 0, 1], top_k=10)) == 3
+
+
+def test_ties_broken_by_insertion_order():
+    idx = NumpyIndex()
+    idx.add(["x", "y", "z"], ["", "", ""], [[0, 1]] * 3, [{}, {}, {}])
+    assert [r["chunk_id"] for r in idx.query([0, 1], top_k=2)] == ["x", "y"]
+
+
+def test_upsert_overwrites_existing_id(index: NumpyIndex):
+    index.add(["c"], ["new c"], [[1, 0, 0]], [{}])
+    assert index.count() == 3
+    top = index.query([1, 0, 0], top_k=3)
+    assert {r["chunk_id"] for r in top[:2]} == {"a", "c"}
+    assert index.get(["c"])[0]["text"] == "new c"
+
+
+def test_dimension_mismatch_rejected(index: NumpyIndex):
+    with pytest.raises(ValueError):
+        index.add(["d"], ["d"], [[1, 0]], [{}])
+
+
+def test_save_load_round_trip(tmp_path, index: NumpyIndex):
+    path = tmp_path / "numpy_index.npz"
+    index.save(path)
+    loaded = NumpyIndex.load(path)
+    assert loaded.count() == 3
+    assert loaded.get() == index.get()
+    assert np.allclose(loaded.embedding("b"), index.embedding("b"))
+    assert loaded.query([0.8, 0.6, 0], top_k=1)[0]["chunk_id"] == "b"
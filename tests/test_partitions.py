@@ -0,0 +1,128 @@
+"""Tests for the cancer-type partition router.
+
+Run with:  python -m pytest tests/test_partitions.py -v
+"""
+
+from app.core.partitions import PartitionRouter
+from app.core.vector_backends import matches_where
+
+KEYWORDS = ["lung", "mesothelioma", "breast", "anal", "colorectal"]
+
+
+def _chunk(doc_type: str, text: str = "", **meta) -> dict:
+    return {"chunk_id": f"{doc_type}_{len(text)}", "text": text,
+            "metadata": {"doc_type": doc_type, **meta}}
+
+
+CHUNKS = [
+    _chunk("rule_canonical", "Refer people for lung cancer or mesothelioma",
+           cancer_type="Lung and pleural cancers"),
+    _chunk("rule_canonical", "Refer for breast cancer if aged 30 and over",
+           cancer_type="Breast cancer"),
+    _chunk("rule_canonical", "Give information and support", cancer_type="Patient support"),
+    _chunk("rule_search", "NG12 Rule 1.1.1", cancer_type="Lung and pleural cancers"),
+    _chunk("rule_search", "NG12 Rule 1.4.1", cancer_type="Breast cancer"),
+    _chunk("rule_search", "NG12 Rule 1.16.1", cancer_type="Patient support"),
+    _chunk("symptom_index", "Haemoptysis", possible_cancer="Lung", system_title="Respiratory"),
+    _chunk("symptom_index", "Rectal bleeding", possible_cancer="Colorectal", system_title="Bleeding"),
+    _chunk("symptom_index", "Fatigue", possible_cancer="", system_title="Non-specific"),
+]
+
+
+def _router() -> PartitionRouter:
+    return PartitionRouter.from_chunks(CHUNKS, KEYWORDS)
+
+
+def _searched(where) -> list[str]:
+    return [c["text"] for c in CHUNKS[3:] if where is None or matches_where(c["metadata"], where)]
+
+
+def test_keywords_map_to_partitions():
+    router = _router()
+    assert router.keywords["lung"] == [
+        ("cancer_type", "Lung and pleural cancers"), ("possible_cancer", "Lung"),
+    ]
+    assert router.keywords["mesothelioma"] == [("cancer_type", "Lung and pleural cancers")]
+    # Partitions no keyword reaches are searched by every routed query
+    assert sorted(router.always) == [
+        ("cancer_type", "Patient support"), ("possible_cancer", ""),
+    ]
+    assert len(router) == 6
+
+
+def test_route_restricts_search_to_named_partitions():
+    router = _router()
+    assert _searched(router.route("When to refer for suspected lung cancer?")) == [
+        "NG12 Rule 1.1.1", "NG12 Rule 1.16.1", "Haemoptysis", "Fatigue",
+    ]
+    assert _searched(router.route("Lungs and breast")) == [
+        "NG12 Rule 1.1.1", "NG12 Rule 1.4.1", "NG12 Rule 1.16.1", "Haemoptysis", "Fatigue",
+    ]
+    # Whole words only: "analysis" is not "anal"
+    assert router.route("analysis of referral times") is None
+
+
+def test_topic_fallback_and_unrouted():
+    router = _router()
+    follow_up = router.route("what about under 40s?", topic="Breast cancer 1.4.1 breast lump")
+    assert _searched(follow_up) == ["NG12 Rule 1.4.1", "NG12 Rule 1.16.1", "Fatigue"]
+    # The query's own keywords win over the topic
+    assert router.route("and lung?", topic="Breast cancer") == router.route("lung")
+    assert router.route("what about under 40s?") is None
+
+
+def test_save_load_round_trip(tmp_path):
+    router = _router()
+    router.save(tmp_path / "router.json")
+    loaded = PartitionRouter.load(tmp_path / "router.json")
+    assert loaded.route("breast lump") == router.route("breast lump")
+    assert loaded.always == router.always
+
+
+def test_reloads_router_rebuilt_by_another_worker(monkeypatch, tmp_path):
+    from app.config import settings
+    from app.core import partitions
+
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIR", str(tmp_path))
+    monkeypatch.setattr(partitions, "_router", None)
+    assert partitions.get_router() is None
+
+    _router().save(tmp_path / partitions.ROUTER_FILENAME)
+    assert partitions.route("breast lump") is not None
+
+    # Another worker re-ingests without the breast rules
+    PartitionRouter.from_chunks(CHUNKS[:1] + CHUNKS[3:4], KEYWORDS).save(
+        tmp_path / partitions.ROUTER_FILENAME
+    )
+    assert partitions.route("breast lump") is None
+
+
+def test_routed_candidates_only_come_from_partitions(monkeypatch, tmp_path):
+    import numpy as np
+
+    from app.core import rag_pipeline
+    from app.core.vector_backends import NumpyBackend
+
+    rng = np.random.default_rng(3)
+    sites = ["Lung", "Breast", "Colorectal", ""]
+    backend = NumpyBackend(str(tmp_path))
+    backend.add(
+        [f"sym_{i}" for i in range(80)],
+        [f"row {i}" for i in range(80)],
+        rng.standard_normal((80, 16)).tolist(),
+        [{"doc_type": "symptom_index", "possible_cancer": sites[i % 4]} for i in range(80)],
+    )
+    monkeypatch.setattr(rag_pipeline.vector_store, "get_backend", lambda: backend)
+
+    where = {"possible_cancer": {"$in": ["", "Lung"]}}
+    queries = rng.standard_normal((2, 16)).tolist()
+    routed, unrouted = rag_pipeline._candidates_many(
+        ["lung", "anything"], queries, 5, None, routes=[where, None],
+    )
+    assert {r["metadata"]["possible_cancer"] for r in routed[0]} <= {"", "Lung"}
+    assert len(routed[0]) == 10
+    # Same ranking as filtering the full index
+    full = backend.query(queries[0], top_k=80)
+    expected = [r["chunk_id"] for r in full if r["metadata"]["possible_cancer"] in ("", "Lung")]
+    assert [r["chunk_id"] for r in routed[0]] == expected[:10]
+    assert len(unrouted[0]) == 15
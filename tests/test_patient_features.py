@@ -0,0 +1,128 @@
+"""Tests for the vectorised patient-mode feature table.
+
+Run with:  python -m pytest tests/test_patient_features.py -v
+"""
+
+import json
+import random
+
+import numpy as np
+import pytest
+
+from app.core.patient_features import FeatureTable
+
+KEYWORDS = [
+    "haemoptysis", "cough", "weight loss", "breast lump", "rectal bleeding",
+    "fatigue", "chest pain", "dysphagia", "haematuria", "jaundice",
+]
+
+
+def _reference_boost(meta: dict, patient_data: dict) -> float:
+    """The original per-candidate loop from rag_pipeline.retrieve."""
+    patient_age = patient_data.get("age", 0)
+    patient_symptoms = [s.lower() for s in patient_data.get("symptoms", [])]
+    patient_smoking = patient_data.get("smoking_history", "Never Smoked")
+    patient_gender = patient_data.get("gender", "")
+    boost = 0.0
+    age_min = meta.get("age_min")
+    if age_min is not None and patient_age >= age_min:
+        boost += 0.15
+    age_max = meta.get("age_max")
+    if age_max is not None and patient_age < age_max:
+        boost += 0.15
+    chunk_symptoms = meta.get("symptom_keywords", [])
+    if isinstance(chunk_symptoms, str):
+        chunk_symptoms = json.loads(chunk_symptoms)
+    overlap = 0
+    for ps in patient_symptoms:
+        for cs in chunk_symptoms:
+            if cs in ps or ps in cs:
+                overlap += 1
+                break
+    boost += 0.1 * overlap
+    if patient_smoking != "Never Smoked" and meta.get("risk_factor_smoking"):
+        boost += 0.1
+    gender_specific = meta.get("gender_specific")
+    if gender_specific:
+        if gender_specific == patient_gender:
+            boost += 0.05
+        elif patient_gender in ("Female", "Male"):
+            boost -= 0.3
+    return boost
+
+
+def _random_meta(rng: random.Random) -> dict:
+    meta = {"doc_type": "rule_search"}
+    if rng.random() < 0.4:
+        meta["age_min"] = rng.choice([16, 30, 40, 50, 60])
+    if rng.random() < 0.1:
+        meta["age_max"] = rng.choice([25, 40])
+    if rng.random() < 0.5:
+        meta["symptom_keywords"] = rng.sample(KEYWORDS, rng.randint(1, 4))
+    if rng.random() < 0.2:
+        meta["risk_factor_smoking"] = True
+    if rng.random() < 0.3:
+        meta["gender_specific"] = rng.choice(["Female", "Male"])
+    return meta
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_boosts_match_reference_loop(seed: int):
+    rng = random.Random(seed)
+    metas = [_random_meta(rng) for _ in range(200)]
+    table = FeatureTable([f"c{i}" for i in range(200)], metas)
+    for _ in range(20):
+        patient = {
+            "age": rng.randint(18, 90),
+            "gender": rng.choice(["Female", "Male", ""]),
+            "smoking_history": rng.choice(["Never Smoked", "Current Smoker"]),
+            "symptoms": rng.sample(KEYWORDS + ["unexplained cough", "lump"], 3),
+        }
+        rows = np.asarray(rng.sample(range(200), 40))
+        expected = [_reference_boost(metas[r], patient) for r in rows]
+        assert np.allclose(table.boosts(rows, patient), expected)
+
+
+def test_symptom_bitset_spans_multiple_words():
+    vocab = [f"symptom {i:03d}" for i in range(130)]
+    table = FeatureTable(["a", "b"], [{"symptom_keywords": vocab}, {}])
+    assert table.symptoms.shape == (2, 3)
+    rows = np.array([0, 1])
+    boosts = table.boosts(rows, {"age": 40, "symptoms": ["symptom 129", "symptom 000"]})
+    assert boosts.tolist() == pytest.approx([0.2, 0.0])
+
+
+def test_json_encoded_keywords_and_unknown_rows():
+    table = FeatureTable(["a"], [{"symptom_keywords_json": '["cough"]'}])
+    assert table.vocab == ["cough"]
+    assert table.rows(["a"]).tolist() == [0]
+    assert table.rows(["a", "missing"]) is None
+
+
+def test_table_from_ingest_carries_the_canonical_rule_conditions(ng12_store):
+    from app.core import patient_features, vector_store
+
+    table = patient_features.get_feature_table()
+    assert len(table) == ng12_store.count()
+    # Search chunks only carry rule_id; the conditions come from the canonicals
+    rows = table.rows(["ng12_search_1_1_1", "ng12_search_1_4_1"])
+    assert table.age_min[rows].tolist() == [40, 30]
+    assert table.gender[rows].tolist() == [0, 1]
+    assert table.vocab and table.smoking.any()
+
+    search = ng12_store.get()
+    canonical = vector_store.get_canonicals([c["metadata"].get("rule_id", "") for c in search])
+    patient = {"age": 55, "gender": "Male", "smoking_history": "Current Smoker",
+               "symptoms": ["unexplained haemoptysis", "weight loss"]}
+    expected = [
+        _reference_boost(
+            vector_store._decode_metadata(
+                canonical.get(c["metadata"].get("rule_id"), c)["metadata"]
+            ),
+            patient,
+        )
+        for c in search
+    ]
+    boosts = table.boosts(table.rows([c["chunk_id"] for c in search]), patient)
+    assert np.allclose(boosts, expected)
+    assert boosts.max() > 0 and boosts.min() < 0
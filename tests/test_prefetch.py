@@ -0,0 +1,115 @@
+"""Tests for speculative follow-up retrieval.
+
+Run with:  python -m pytest tests/test_prefetch.py -v
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+
+from app.config import settings
+from app.core import prefetch, rag_pipeline
+from app.core.retrieval_hit import RetrievalHit
+
+
+@pytest.fixture
+def retrievals(monkeypatch):
+    """Record batched retrievals; each query's single hit echoes its text."""
+    calls = []
+
+    async def fake_aretrieve_many(queries, top_k=5, patient_data=None, topic=""):
+        calls.append((list(queries), top_k, topic))
+        await asyncio.sleep(0.01)
+        return [[RetrievalHit(q, q, {}, 0.5)] for q in queries]
+
+    monkeypatch.setattr(settings, "SPECULATIVE_PREFETCH", True)
+    monkeypatch.setattr(settings, "SPECULATIVE_PREFETCH_QUERIES", 3)
+    monkeypatch.setattr(rag_pipeline, "aretrieve_many", fake_aretrieve_many)
+    monkeypatch.setattr(prefetch, "_counts", Counter())
+    yield calls
+    prefetch.clear()
+
+
+def test_topic_only_follow_ups():
+    assert prefetch.topic_only_starter("What about it?") == "what about"
+    assert prefetch.topic_only_starter("can you explain that again please") == "can you"
+    assert prefetch.topic_only_starter("what's the threshold?") is None
+    assert prefetch.topic_only_starter("what about under 40s?") is None
+    assert prefetch.topic_only_starter("also") == "also"
+    assert prefetch.topic_only_starter("alsoa") is None
+    assert prefetch.topic_only_starter("haemoptysis in smokers") is None
+
+
+def test_prefetched_results_serve_matching_follow_up(retrievals):
+    topic = "Lung and pleural cancers haemoptysis"
+
+    async def scenario():
+        assert prefetch.schedule("s1", topic, top_k=6)
+        # Same topic again: nothing new to prefetch
+        assert not prefetch.schedule("s1", topic, top_k=6)
+        # Arriving mid-prefetch waits for it rather than retrieving again
+        first = await prefetch.take("s1", "What about it?", topic, 6)
+        # Served results are copies of the slot's
+        first[1][0].score = 9.0
+        assert (await prefetch.take("s1", "what about that", topic, 6))[1][0].score == 0.5
+        again = await prefetch.take("s1", "and if so?", topic, 6)
+        other_terms = await prefetch.take("s1", "what about under 40s?", topic, 6)
+        new_topic = await prefetch.take("s1", "what about it?", "Breast cancer", 6)
+        return first, again, other_terms, new_topic
+
+    first, again, other_terms, new_topic = asyncio.run(scenario())
+    assert retrievals == [(
+        [f"{topic} what about", f"{topic} and if", f"{topic} how about"], 6, topic,
+    )]
+    # Each hit reports the predicted query its results were retrieved for
+    query, hits = first
+    assert query == f"{topic} what about" and [h.chunk_id for h in hits] == [query]
+    query, hits = again
+    assert query == f"{topic} and if" and [h.chunk_id for h in hits] == [query]
+    assert other_terms is None and new_topic is None
+    stats = prefetch.prefetch_stats()
+    assert (stats["hits"], stats["misses"], stats["sessions"]) == (3, 2, 1)
+
+
+def test_budget_limits_sessions_and_skips_busy_pool(retrievals, monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_PREFETCH_SESSIONS", 2)
+
+    async def scenario():
+        for session in ("a", "b", "c"):
+            prefetch.schedule(session, "Breast cancer", top_k=6)
+        evicted = prefetch._slots.get("a")
+        await asyncio.sleep(0.05)
+        monkeypatch.setattr(
+            prefetch.vector_store, "index_pool_stats", lambda: {"queued": 2},
+        )
+        return evicted, prefetch.schedule("d", "Skin cancers", top_k=6)
+
+    evicted, started = asyncio.run(scenario())
+    assert evicted is None and list(prefetch._slots) == ["b", "c"]
+    assert not started
+    assert prefetch.prefetch_stats()["skipped_busy"] == 1
+
+
+def test_disabled_by_default(monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_PREFETCH", False)
+    assert not prefetch.schedule("s", "Lung", top_k=6)
+
+
+def test_retrieve_node_records_the_prefetched_query(retrievals, monkeypatch):
+    from app.agents import chat_workflow
+
+    topic = "Lung and pleural cancers haemoptysis"
+    monkeypatch.setattr(chat_workflow.session_store, "get_topic", lambda session_id: topic)
+    state = {
+        "session_id": "s1", "message": "What about it?",
+        "query_strategy": "topic_enriched", "search_query": f"{topic} What about it?",
+    }
+
+    async def scenario():
+        prefetch.schedule("s1", topic, top_k=chat_workflow._RETRIEVE_TOP_K)
+        return await chat_workflow.retrieve_node(state)
+
+    update = asyncio.run(scenario())
+    assert update["search_query"] == f"{topic} what about"
+    assert [h.chunk_id for h in update["chunks"]] == [update["search_query"]]
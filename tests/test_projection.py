@@ -0,0 +1,83 @@
+"""Tests for the embedding projection used by the reduced-dimension index.
+
+Run with:  python -m pytest tests/test_projection.py -v
+"""
+
+import numpy as np
+import pytest
+
+from app.core.projection import (
+    Projection,
+    fit_pca,
+    fit_projection,
+    recall_at_k,
+)
+
+
+@pytest.fixture
+def corpus() -> np.ndarray:
+    rng = np.random.default_rng(42)
+    # Low-rank signal plus a little noise, like real sentence embeddings
+    basis = rng.standard_normal((16, 96))
+    weights = rng.standard_normal((200, 16))
+    return (weights @ basis + 0.01 * rng.standard_normal((200, 96))).astype(np.float32)
+
+
+@pytest.mark.parametrize("method", ["pca", "random"])
+def test_transform_shape_and_unit_norm(corpus: np.ndarray, method: str):
+    projection = fit_projection(method, corpus, 32)
+    reduced = projection.transform(corpus[:10])
+    assert reduced.shape == (10, 32)
+    assert np.allclose(np.linalg.norm(reduced, axis=1), 1.0, atol=1e-5)
+
+
+def test_pca_dim_clamped_to_corpus_rank(corpus: np.ndarray):
+    projection = fit_pca(corpus[:20], 64)
+    assert projection.output_dim == 20
+
+
+def test_pca_preserves_neighbours_of_low_rank_corpus(corpus: np.ndarray):
+    projection = fit_pca(corpus, 16)
+    assert recall_at_k(corpus, corpus[:25], projection, k=5) > 0.9
+
+
+def test_pca_scores_stay_on_full_scale(corpus: np.ndarray):
+    # The chat guardrails compare raw cosine scores against fixed
+    # thresholds, so projection must not shift the score scale
+    projection = fit_pca(corpus, 16)
+    full = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    reduced = projection.transform(corpus)
+    assert np.abs(reduced[:20] @ reduced.T - full[:20] @ full.T).max() < 1e-2
+
+
+def test_save_load_round_trip(tmp_path, corpus: np.ndarray):
+    projection = fit_pca(corpus, 8)
+    path = tmp_path / "projection.npz"
+    projection.save(path)
+    loaded = Projection.load(path)
+    assert loaded.method == "pca"
+    assert np.allclose(loaded.transform(corpus[:5]), projection.transform(corpus[:5]))
+
+
+def test_unknown_method_rejected(corpus: np.ndarray):
+    with pytest.raises(ValueError):
+        fit_projection("svd", corpus, 8)
+
+
+def test_store_reloads_projection_refit_elsewhere(tmp_path, monkeypatch, corpus: np.ndarray):
+    from app.config import settings
+    from app.core import vector_store
+
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "EMBEDDING_PROJECTION", "pca")
+    monkeypatch.setattr(vector_store, "_projection", None)
+
+    fit_pca(corpus, 8).save(tmp_path / vector_store.PROJECTION_FILENAME)
+    assert vector_store.get_projection().output_dim == 8
+
+    # Another worker re-indexes and refits
+    fit_pca(corpus, 4).save(tmp_path / vector_store.PROJECTION_FILENAME)
+    assert vector_store.get_projection().output_dim == 4
+
+    (tmp_path / vector_store.PROJECTION_FILENAME).unlink()
+    assert vector_store.get_projection() is None
@@ -0,0 +1,299 @@
+"""Tests for rag_pipeline helpers that do not need a populated index.
+
+Run with:  python -m pytest tests/test_rag_pipeline.py -v
+"""
+
+import json
+
+import pytest
+
+from app.core.rag_pipeline import _collapse_rule_vectors, _fuse_lexical
+
+
+def _hit(chunk_id: str, score: float, **meta) -> dict:
+    return {"chunk_id": chunk_id, "text": "", "metadata": meta, "score": score}
+
+
+# ── Multi-vector collapse ────────────────────────────────────────────────
+def test_collapse_keeps_best_vector_per_rule():
+    results = [
+        _hit("ng12_search_1_1_1_v2", 0.9, rule_id="1.1.1", vector_kind="criterion"),
+        _hit("ng12_symptom_40_1", 0.8, doc_type="symptom_index"),
+        _hit("ng12_search_1_1_1", 0.7, rule_id="1.1.1", vector_kind="template"),
+        _hit("ng12_search_1_2_1_v1", 0.6, rule_id="1.2.1", vector_kind="synonym"),
+    ]
+    collapsed = _collapse_rule_vectors(results)
+    assert [r["chunk_id"] for r in collapsed] == [
+        "ng12_search_1_1_1_v2", "ng12_symptom_40_1", "ng12_search_1_2_1_v1",
+    ]
+
+
+def test_collapse_leaves_single_vector_index_untouched():
+    results = [
+        _hit("ng12_search_1_1_1", 0.9, rule_id="1.1.1", doc_type="rule_search"),
+        _hit("ng12_search_1_1_1_dup2", 0.8, rule_id="1.1.1", doc_type="rule_search"),
+    ]
+    assert _collapse_rule_vectors(results) == results
+
+
+def test_multi_vector_pool_still_yields_top_k_distinct_rules(monkeypatch, tmp_path):
+    import numpy as np
+
+    from app.config import settings
+    from app.core import rag_pipeline
+    from app.core.vector_backends import NumpyBackend
+
+    # Every rule has 4 vectors near the query, so a 3 * top_k raw pool
+    # would collapse to only 3-4 rules
+    rng = np.random.default_rng(1)
+    query = rng.standard_normal(16)
+    ids, vectors, metadatas = [], [], []
+    for rule in range(12):
+        for v in range(4):
+            ids.append(f"ng12_search_9_{rule}_v{v}")
+            vectors.append((query + (0.1 * rule + 0.01 * v) * rng.standard_normal(16)).tolist())
+            metadatas.append({"doc_type": "rule_search", "rule_id": f"9.{rule}", "vector_kind": "criterion"})
+    backend = NumpyBackend(str(tmp_path))
+    backend.add(ids, ids, vectors, metadatas)
+    monkeypatch.setattr(settings, "MULTI_VECTOR_INDEX", True)
+    monkeypatch.setattr(rag_pipeline.vector_store, "get_backend", lambda: backend)
+    monkeypatch.setattr(rag_pipeline.vector_store, "_derived", (-1, {}))
+    monkeypatch.setattr(rag_pipeline.vector_store, "_metadata_views", (-1, {}))
+
+    assert rag_pipeline._rule_fanout() == 4
+    [(pool, _)] = rag_pipeline._candidates_many(["plain question"], [query.tolist()], 5, None)
+    top = rag_pipeline._rank_candidates("plain question", pool, 5, None)
+    assert len({r["metadata"]["rule_id"] for r in top}) == 5
+
+
+# ── Hybrid fusion ────────────────────────────────────────────────────────
+def test_fuse_lexical_adds_scaled_boost_and_scores_lexical_only_hits(monkeypatch):
+    from app.config import settings
+    from app.core import rag_pipeline
+
+    monkeypatch.setattr(settings, "HYBRID_LEXICAL_WEIGHT", 0.3)
+    monkeypatch.setattr(
+        rag_pipeline.vector_store, "score_chunks",
+        lambda q, ids: [_hit(cid, 0.25, doc_type="rule_search") for cid in ids],
+    )
+    dense = [_hit("a", 0.5), _hit("b", 0.45)]
+    fused = rag_pipeline._fuse_lexical(dense, [("c", 8.0), ("b", 4.0)], [1.0])
+    assert [r["chunk_id"] for r in fused] == ["b", "c", "a"]
+    scores = {r["chunk_id"]: r["score"] for r in fused}
+    assert scores["c"] == pytest.approx(0.25 + 0.3)
+    assert scores["b"] == pytest.approx(0.45 + 0.15)
+    assert scores["a"] == pytest.approx(0.5)
+
+
+def test_fuse_lexical_without_matches_is_dense_only():
+    dense = [_hit("a", 0.5)]
+    assert _fuse_lexical(dense, [], [1.0]) is dense
+
+
+# ── Patient pre-filter ───────────────────────────────────────────────────
+def test_patient_where_off_by_default():
+    from app.core.rag_pipeline import _patient_where
+
+    assert _patient_where({"age": 55, "gender": "Male"}) is None
+
+
+def test_patient_where_builds_gender_and_age_clauses(monkeypatch):
+    from app.config import settings
+    from app.core.rag_pipeline import _patient_where
+
+    monkeypatch.setattr(settings, "PATIENT_PREFILTER", True)
+    assert _patient_where({"age": 55, "gender": "Male"}) == {"$and": [
+        {"gender_filter": {"$in": ["Any", "Male"]}},
+        {"age_floor": {"$lte": 55}},
+        {"age_ceiling": {"$gt": 55}},
+    ]}
+    assert _patient_where({"gender": "Female"}) == {
+        "gender_filter": {"$in": ["Any", "Female"]}
+    }
+    assert _patient_where({"gender": "Unknown"}) is None
+    assert _patient_where(None) is None
+
+
+@pytest.mark.parametrize("patient, applies, excluded", [
+    # 1.6.6 (renal, 45+) is not male-only; 1.5.10 is women 55 and over
+    ({"age": 50, "gender": "Female", "symptoms": ["visible haematuria"]},
+     ["1.6.6", "1.6.4", "1.5.11"], ["1.5.10", "1.6.7"]),
+    # 1.2.1's age only qualifies its second branch (dysphagia at any age)
+    ({"age": 35, "gender": "Male", "symptoms": ["dysphagia"]},
+     ["1.2.1", "1.2.7", "1.4.1"], ["1.2.4", "1.5.10"]),
+])
+def test_patient_where_keeps_every_rule_that_applies(
+    monkeypatch, ng12_store, patient, applies, excluded,
+):
+    from app.config import settings
+    from app.core import vector_store
+    from app.core.rag_pipeline import _patient_where
+
+    monkeypatch.setattr(settings, "PATIENT_PREFILTER", True)
+    hits = vector_store.query_by_vector(
+        vector_store.embed_query(" ".join(patient["symptoms"])),
+        top_k=ng12_store.count(),
+        where=_patient_where(patient),
+    )
+    rules = {h.metadata.get("rule_id") for h in hits}
+    assert set(applies) <= rules
+    assert not rules & set(excluded)
+
+
+# ── Batched retrieval ────────────────────────────────────────────────────
+def test_retrieve_many_batches_embedding_search_and_enrichment(monkeypatch):
+    from app.core import rag_pipeline, retrieval_cache
+
+    calls = {"embed": [], "search": 0, "canonical": []}
+
+    def fake_embed(queries):
+        calls["embed"].append(list(queries))
+        return [[float(i), 1.0] for i in range(len(queries))]
+
+    def fake_search(query_embeddings, top_k=5, where=None):
+        calls["search"] += 1
+        return [
+            [_hit("r1", 0.6 + 0.1 * i, doc_type="rule_search", rule_id="1.1.1"),
+             _hit("r2", 0.5, doc_type="rule_search", rule_id="1.1.2")]
+            for i in range(len(query_embeddings))
+        ]
+
+    def fake_canonicals(rule_ids):
+        calls["canonical"].append(sorted(rule_ids))
+        return {r: {"text": f"canon {r}", "metadata": {}} for r in rule_ids}
+
+    monkeypatch.setattr(retrieval_cache, "_cache", retrieval_cache.RetrievalCache(8, 60))
+    monkeypatch.setattr(rag_pipeline.vector_store, "embed_queries", fake_embed)
+    monkeypatch.setattr(rag_pipeline.vector_store, "query_many_by_vector", fake_search)
+    monkeypatch.setattr(rag_pipeline.vector_store, "get_canonicals", fake_canonicals)
+
+    batch = rag_pipeline.retrieve_many(["cough", "haemoptysis", "Cough?"], top_k=2)
+
+    # "Cough?" normalises to "cough": two distinct queries, one call each
+    assert calls["embed"] == [["cough", "haemoptysis"]]
+    assert calls["search"] == 1
+    assert calls["canonical"] == [["1.1.1", "1.1.2"]]
+    assert [[r["chunk_id"] for r in results] for results in batch] == [["r1", "r2"]] * 3
+    assert batch[0][0]["canonical_text"] == "canon 1.1.1"
+    assert batch[2] is not batch[0] and batch[2][0] is not batch[0][0]
+
+    merged = rag_pipeline.merge_results(batch, top_k=2)
+    assert [(r["chunk_id"], r["score"]) for r in merged] == [
+        ("r1", pytest.approx(0.7)), ("r2", pytest.approx(0.5)),
+    ]
+
+
+# ── Adaptive over-fetch ──────────────────────────────────────────────────
+def _synthetic_backend(tmp_path, n: int = 300, dim: int = 24):
+    import numpy as np
+
+    from app.core.vector_backends import NumpyBackend
+
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((n, dim))
+    metadatas = []
+    for i in range(n):
+        meta = {"doc_type": "rule_search" if i % 3 else "symptom_index", "rule_id": f"9.{i}"}
+        if i % 4 == 0:
+            meta["age_min"] = int(rng.integers(18, 70))
+        if i % 7 == 0:
+            meta["gender_specific"] = "Female" if i % 2 else "Male"
+        if i % 5 == 0:
+            meta["risk_factor_smoking"] = True
+        if i % 6 == 0:
+            meta["urgency"] = "urgent"
+        meta["symptom_keywords_json"] = json.dumps(["cough"] if i % 8 == 0 else ["fatigue"])
+        metadatas.append(meta)
+    backend = NumpyBackend(str(tmp_path))
+    backend.add(
+        [f"adaptive_{i}" for i in range(n)],
+        [("persistent " if i % 9 == 0 else "") + f"chunk {i}" for i in range(n)],
+        vectors.tolist(),
+        metadatas,
+    )
+    return backend, rng.standard_normal((12, dim)).tolist()
+
+
+@pytest.mark.parametrize("patient", [
+    None,
+    {"age": 60, "gender": "Male", "symptoms": ["cough"], "smoking_history": "Current Smoker"},
+])
+def test_adaptive_fetch_matches_exhaustive_ranking(monkeypatch, tmp_path, patient):
+    from app.core import rag_pipeline
+
+    backend, queries = _synthetic_backend(tmp_path)
+    monkeypatch.setattr(rag_pipeline.vector_store, "get_backend", lambda: backend)
+    monkeypatch.setattr(rag_pipeline.vector_store, "load_canonical_cache", lambda: {})
+    monkeypatch.setattr(rag_pipeline.vector_store, "_derived", (-1, {}))
+    monkeypatch.setattr(rag_pipeline.vector_store, "_metadata_views", (-1, {}))
+    monkeypatch.setattr(rag_pipeline, "_adaptive_counts", rag_pipeline.Counter())
+
+    texts = ["urgent persistent cough"] * len(queries)
+    top_k = 5
+    adaptive = rag_pipeline._rank_adaptive(texts, queries, top_k, patient)
+    exhaustive = [
+        rag_pipeline._rank_candidates(text, pool, top_k, patient)
+        for text, (pool, _) in zip(
+            texts,
+            rag_pipeline._candidates_many(texts, queries, top_k, patient, fetch_k=backend.count()),
+        )
+    ]
+    for got, want in zip(adaptive, exhaustive):
+        assert [r["chunk_id"] for r in got] == [r["chunk_id"] for r in want]
+        assert [r["score"] for r in got] == pytest.approx([r["score"] for r in want])
+
+    stats = rag_pipeline.adaptive_fetch_stats()
+    assert stats["early_stop"] + stats["expanded"] + stats["exhausted"] == len(queries)
+
+
+@pytest.mark.parametrize("patient", [
+    {"age": 62, "gender": "Male", "smoking_history": "Current Smoker",
+     "symptoms": ["persistent cough", "haemoptysis", "weight loss"]},
+    {"age": 45, "gender": "Female", "smoking_history": "Never Smoked",
+     "symptoms": ["breast lump", "fatigue"]},
+    {"age": 30, "gender": "Male", "smoking_history": "Ex-Smoker",
+     "symptoms": ["rectal bleeding", "abdominal pain"]},
+])
+def test_adaptive_fetch_matches_exhaustive_on_ingested_corpus(monkeypatch, ng12_store, patient):
+    from app.core import patient_features, rag_pipeline, vector_store
+
+    monkeypatch.setattr(rag_pipeline, "_adaptive_counts", rag_pipeline.Counter())
+    # The early-stop bound only means something with real, non-zero boosts
+    assert patient_features.max_boost(patient) > 0
+
+    texts = [
+        " ".join(patient["symptoms"]),
+        f"{patient['age']} year old {patient['gender'].lower()} referral criteria",
+        "urgent suspected cancer pathway referral",
+    ]
+    queries = vector_store.embed_queries(texts)
+    top_k = 5
+    adaptive = rag_pipeline._rank_adaptive(texts, queries, top_k, patient)
+    exhaustive = [
+        rag_pipeline._rank_candidates(text, pool, top_k, patient)
+        for text, (pool, _) in zip(
+            texts,
+            rag_pipeline._candidates_many(texts, queries, top_k, patient, fetch_k=ng12_store.count()),
+        )
+    ]
+    for got, want in zip(adaptive, exhaustive):
+        assert [r["chunk_id"] for r in got] == [r["chunk_id"] for r in want]
+        assert [r["score"] for r in got] == pytest.approx([r["score"] for r in want])
+    assert any(patient_features.patient_boosts(got, patient).any() for got in adaptive)
+
+
+def test_adaptive_fetch_stops_early_on_clear_gap(monkeypatch, tmp_path):
+    from app.core import rag_pipeline
+
+    backend, queries = _synthetic_backend(tmp_path)
+    monkeypatch.setattr(rag_pipeline.vector_store, "get_backend", lambda: backend)
+    monkeypatch.setattr(rag_pipeline.vector_store, "load_canonical_cache", lambda: {})
+    monkeypatch.setattr(rag_pipeline.vector_store, "_derived", (-1, {}))
+    monkeypatch.setattr(rag_pipeline.vector_store, "_metadata_views", (-1, {}))
+    monkeypatch.setattr(rag_pipeline, "_adaptive_counts", rag_pipeline.Counter())
+
+    # No chat signals in the query, so max_boost is 0 and any strict gap
+    # between rank top_k and the rest of the initial pool is enough.
+    query = backend.embedding("adaptive_10")
+    rag_pipeline._rank_adaptive(["plain question"], [query], 3, None)
+    assert rag_pipeline.adaptive_fetch_stats()["early_stop"] == 1
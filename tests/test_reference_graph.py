@@ -0,0 +1,49 @@
+"""Tests for the symptom / rule cross-reference graph.
+
+Run with:  python -m pytest tests/test_reference_graph.py -v
+"""
+
+import json
+
+from app.core.reference_graph import ReferenceGraph, referenced_rule_ids
+
+
+def _graph() -> ReferenceGraph:
+    return ReferenceGraph(
+        ["sym_0", "sym_1", "sym_2", "sym_3"],
+        [
+            ["1.5.2", "1.1.1", "1.5.2"],
+            ["1.1.1", "1.10.1"],
+            ["1.10.1", "1.3.4"],
+            [],
+        ],
+    )
+
+
+def test_forward_and_reverse_edges():
+    graph = _graph()
+    # Citation order kept, duplicates dropped
+    assert graph.rules_for_row("sym_0") == ["1.5.2", "1.1.1"]
+    assert graph.rules_for_row("sym_3") == []
+    assert graph.rules_for_row("unknown") is None
+    assert graph.rows_for_rule("1.1.1") == ["sym_0", "sym_1"]
+    assert graph.rows_for_rule("9.9.9") == []
+    # Rules are held in NG12 section order (1.10.1 after 1.5.2)
+    assert graph.rule_ids == ["1.1.1", "1.3.4", "1.5.2", "1.10.1"]
+    assert len(graph.row_rules) == 6
+
+
+def test_expand_by_hops_excludes_seeds():
+    graph = _graph()
+    assert graph.expand(["1.5.2"]) == ["1.1.1"]
+    assert graph.expand(["1.5.2"], hops=2) == ["1.1.1", "1.10.1"]
+    assert graph.expand(["1.5.2"], hops=5) == ["1.1.1", "1.10.1", "1.3.4"]
+    assert graph.expand(["1.1.1", "1.10.1"]) == ["1.3.4", "1.5.2"]
+    assert graph.expand(["9.9.9"]) == []
+
+
+def test_referenced_rule_ids_parsing():
+    assert referenced_rule_ids({"references_json": json.dumps(["[1.5.2]", "[]"])}) == ["1.5.2"]
+    assert referenced_rule_ids({"references_json": ["[1.1.1]"]}) == ["1.1.1"]
+    assert referenced_rule_ids({"references_json": "not json"}) == []
+    assert referenced_rule_ids({}) == []
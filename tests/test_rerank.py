@@ -0,0 +1,88 @@
+"""Tests for the chat re-ranking cascade.
+
+Run with:  python -m pytest tests/test_rerank.py -v
+"""
+
+import time
+
+import pytest
+
+from app.core import rerank
+
+
+def _result(chunk_id: str, score: float, text: str = "", **meta) -> dict:
+    return {"chunk_id": chunk_id, "text": text, "metadata": meta, "score": score}
+
+
+def _results() -> list[dict]:
+    return [
+        _result("a", 0.9, "Refer if symptoms persist for 3 weeks", urgency="urgent"),
+        _result("b", 0.8, "Offer a chest x-ray", doc_type="rule_search", age_min=40),
+        _result("c", 0.7, "Safety netting advice"),
+    ]
+
+
+def test_chat_boosts_match_query_signals(monkeypatch):
+    # Unknown chunk ids: features come from the results themselves
+    monkeypatch.setattr(rerank, "get_chat_features",
+                        lambda: rerank.ChatFeatureTable([], [], []))
+    results = _results()
+    assert rerank.chat_boosts("safety netting", results).tolist() == [0.0, 0.0, 0.0]
+    assert rerank.chat_boosts("urgent persistent cough", results).tolist() == [
+        pytest.approx(0.2), 0.0, 0.0,
+    ]
+    assert rerank.chat_boosts("exact wording for age 40", results).tolist() == [
+        0.0, pytest.approx(0.25), 0.0,
+    ]
+    assert rerank.max_boost("urgent, exact wording, over 40 for 3 weeks") == pytest.approx(0.45)
+
+
+def test_precomputed_table_matches_fallback(monkeypatch):
+    results = _results()
+    table = rerank.ChatFeatureTable(
+        [r["chunk_id"] for r in results], [r["text"] for r in results],
+        [r["metadata"] for r in results],
+    )
+    monkeypatch.setattr(rerank, "get_chat_features", lambda: table)
+    precomputed = rerank.chat_boosts("urgent weeks exact age", results)
+    monkeypatch.setattr(rerank, "get_chat_features",
+                        lambda: rerank.ChatFeatureTable([], [], []))
+    assert precomputed.tolist() == rerank.chat_boosts("urgent weeks exact age", results).tolist()
+
+
+def test_cross_encoder_reorders_head_within_budget(monkeypatch):
+    monkeypatch.setattr(rerank, "_cross_encoder", rerank.OverlapCrossEncoder())
+    monkeypatch.setattr(rerank, "_pair_cost_ms", None)
+    monkeypatch.setattr(rerank.settings, "RERANK_CROSS_ENCODER_TOP_N", 2)
+    monkeypatch.setattr(rerank.settings, "RERANK_CROSS_ENCODER_WEIGHT", 0.5)
+
+    results = _results()
+    assert rerank.cross_encode("chest x-ray", results, time.perf_counter() + 1.0)
+    # b overtakes a; c is outside the head and stays last
+    assert [r["chunk_id"] for r in results] == ["b", "a", "c"]
+    assert results[0]["score"] == pytest.approx(1.3)
+    assert rerank._pair_cost_ms is not None
+
+
+def test_cross_encoder_skipped_when_budget_spent(monkeypatch):
+    monkeypatch.setattr(rerank, "_cross_encoder", rerank.OverlapCrossEncoder())
+    monkeypatch.setattr(rerank, "_pair_cost_ms", 1.0)
+    results = _results()
+    assert not rerank.cross_encode("chest x-ray", results, time.perf_counter() - 1.0)
+    assert [r["score"] for r in results] == [0.9, 0.8, 0.7]
+
+
+def test_unknown_cross_encoder():
+    assert rerank.create_cross_encoder("none") is None
+    with pytest.raises(ValueError):
+        rerank.create_cross_encoder("bogus")
+
+
+def test_search_chunks_take_rule_features_from_canonical(monkeypatch, ng12_store):
+    table = rerank.get_chat_features()
+    chunks = {c["chunk_id"]: c["metadata"] for c in ng12_store.get()}
+    # Search chunks carry only a rule_id; 1.1.1 is an urgent referral from 40
+    search = next(i for i, m in chunks.items() if m.get("rule_id") == "1.1.1")
+    assert "urgency" not in chunks[search]
+    row = table.rows([search])
+    assert table.urgent[row].all() and table.has_age[row].all()
@@ -0,0 +1,86 @@
+"""Tests for the LRU + TTL retrieval result cache.
+
+Run with:  python -m pytest tests/test_retrieval_cache.py -v
+"""
+
+from app.core import rag_pipeline, retrieval_cache
+from app.core.retrieval_cache import RetrievalCache, make_key
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_and_counters():
+    cache = RetrievalCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1          # "a" becomes most recent
+    cache.put("c", 3)                   # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+    assert stats["entries"] == 2
+
+
+def test_ttl_expiry():
+    clock = _Clock()
+    cache = RetrievalCache(max_entries=4, ttl=10, clock=clock)
+    cache.put("q", [1])
+    clock.now = 9
+    assert cache.get("q") == [1]
+    clock.now = 20
+    assert cache.get("q") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_zero_size_disables_cache():
+    cache = RetrievalCache(max_entries=0, ttl=10)
+    cache.put("q", [1])
+    assert cache.get("q") is None
+
+
+def test_key_normalisation_and_generation(monkeypatch):
+    patient = {"age": 60, "gender": "Male", "symptoms": ["Cough", "fatigue"]}
+    reordered = {"age": 60, "gender": "Male", "symptoms": ["fatigue", "cough"]}
+    assert make_key("What about  Cough?", 5, patient) == make_key("what about cough", 5, reordered)
+    assert make_key("cough", 5, None) != make_key("cough", 6, None)
+    assert make_key("cough", 5, None) != make_key("cough", 5, {"age": 61})
+
+    before = make_key("cough", 5, None)
+    monkeypatch.setattr(retrieval_cache.vector_store, "index_generation", lambda: -1)
+    assert make_key("cough", 5, None) != before
+
+
+def test_retrieve_served_from_cache(monkeypatch):
+    calls = []
+
+    def fake_embed(queries):
+        calls.extend(queries)
+        return [[1.0, 0.0] for _ in queries]
+
+    def fake_candidates(queries, qembs, top_k, patient_data, **kwargs):
+        return [
+            ([{"chunk_id": "c1", "text": "t", "metadata": {"doc_type": "symptom_index"}, "score": 0.5}], None)
+            for _ in queries
+        ]
+
+    monkeypatch.setattr(retrieval_cache, "_cache", RetrievalCache(max_entries=8, ttl=60))
+    monkeypatch.setattr(rag_pipeline.vector_store, "embed_queries", fake_embed)
+    monkeypatch.setattr(rag_pipeline, "_candidates_many", fake_candidates)
+    monkeypatch.setattr(rag_pipeline, "_attach_canonicals", lambda results: None)
+
+    first = rag_pipeline.retrieve("Lung cancer ", top_k=1)
+    first[0]["score"] = 99.0            # caller mutation must not leak into the cache
+    second = rag_pipeline.retrieve("lung cancer", top_k=1)
+
+    assert calls == ["Lung cancer "]
+    assert second[0]["chunk_id"] == "c1"
+    assert second[0]["score"] != 99.0
+    assert retrieval_cache.get_cache().stats()["hits"] == 1
@@ -0,0 +1,91 @@
+"""Tests for the slotted retrieval result type.
+
+Run with:  python -m pytest tests/test_retrieval_hit.py -v
+"""
+
+import pytest
+
+from app.core import retrieval_cache, vector_store
+from app.core.retrieval_hit import RetrievalHit
+
+
+def _hit() -> RetrievalHit:
+    return RetrievalHit("c1", "Refer urgently", {"section": "1.1.1", "page": 7}, 0.5)
+
+
+def test_hit_is_slotted_and_reads_like_a_result_dict():
+    hit = _hit()
+    assert not hasattr(hit, "__dict__")
+    with pytest.raises(AttributeError):
+        hit.extra = 1
+    assert hit["score"] == 0.5 and hit.get("text") == "Refer urgently"
+    # Unset optional fields read as missing
+    assert "canonical_text" not in hit
+    assert hit.get("canonical_metadata", {}) == {}
+    with pytest.raises(KeyError):
+        hit["canonical_text"]
+    hit["canonical_text"] = "Full rule"
+    assert sorted(hit) == ["canonical_text", "chunk_id", "metadata", "score", "text"]
+    assert hit.to_dict()["canonical_text"] == "Full rule"
+    with pytest.raises(KeyError):
+        hit["unknown"] = 1
+
+
+def test_section_and_page_fall_back_to_canonical():
+    hit = RetrievalHit("c2", "t", {"doc_type": "symptom_index"}, 0.1,
+                       canonical_metadata={"section": "1.3.2", "page": 12})
+    assert (hit.section, hit.page) == ("1.3.2", 12)
+    assert (_hit().section, _hit().page) == ("1.1.1", 7)
+
+
+def test_cached_copies_share_metadata_but_not_scores():
+    hits = [_hit()]
+    copies = retrieval_cache.copy_results(hits)
+    copies[0]["score"] += 1.0
+    assert hits[0].score == 0.5
+    assert copies[0].metadata is hits[0].metadata
+
+
+def test_store_hits_reference_one_metadata_view_per_chunk(monkeypatch, tmp_path):
+    from app.core.vector_backends import NumpyBackend
+
+    backend = NumpyBackend(str(tmp_path))
+    backend.add(
+        ["a", "b"], ["alpha", "beta"], [[1.0, 0.0], [0.0, 1.0]],
+        [{"doc_type": "symptom_index", "symptom_keywords_json": '["cough"]'},
+         {"doc_type": "rule_search"}],
+    )
+    monkeypatch.setattr(vector_store, "get_backend", lambda: backend)
+    vector_store.bump_generation()
+
+    first = vector_store.query_by_vector([1.0, 0.1], top_k=2)
+    second = vector_store.query_many_by_vector([[1.0, 0.0]], top_k=1)[0]
+    scored = vector_store.score_chunks([1.0, 0.0], ["a"])
+    assert first[0].chunk_id == "a"
+    assert first[0].metadata is second[0].metadata is scored[0].metadata
+    assert first[0].metadata["symptom_keywords"] == ["cough"]
+    with pytest.raises(TypeError):
+        first[0].metadata["doc_type"] = "changed"
+
+    # A new index generation decodes fresh views
+    vector_store.bump_generation()
+    assert vector_store.query_by_vector([1.0, 0.0], top_k=1)[0].metadata is not first[0].metadata
+
+
+@pytest.mark.parametrize("name", ["numpy", "mmap"])
+def test_backends_build_hits_on_their_stored_metadata(tmp_path, name):
+    from app.core.vector_backends import MappedBackend, NumpyBackend
+
+    backend_class = MappedBackend if name == "mmap" else NumpyBackend
+    backend = backend_class(str(tmp_path))
+    backend.add(["a", "b"], ["alpha", "beta"], [[1.0, 0.0], [0.0, 1.0]],
+                [{"doc_type": "rule_search"}, {"doc_type": "symptom_index"}])
+    if name == "mmap":
+        backend.snapshot()
+        backend = MappedBackend(str(tmp_path))          # reads the mapped file
+
+    hits = backend.query([1.0, 0.0], top_k=2)
+    again = backend.query_many([[1.0, 0.2]], top_k=1)[0]
+    assert all(type(h) is RetrievalHit for h in hits)
+    assert [h.chunk_id for h in hits] == ["a", "b"]
+    assert hits[0].metadata is again[0].metadata
@@ -0,0 +1,98 @@
+"""Tests for the deterministic symptom-to-rule index.
+
+Run with:  python -m pytest tests/test_rule_index.py -v
+"""
+
+import pytest
+
+from app.core.rule_index import RuleIndex
+
+SYNONYMS = {"haemoptysis": ["hemoptysis", "coughing blood"]}
+
+
+@pytest.fixture
+def index(make_canonical) -> RuleIndex:
+    return RuleIndex.from_canonicals([
+        make_canonical("1.1.1", ["haemoptysis"], age_min=40),
+        make_canonical("1.1.2", ["cough", "fatigue"], age_min=40),
+        make_canonical("1.4.1", ["breast lump"], age_min=30, gender_specific="Female"),
+        make_canonical("1.6.1", ["haematuria"], age_max=60),
+        make_canonical("1.9.9", []),
+    ], SYNONYMS)
+
+
+def test_synonyms_and_substring_matching(index):
+    patient = {"age": 55, "gender": "Male", "symptoms": ["Unexplained  Hemoptysis"]}
+    assert index.lookup(patient) == [("1.1.1", 1)]
+    assert "coughing blood" in index.terms
+
+
+def test_most_matched_symptoms_first(index):
+    patient = {"age": 50, "symptoms": ["persistent cough", "fatigue", "haemoptysis"]}
+    assert index.lookup(patient) == [("1.1.2", 2), ("1.1.1", 1)]
+    assert index.lookup(patient, limit=1) == [("1.1.2", 2)]
+
+
+def test_age_and_gender_never_remove_candidates(index):
+    assert index.lookup({"age": 35, "symptoms": ["fatigue"]}) == [("1.1.2", 1)]
+    assert index.lookup({"age": 35, "gender": "Male", "symptoms": ["breast lump"]}) == [("1.4.1", 1)]
+    assert index.lookup({"age": 60, "symptoms": ["visible haematuria"]}) == [("1.6.1", 1)]
+
+
+def test_save_load_round_trip(tmp_path, index):
+    index.save(tmp_path / "rules.json")
+    loaded = RuleIndex.load(tmp_path / "rules.json")
+    patient = {"age": 45, "gender": "Female", "symptoms": ["cough", "breast lump"]}
+    assert loaded.lookup(patient) == index.lookup(patient)
+    assert loaded.rule_ids == index.rule_ids
+
+
+def test_reloads_index_rebuilt_by_another_worker(tmp_path, monkeypatch, index, make_canonical):
+    from app.config import settings
+    from app.core import rule_index
+
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIR", str(tmp_path))
+    monkeypatch.setattr(rule_index, "_rule_index", None)
+    assert rule_index.get_rule_index() is None
+
+    index.save(tmp_path / rule_index.RULE_INDEX_FILENAME)
+    assert len(rule_index.get_rule_index()) == 5
+    assert rule_index.get_rule_index() is rule_index.get_rule_index()
+
+    # Another worker re-ingests: the file is replaced, this process reloads
+    RuleIndex.from_canonicals([make_canonical("1.1.1", ["haemoptysis"])], SYNONYMS).save(
+        tmp_path / rule_index.RULE_INDEX_FILENAME
+    )
+    assert rule_index.get_rule_index().rule_ids == ["1.1.1"]
+
+
+def test_index_built_from_real_chunker_output(ng12_canonicals):
+    from app.ingestion.chunker import SYNONYM_MAP
+
+    index = RuleIndex.from_canonicals(ng12_canonicals, SYNONYM_MAP)
+    assert len(index) == len(ng12_canonicals)
+    assert index.lookup({"age": 55, "gender": "Male", "symptoms": ["unexplained hemoptysis"]}) == [("1.1.1", 1)]
+    # Renal 1.6.6 is (mis)tagged Male and 1.2.1's age covers one branch only
+    haematuria = index.lookup({"age": 50, "gender": "Female", "symptoms": ["visible haematuria"]})
+    assert {"1.6.4", "1.6.6"} <= {rule_id for rule_id, _ in haematuria}
+    dysphagia = index.lookup({"age": 35, "gender": "Male", "symptoms": ["dysphagia"]})
+    assert {"1.2.1", "1.2.7"} <= {rule_id for rule_id, _ in dysphagia}
+
+
+def test_rule_matches_rank_candidates_by_soft_patient_fit(
+    monkeypatch, ng12_store, ng12_canonicals,
+):
+    from app.core import rag_pipeline, rule_index
+    from app.ingestion.chunker import SYNONYM_MAP
+
+    index = RuleIndex.from_canonicals(ng12_canonicals, SYNONYM_MAP)
+    monkeypatch.setattr(rule_index, "get_rule_index", lambda: index)
+
+    woman = {"age": 50, "gender": "Female", "smoking_history": "Never Smoked",
+             "symptoms": ["visible haematuria"]}
+    ranked = [r.metadata["section"] for r in rag_pipeline.rule_matches(woman, top_k=10)]
+    # Kept despite its Male tag, but after the untagged bladder rule
+    assert ranked.index("1.6.4") < ranked.index("1.6.6")
+
+    young = {"age": 35, "gender": "Male", "symptoms": ["dysphagia"]}
+    assert "1.2.1" in [r.metadata["section"] for r in rag_pipeline.rule_matches(young, top_k=10)]
@@ -0,0 +1,102 @@
+"""Tests for the compiled bulk screening engine.
+
+Run with:  python -m pytest tests/test_screening.py -v
+"""
+
+import random
+
+import pytest
+
+from app.core.rule_index import RuleIndex
+from app.core.screening import ScreeningEngine
+
+
+@pytest.fixture
+def engine(make_canonical) -> ScreeningEngine:
+    return ScreeningEngine(RuleIndex.from_canonicals([
+        make_canonical("1.1.1", ["haemoptysis"], age_min=40, action_type="Urgent Referral"),
+        make_canonical("1.1.2", ["cough", "fatigue", "weight loss"], age_min=40,
+                       risk_factor_smoking=True, action_type="Urgent Investigation"),
+        make_canonical("1.4.1", ["breast lump"], age_min=30, gender_specific="Female"),
+        make_canonical("1.6.1", ["haematuria"], age_max=60),
+        make_canonical("1.9.9", []),
+    ], {"haemoptysis": ["hemoptysis"]}))
+
+
+def _random_population(engine: ScreeningEngine, n: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    vocabulary = list(engine.terms) + ["headache", "rash"]
+    return [
+        {
+            "age": rng.choice([None, rng.randint(10, 90)]),
+            "gender": rng.choice(["Male", "Female", None]),
+            "symptoms": [
+                rng.choice(["", "persistent "]) + s
+                for s in rng.sample(vocabulary, rng.randint(0, 3))
+            ],
+        }
+        for _ in range(n)
+    ]
+
+
+def test_matches_per_patient_lookup_on_random_population(engine):
+    patients = _random_population(engine, 300, seed=3)
+    screened = engine.screen(patients)
+    for patient, matches in zip(patients, screened):
+        expected = engine.index.lookup(patient)
+        assert [(m["rule_id"], m["matched_symptoms"]) for m in matches] == expected
+
+
+def test_recommendation_fields_and_smoking_risk(engine):
+    smoker, never = engine.screen([
+        {"age": 60, "gender": "Male", "smoking_history": "Current Smoker",
+         "symptoms": ["persistent cough", "unexplained hemoptysis"]},
+        {"age": 60, "gender": "Male", "smoking_history": "Never Smoked",
+         "symptoms": ["cough"]},
+    ])
+    assert smoker[0]["rule_id"] in {"1.1.1", "1.1.2"}
+    by_rule = {m["rule_id"]: m for m in smoker}
+    assert by_rule["1.1.2"]["action_type"] == "Urgent Investigation"
+    assert by_rule["1.1.2"]["smoking_risk"] is True
+    assert by_rule["1.1.1"]["smoking_risk"] is False
+    assert never[0]["smoking_risk"] is False
+
+
+def test_empty_population_and_no_symptoms(engine):
+    assert engine.screen([]) == []
+    assert engine.screen([{"age": 50, "symptoms": []}]) == [[]]
+
+
+def test_real_chunker_rules_match_per_patient_lookup(ng12_canonicals):
+    from app.ingestion.chunker import SYNONYM_MAP
+
+    engine = ScreeningEngine(RuleIndex.from_canonicals(ng12_canonicals, SYNONYM_MAP))
+    patients = _random_population(engine, 200, seed=5)
+    for patient, matches in zip(patients, engine.screen(patients)):
+        expected = engine.index.lookup(patient)
+        assert [(m["rule_id"], m["matched_symptoms"]) for m in matches] == expected
+
+    [matches] = engine.screen([{"age": 55, "gender": "Male", "symptoms": ["haemoptysis"]}])
+    assert matches[0]["rule_id"] == "1.1.1"
+    assert matches[0]["action_type"] == "Urgent Referral"
+    assert matches[0]["cancer_type"] == "Lung and pleural cancers"
+
+
+def test_real_rules_are_keyword_candidates_not_verified_matches(ng12_canonicals):
+    from app.ingestion.chunker import SYNONYM_MAP
+
+    engine = ScreeningEngine(RuleIndex.from_canonicals(ng12_canonicals, SYNONYM_MAP))
+    haematuria, dysphagia, fatigue = (
+        {c["rule_id"] for c in candidates}
+        for candidates in engine.screen([
+            {"age": 50, "gender": "Female", "symptoms": ["visible haematuria"]},
+            {"age": 35, "gender": "Male", "symptoms": ["dysphagia"]},
+            {"age": 45, "gender": "Male", "symptoms": ["fatigue"]},
+        ])
+    )
+    # Rules that apply are never dropped on the heuristic age / gender tags
+    assert {"1.6.4", "1.6.6"} <= haematuria
+    assert {"1.2.1", "1.2.7"} <= dysphagia
+    # ... and one keyword is enough for a candidate, although 1.1.2 and
+    # 1.1.5 need two symptoms (or one plus a smoking history)
+    assert {"1.1.2", "1.1.5"} <= fatigue
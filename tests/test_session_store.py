@@ -0,0 +1,35 @@
+"""Tests for the chat session stores.
+
+Run with:  python -m pytest tests/test_session_store.py -v
+"""
+
+from app.memory.session_store import SqliteSessionStore
+
+CHUNKS = [{
+    "text": "Refer for chest x-ray if haemoptysis",
+    "metadata": {"cancer_type": "Lung", "section": "1.1.1"},
+}]
+
+
+def test_sqlite_sessions_are_shared_between_stores(tmp_path):
+    # Two workers open the same file
+    first = SqliteSessionStore(tmp_path / "sessions.db")
+    second = SqliteSessionStore(tmp_path / "sessions.db")
+
+    first.append("s1", "user", "Hello")
+    first.append("s1", "assistant", "Hi")
+    first.update_topic("s1", CHUNKS)
+    assert second.get_history("s1") == [
+        {"role": "user", "content": "Hello"},
+        {"role": "assistant", "content": "Hi"},
+    ]
+    assert second.get_topic("s1") == "Lung haemoptysis chest x-ray"
+    assert second.session_ids() == ["s1"]
+
+    second.append("s2", "user", "Another")
+    second.clear_session("s1")
+    assert first.get_history("s1") == [] and first.get_topic("s1") == ""
+    assert first.session_ids() == ["s2"]
+
+    first.clear_all()
+    assert second.session_ids() == []
@@ -0,0 +1,208 @@
+"""Conformance and latency tests shared by every vector store backend.
+
+Each test runs against chroma, numpy, hnsw and mmap (hnsw is skipped
+when hnswlib is not installed; see requirements-dev.txt).
+
+Run with:  python -m pytest tests/test_vector_backends.py -v
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from app.core.vector_backends import VECTOR_BACKENDS, create_backend, matches_where
+
+DIM = 32
+
+
+def _vectors(n: int, seed: int = 0) -> list[list[float]]:
+    rng = np.random.default_rng(seed)
+    v = rng.standard_normal((n, DIM))
+    return (v / np.linalg.norm(v, axis=1, keepdims=True)).tolist()
+
+
+def _make(name: str, path) -> object:
+    if name == "hnsw":
+        pytest.importorskip("hnswlib")
+    return create_backend(name, str(path))
+
+
+@pytest.fixture(params=VECTOR_BACKENDS)
+def backend_name(request) -> str:
+    return request.param
+
+
+@pytest.fixture
+def backend(backend_name, tmp_path):
+    b = _make(backend_name, tmp_path)
+    b.reset()
+    vectors = _vectors(50)
+    b.add(
+        ids=[f"doc_{i}" for i in range(50)],
+        documents=[f"text {i}" for i in range(50)],
+        embeddings=vectors,
+        metadatas=[{"doc_type": "rule_search", "rule_id": f"1.1.{i}"} for i in range(50)],
+    )
+    return b
+
+
+def test_count_and_get(backend):
+    assert backend.count() == 50
+    got = backend.get(["doc_3", "missing", "doc_7"])
+    assert [c["chunk_id"] for c in got] == ["doc_3", "doc_7"]
+    assert got[0]["text"] == "text 3"
+    assert got[0]["metadata"] == {"doc_type": "rule_search", "rule_id": "1.1.3"}
+    assert len(backend.get()) == 50
+
+
+def test_query_finds_self_with_cosine_score(backend):
+    query = _vectors(50)[12]
+    results = backend.query(query, top_k=5)
+    assert len(results) == 5
+    assert results[0]["chunk_id"] == "doc_12"
+    assert results[0]["score"] == pytest.approx(1.0, abs=1e-4)
+    assert set(results[0]) == {"chunk_id", "text", "metadata", "score"}
+    scores = [r["score"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_query_top_k_larger_than_index(backend):
+    assert len(backend.query(_vectors(1, seed=9)[0], top_k=500)) == 50
+
+
+def test_query_many_matches_single_queries(backend):
+    queries = _vectors(3, seed=4)
+    batch = backend.query_many(queries, top_k=4)
+    assert len(batch) == 3
+    for q, results in zip(queries, batch):
+        single = backend.query(q, top_k=4)
+        assert [r["chunk_id"] for r in results] == [r["chunk_id"] for r in single]
+        assert [r["score"] for r in results] == pytest.approx([r["score"] for r in single], abs=1e-5)
+    assert backend.query_many([], top_k=4) == []
+
+
+def test_add_is_an_upsert(backend):
+    backend.add(["doc_0"], ["changed"], [_vectors(50)[1]], [{"doc_type": "x"}])
+    assert backend.count() == 50
+    assert backend.get(["doc_0"])[0]["text"] == "changed"
+    top = {r["chunk_id"] for r in backend.query(_vectors(50)[1], top_k=2)}
+    assert top == {"doc_0", "doc_1"}
+
+
+def test_embedding_round_trip(backend):
+    stored = backend.embedding("doc_4")
+    assert np.allclose(stored, _vectors(50)[4], atol=1e-5)
+    assert backend.embedding("missing") is None
+
+
+def test_reset_empties_index(backend):
+    backend.reset()
+    assert backend.count() == 0
+    assert backend.query(_vectors(1)[0], top_k=3) == []
+
+
+def test_snapshot_visible_to_new_instance(backend, backend_name, tmp_path):
+    backend.snapshot()
+    reopened = _make(backend_name, tmp_path)
+    assert reopened.count() == 50
+    assert reopened.query(_vectors(50)[20], top_k=1)[0]["chunk_id"] == "doc_20"
+
+
+def test_where_prefilter(backend):
+    backend.add(
+        ids=["male_only", "female_only"],
+        documents=["m", "f"],
+        embeddings=_vectors(2, seed=5),
+        metadatas=[
+            {"doc_type": "rule_search", "gender_filter": "Male", "age_floor": 50},
+            {"doc_type": "rule_search", "gender_filter": "Female", "age_floor": 30},
+        ],
+    )
+    where = {"$and": [
+        {"gender_filter": {"$in": ["Any", "Female"]}},
+        {"age_floor": {"$lte": 40}},
+    ]}
+    results = backend.query(_vectors(2, seed=5)[0], top_k=10, where=where)
+    assert [r["chunk_id"] for r in results] == ["female_only"]
+    # Chunks without the filtered field never match
+    unconstrained = backend.query(_vectors(1)[0], top_k=10, where={"age_floor": {"$gte": 0}})
+    assert {r["chunk_id"] for r in unconstrained} == {"male_only", "female_only"}
+
+
+def test_selective_where_returns_fewer_than_top_k(backend_name, tmp_path):
+    # hnswlib raises when a filtered search reaches fewer than k items
+    b = _make(backend_name, tmp_path)
+    b.reset()
+    n = 500
+    b.add(
+        ids=[f"doc_{i}" for i in range(n)],
+        documents=[f"text {i}" for i in range(n)],
+        embeddings=_vectors(n, seed=3),
+        metadatas=[{"rule_id": "rare" if i % 200 == 7 else "common"} for i in range(n)],
+    )
+    queries = _vectors(2, seed=4)
+    batch = b.query_many(queries, top_k=10, where={"rule_id": "rare"})
+    for results in batch:
+        assert {r["chunk_id"] for r in results} == {"doc_7", "doc_207", "doc_407"}
+    single = b.query(queries[0], top_k=10, where={"rule_id": "rare"})
+    assert [r["chunk_id"] for r in single] == [r["chunk_id"] for r in batch[0]]
+    b.snapshot()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_chroma_handle_survives_recreate_by_another_client(tmp_path):
+    import chromadb
+
+    from app.core.vector_backends import ChromaBackend
+
+    client = chromadb.PersistentClient(path=str(tmp_path))
+    reader, writer = ChromaBackend(client), ChromaBackend(client)
+    writer.add(["a"], ["alpha"], _vectors(1), [{"doc_type": "rule_search"}])
+    assert reader.count() == 1
+    # Another worker re-indexes: the collection is dropped and recreated
+    writer.reset()
+    writer.add(["b", "c"], ["beta", "gamma"], _vectors(2, seed=1), [{"doc_type": "rule_search"}] * 2)
+    assert reader.count() == 2
+    assert reader.query(_vectors(2, seed=1)[1], top_k=1)[0]["chunk_id"] == "c"
+
+
+def test_unknown_backend_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        create_backend("annoy", str(tmp_path))
+
+
+def test_matches_where_operators():
+    meta = {"gender_filter": "Any", "age_floor": 40, "age_ceiling": 999}
+    assert matches_where(meta, {"gender_filter": "Any"})
+    assert matches_where(meta, {"$or": [{"age_floor": {"$gt": 50}}, {"age_ceiling": {"$ne": 0}}]})
+    assert not matches_where(meta, {"age_floor": {"$lt": 40}})
+    assert not matches_where(meta, {"gender_filter": {"$nin": ["Any"]}})
+    assert not matches_where(meta, {"missing": {"$ne": 1}})
+    with pytest.raises(ValueError):
+        matches_where(meta, {"age_floor": {"$regex": "4"}})
+
+
+# ── Latency ──────────────────────────────────────────────────────────────
+def test_query_latency_at_corpus_scale(backend_name, tmp_path):
+    """~NG12 corpus size; generous bound so only gross regressions fail."""
+    b = _make(backend_name, tmp_path)
+    b.reset()
+    n = 400
+    b.add(
+        ids=[f"doc_{i}" for i in range(n)],
+        documents=[""] * n,
+        embeddings=_vectors(n, seed=1),
+        metadatas=[{"doc_type": "rule_search"}] * n,
+    )
+    queries = _vectors(30, seed=2)
+    b.query(queries[0], top_k=15)
+
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        b.query(q, top_k=15)
+        samples.append((time.perf_counter() - start) * 1000)
+    p95 = float(np.percentile(samples, 95))
+    print(f"\n{backend_name}: p50 {np.median(samples):.3f} ms, p95 {p95:.3f} ms")
+    assert p95 < 50
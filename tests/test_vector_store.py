@@ -0,0 +1,68 @@
+"""Tests for vector_store's process-shared index generation.
+
+Run with:  python -m pytest tests/test_vector_store.py -v
+"""
+
+from app.core import vector_store
+from app.core.index_files import write_json_atomic
+
+
+def _bump_in_another_process() -> None:
+    """What bump_generation() in another worker leaves behind."""
+    write_json_atomic(vector_store._generation_path(), {"pid": 0, "time": 0.0})
+
+
+def test_generation_follows_bumps_in_other_processes():
+    start = vector_store.index_generation()
+    assert vector_store.index_generation() == start
+
+    # A local bump is not mistaken for another process's
+    bumped = vector_store.bump_generation()
+    assert vector_store.index_generation() == bumped == start + 1
+
+    _bump_in_another_process()
+    assert vector_store.index_generation() == bumped + 1
+
+
+def test_remote_bump_reloads_canonicals_and_reopens_backend(monkeypatch):
+    from app.config import settings
+
+    rows = {"ids": ["ng12_1_1_1"], "documents": ["old"], "metadatas": [{}]}
+    monkeypatch.setattr(vector_store, "_canonical_call", lambda method, **kw: rows)
+    monkeypatch.setattr(vector_store, "_canonical_cache", None)
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "numpy")
+    monkeypatch.setattr(vector_store, "_backend", None)
+
+    backend = vector_store.get_backend()
+    assert vector_store.get_canonical("1.1.1")["text"] == "old"
+    assert vector_store.get_backend() is backend
+
+    rows = {"ids": ["ng12_1_1_1"], "documents": ["new"], "metadatas": [{}]}
+    _bump_in_another_process()
+    assert vector_store.get_canonical("1.1.1")["text"] == "new"
+    assert vector_store.get_backend() is not backend
+
+
+def test_remapped_index_file_starts_a_new_generation(monkeypatch):
+    from app.config import settings
+    from app.core.vector_backends import MappedBackend
+
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "mmap")
+    monkeypatch.setattr(vector_store, "_backend", None)
+    monkeypatch.setattr(vector_store, "_metadata_views", (-1, {}))
+
+    def write(section: str) -> None:
+        # Another worker exports a new index without touching the generation file
+        writer = MappedBackend(settings.CHROMA_PERSIST_DIR)
+        writer.reset()
+        writer.add(["c1"], ["text"], [[1.0, 0.0]], [{"section": section}])
+        writer.snapshot()
+
+    write("1.1.1")
+    start = vector_store.index_generation()
+    assert vector_store.query_by_vector([1.0, 0.0], top_k=1)[0].section == "1.1.1"
+    assert vector_store.index_generation() == start
+
+    write("1.2.1")
+    assert vector_store.index_generation() == start + 1
+    assert vector_store.query_by_vector([1.0, 0.0], top_k=1)[0].section == "1.2.1"